@@ -1,19 +1,21 @@
 """Run post-processing scripts."""
 
-import os
-import subprocess
 from pathlib import Path
 
+from rodney.runner import Task, run_tasks
+
 pwd = Path(__file__).absolute().parent
 
-scripts = [
-    'plot_modified_sections.py',
+args = '--no-compute --no-show'
+
+tasks = [
+    Task(pwd / 'plot_modified_sections.py', args=args,
+         inputs=['snake_*.txt'],
+         outputs=[
+             'figures/modified_sections_aoa*.pdf',
+             'figures/modified_sections_aoa*.png'
+         ])
 ]
 
-for script in scripts:
-    print(f'[INFO] Running script {script} ...')
-    script = str(pwd / script)
-    p = subprocess.Popen(
-        f'python {script} --no-compute --no-show', shell=True
-    )
-    p.communicate()
+if __name__ == '__main__':
+    run_tasks(tasks)
@@ -0,0 +1,48 @@
+"""Follow the fieldMinMax output of a running case and flag divergence.
+
+The script exits with status 1 as soon as a sign of divergence is found
+(non-finite values, runaway velocity, or negative turbulent viscosity),
+so that it can be used to cancel a diverging job.
+
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+from rodney.minmax import FieldMinMaxMonitor
+
+
+parser = argparse.ArgumentParser(description='Monitor fieldMinMax output.')
+parser.add_argument('casedir', type=pathlib.Path,
+                    help='Directory of the OpenFOAM case')
+parser.add_argument('--name', default='domain_min_max',
+                    help='Name of the fieldMinMax function object')
+parser.add_argument('--interval', type=float, default=60.0,
+                    help='Time (in seconds) between two updates')
+parser.add_argument('--u-max', type=float, default=10.0,
+                    help='Largest admissible velocity component')
+parser.add_argument('--nut-min', type=float, default=-1e-6,
+                    help='Smallest admissible turbulent viscosity')
+parser.add_argument('--once', action='store_true',
+                    help='Check the output once and exit')
+args = parser.parse_args()
+
+monitor = FieldMinMaxMonitor(args.casedir / 'postProcessing' / args.name,
+                             u_max=args.u_max, nut_min=args.nut_min)
+
+while True:
+    for key, value in monitor.update().items():
+        print(f'[WARNING] {key} flagged at time {value}', flush=True)
+    if monitor.is_diverging:
+        sys.exit(1)
+    if args.once:
+        break
+    time.sleep(args.interval)
+
+times, names, extremes = monitor.extremes()
+if times.size > 0:
+    print(f'[INFO] Last time: {times[-1]}')
+    for name, (vmin, vmax) in zip(names, extremes[-1]):
+        print(f'[INFO] {name}: min={vmin}, max={vmax}')
@@ -1,20 +1,30 @@
 """Run post-processing scripts."""
 
+import argparse
 import os
-import subprocess
 from pathlib import Path
 
+from rodney.runner import collect_tasks, run_tasks
+
 pwd = Path(__file__).absolute().parent
 os.environ['DISPLAY'] = ':0'
 
 rootdir = pwd.parent
 
-scripts = list((rootdir / 'runs').glob('**/process_all.py'))
-scripts += list((rootdir / 'data').glob('**/process_all.py'))
+parser = argparse.ArgumentParser(description='Run post-processing scripts.')
+parser.add_argument('-j', '--jobs', type=int, default=None,
+                    help='Maximum number of scripts running concurrently')
+parser.add_argument('--force', action='store_true',
+                    help='Run scripts even if their outputs are up-to-date')
+parser.add_argument('--dry-run', action='store_true',
+                    help='Only print the scripts that would run')
+args = parser.parse_args()
+
+tasks = collect_tasks(rootdir / 'runs') + collect_tasks(rootdir / 'data')
+
+status = run_tasks(tasks, max_workers=args.jobs, force=args.force,
+                   dry_run=args.dry_run)
 
-for script in scripts:
-    print(f'[INFO] Running script {script} ...')
-    p = subprocess.Popen(
-        f'python {script}', shell=True
-    )
-    p.communicate()
+for name, value in status.items():
+    if value in ('failed', 'cancelled'):
+        print(f'[ERROR] {name}: {value}')
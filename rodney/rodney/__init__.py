@@ -1,3 +1,8 @@
+from .cache import ResultCache, set_result_cache
+from .foam import FoamCase
 from .literature import *
 from .misc import parse_command_line
 from .processing import *
+from .spectral import strouhal_numbers
+from .store import create_store
+from .tarball import build_tarball_index
@@ -0,0 +1,220 @@
+"""Content-addressed cache of processed results.
+
+A result is stored under a key derived from the fingerprint of the files
+it is computed from (tarball, store, or raw files of the postProcessing
+directory), the time values, and the processing parameters; a result is
+therefore reused only when none of its inputs has changed.
+Keys also include the version of the package and a hash of its sources,
+so that results computed by a previous version of the code are not
+reused.
+Entries are pickled files whose modification times record their last use;
+the least-recently-used entries are evicted when the cache exceeds its size.
+
+By default, results are cached in the directory of each case; a cache
+shared by all cases is used when set with `set_result_cache` (or with the
+environment variable `RODNEY_CACHE_DIR`).
+
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import pickle
+import tempfile
+
+import numpy
+
+from .version import __version__
+
+
+CACHE_VERSION = 1
+
+_code_fingerprint = None
+
+
+def _stat_entry(filepath, name):
+    try:
+        stat = filepath.stat()
+    except FileNotFoundError:
+        return [name, None, None]
+    return [name, stat.st_size, stat.st_mtime_ns]
+
+
+def source_fingerprint(paths):
+    """Return a fingerprint of the files a result is computed from.
+
+    The fingerprint is based on the paths, sizes, and modification times
+    of the files; a directory stands for all the files it contains, and a
+    missing file is recorded as such.
+
+    Parameters
+    ----------
+    paths : list(pathlib.Path)
+        Paths of the files (or directories) read.
+
+    Returns
+    -------
+    str
+        Fingerprint of the files.
+
+    """
+    entries = []
+    for path in map(pathlib.Path, paths):
+        if not path.is_dir():
+            entries.append(_stat_entry(path, path.as_posix()))
+            continue
+        for root, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                filepath = pathlib.Path(root) / filename
+                entries.append(_stat_entry(filepath, filepath.as_posix()))
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+
+def code_fingerprint():
+    """Return the version of the package and a hash of its sources."""
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        digest = hashlib.sha256()
+        for filepath in sorted(pathlib.Path(__file__).parent.glob('*.py')):
+            digest.update(filepath.name.encode())
+            digest.update(filepath.read_bytes())
+        _code_fingerprint = [__version__, digest.hexdigest()]
+    return _code_fingerprint
+
+
+def _normalize(obj):
+    """Convert parameters into JSON-serializable objects."""
+    if isinstance(obj, numpy.ndarray):
+        return _normalize(obj.tolist())
+    if isinstance(obj, numpy.generic):
+        return obj.item()
+    if isinstance(obj, pathlib.PurePath):
+        return obj.as_posix()
+    if isinstance(obj, dict):
+        return {str(k): _normalize(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, (list, tuple)):
+        return [_normalize(v) for v in obj]
+    return obj
+
+
+class ResultCache:
+    """Least-recently-used cache of results on disk.
+
+    Parameters
+    ----------
+    cachedir : pathlib.Path
+        Directory of the cache.
+    max_bytes : int, optional
+        Maximum size of the cache; default is 2 GiB.
+    refresh : bool, optional
+        If True, cached results are ignored (and replaced once computed);
+        default is False.
+
+    """
+
+    def __init__(self, cachedir, max_bytes=2 * 1024**3, refresh=False):
+        """Set the directory and size of the cache."""
+        self.cachedir = pathlib.Path(cachedir)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+
+    @staticmethod
+    def key(*parts):
+        """Return the key of a result given its inputs."""
+        data = json.dumps(_normalize([CACHE_VERSION, code_fingerprint(),
+                                      *parts]))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.cachedir / f'{key}.pkl'
+
+    def get(self, key):
+        """Return a cached result, or None if there is no entry."""
+        filepath = self._path(key)
+        if self.refresh or not filepath.is_file():
+            return None
+        try:
+            with open(filepath, 'rb') as infile:
+                result = pickle.load(infile)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(filepath)  # mark as recently used
+        return result
+
+    def put(self, key, result):
+        """Store a result and evict old entries if needed."""
+        self.cachedir.mkdir(parents=True, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(dir=self.cachedir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as outfile:
+            pickle.dump(result, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmppath, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Remove least-recently-used entries until the size fits."""
+        entries = []
+        for filepath in self.cachedir.glob('*.pkl'):
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, filepath))
+        total = sum(size for _, size, _ in entries)
+        for _, size, filepath in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                filepath.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove all entries."""
+        for filepath in self.cachedir.glob('*.pkl'):
+            filepath.unlink()
+
+
+_result_cache = 'case'
+_refresh = False
+
+
+def get_result_cache(cachedir):
+    """Return the result cache used by a data object.
+
+    Parameters
+    ----------
+    cachedir : pathlib.Path
+        Directory of the cache of the case, used unless a cache shared by
+        all cases is set (see `set_result_cache`).
+
+    Returns
+    -------
+    ResultCache
+        The result cache, or None if caching is disabled.
+
+    """
+    if _result_cache != 'case':
+        return _result_cache
+    shared = os.environ.get('RODNEY_CACHE_DIR')
+    return ResultCache(shared if shared is not None else cachedir,
+                       refresh=_refresh)
+
+
+def set_result_cache(cache='case', refresh=False):
+    """Set the result cache used by the data objects.
+
+    Parameters
+    ----------
+    cache : ResultCache or str, optional
+        Cache shared by all cases, 'case' (default) to cache the results
+        in the directory of each case, or None to disable the cache.
+    refresh : bool, optional
+        If True, cached results of the cases are ignored (and replaced
+        once computed); default is False.
+
+    """
+    global _result_cache, _refresh
+    _result_cache, _refresh = cache, refresh
@@ -0,0 +1,123 @@
+"""Persistent handle on an OpenFOAM case read with PyVista.
+
+A single reader is kept for the whole case, so that the mesh and its
+topology are parsed once (the VTK reader caches the mesh between time
+steps); only the requested fields and regions are read, and the datasets
+of the most recent requests are kept in a cache bounded in memory.
+
+PyVista is only required when a `FoamCase` is created.
+
+"""
+
+import collections
+import pathlib
+
+
+class FoamCase:
+    """Lazy, cached access to the fields of an OpenFOAM case.
+
+    Datasets returned are shallow copies of the cached ones: their
+    arrays are shared with the cache (and must not be modified), but
+    attributes such as the active scalars can be set.
+    A requested time is snapped to the closest time value of the case;
+    the time actually loaded is `active_time_value`.
+
+    Parameters
+    ----------
+    filepath : pathlib.Path
+        Path of the `.foam` file of the case.
+    max_memory : float, optional
+        Largest memory (in MiB) used by the cached datasets; default is
+        2048 (the most recent dataset is always kept).
+
+    """
+
+    def __init__(self, filepath, max_memory=2048.0):
+        """Create the reader of the case."""
+        import pyvista
+
+        self.filepath = pathlib.Path(filepath)
+        self.reader = pyvista.OpenFOAMReader(str(self.filepath))
+        self.reader.reader.CacheMeshOn()
+        self.max_memory = max_memory
+        self._cache = collections.OrderedDict()
+        self._sizes = dict()
+        self.active_time_value = None
+
+    @property
+    def time_values(self):
+        """Time values available in the case."""
+        return self.reader.time_values
+
+    @property
+    def field_names(self):
+        """Names of the fields (cell arrays) of the case."""
+        return self.reader.cell_array_names
+
+    def nearest_time(self, time):
+        """Return the time value of the case closest to a given time."""
+        return min(self.time_values, key=lambda value: abs(value - time))
+
+    @property
+    def memory(self):
+        """Memory (in MiB) used by the cached datasets."""
+        return sum(self._sizes.values())
+
+    def internal_mesh(self, time, fields=('U',)):
+        """Return the internal mesh with the given fields at a time.
+
+        Cell fields are also interpolated to the points.
+
+        """
+        return self._get(time, 'internalMesh', fields)
+
+    def patch(self, name, time=None, fields=()):
+        """Return a boundary patch with the given fields at a time.
+
+        Without a time, the first time value of the case is used.
+
+        """
+        if time is None:
+            time = self.time_values[0]
+        return self._get(time, f'patch/{name}', fields)
+
+    def clear(self):
+        """Remove all datasets from the cache."""
+        self._cache.clear()
+        self._sizes.clear()
+
+    def _get(self, time, region, fields):
+        """Return a dataset from the cache, or read it."""
+        time = self.nearest_time(time)
+        self.active_time_value = time
+        fields = frozenset(fields)
+        for key in self._cache:
+            # A cached dataset with more fields is also a hit.
+            if key[:2] == (time, region) and fields <= key[2]:
+                self._cache.move_to_end(key)
+                return self._cache[key].copy(deep=False)
+        dataset = self._read(time, region, fields)
+        key = (time, region, fields)
+        self._cache[key] = dataset
+        self._sizes[key] = dataset.actual_memory_size / 1024
+        while len(self._cache) > 1 and self.memory > self.max_memory:
+            key, _ = self._cache.popitem(last=False)
+            del self._sizes[key]
+        return dataset.copy(deep=False)
+
+    def _read(self, time, region, fields):
+        """Read the requested region and fields at a time."""
+        reader = self.reader
+        reader.disable_all_patch_arrays()
+        reader.enable_patch_array(region)
+        reader.disable_all_cell_arrays()
+        for name in fields:
+            reader.enable_cell_array(name)
+        reader.set_active_time_value(time)
+        mesh = reader.read()
+        if region == 'internalMesh':
+            dataset = mesh['internalMesh']
+        else:
+            dataset = mesh['boundary'][region.split('/', 1)[1]]
+        # The output of the reader is re-used by the next read.
+        return dataset.copy(deep=True)
@@ -1,62 +1,327 @@
 """Assistant module with functions to process forces."""
 
+import io
+import json
 import pathlib
 import re
-import tarfile
-import tempfile
 
 import numpy
 
+from .tarball import scan_tarball
 
-def load_forces(filepath=None, tarball=None, name=None, limits=None):
+
+FORCES_REGEX = re.compile(r'postProcessing/forces/([^/]+)/forces\.dat$')
+
+FORCES_DTYPE = numpy.dtype([('time', 'f8'),
+                            ('force_pressure', 'f8', (3,)),
+                            ('force_viscous', 'f8', (3,)),
+                            ('force_porous', 'f8', (3,)),
+                            ('moment_pressure', 'f8', (3,)),
+                            ('moment_viscous', 'f8', (3,)),
+                            ('moment_porous', 'f8', (3,))])
+
+# Fields stored in forces.dat given its number of columns.
+_FORCES_LAYOUTS = {
+    19: FORCES_DTYPE.names,
+    13: ('time', 'force_pressure', 'force_viscous',
+         'moment_pressure', 'moment_viscous'),
+    7: ('time', 'force_pressure', 'force_viscous')
+}
+
+
+def load_forces(filepath=None, tarball=None, name=None, limits=None,
+                store=None, datadir=None, cache=None):
+    """Load the history of the forces.
+
+    With `datadir` (the forces directory of the postProcessing output),
+    `tarball` (without member name), or `store`, the files written in
+    all time directories (i.e., after each restart) are merged.
+    With `cache` (a directory), the parsed forces of `datadir` or `tarball`
+    are kept in binary files and only new lines are parsed next time.
+
+    """
     if filepath is not None:
         res = _load_forces(filepath, limits=limits)
-    elif tarball is not None and name is not None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            _extract_member_from_tarball(tarball, name, destdir=tmpdir)
-            filepath = tmpdir + '/' + name
-            res = _load_forces(filepath, limits=limits)
+    elif datadir is not None and cache is not None:
+        res = _total_forces(ForcesCache(cache).load_datadir(datadir),
+                            limits=limits)
+    elif datadir is not None:
+        res = _load_forces_from_datadir(datadir, limits=limits)
+    elif store is not None:
+        res = _load_forces_from_store(store, limits=limits)
+    elif tarball is not None and name is None and cache is not None:
+        res = _total_forces(ForcesCache(cache).load_tarball(tarball),
+                            limits=limits)
+    elif tarball is not None:
+        accumulator = ForcesAccumulator(name=name, limits=limits,
+                                        source=tarball)
+        scan_tarball(tarball, [accumulator])
+        res = accumulator.result()
     else:
         raise ValueError('invalid parameters; '
-                         'filepath OR (tarball, name) must be specified')
+                         'filepath OR datadir OR tarball OR store '
+                         'must be specified')
 
     return res
 
 
-def _load_forces(filepath, limits=None):
-    """Load three-dimensional forces from file."""
+_PARENTHESES = bytes.maketrans(b'()', b'  ')
+
+
+def _parse_forces_block(block, num_cols):
+    """Parse complete lines of forces.dat into a 2D array."""
+    if b'#' in block:
+        block = b'\n'.join(line for line in block.split(b'\n')
+                           if not line.lstrip().startswith(b'#'))
+    values = numpy.fromstring(block.translate(_PARENTHESES), sep=' ')
+    return values.reshape(-1, num_cols)
+
+
+def read_forces(f, chunksize=4 * 1024**2):
+    """Read forces and moments from a forces.dat file.
+
+    The file is parsed in chunks, without temporary file; a last line
+    that does not end with a newline (file of a running case) is ignored.
+
+    Parameters
+    ----------
+    f : pathlib.Path or file object
+        Path of the file, or file object opened in binary mode.
+    chunksize : int, optional
+        Number of bytes parsed at once; default is 4 MiB.
+
+    Returns
+    -------
+    numpy.ndarray
+        Structured array (see `FORCES_DTYPE`) with the time values and
+        the pressure, viscous, and porous contributions to the forces and
+        moments; contributions missing from the file are set to zero.
+
+    """
+    if isinstance(f, (str, pathlib.Path)):
+        with open(f, 'rb') as infile:
+            return read_forces(infile, chunksize=chunksize)
+    blocks, remainder, num_cols = [], b'', None
+    while True:
+        chunk = f.read(chunksize)
+        block = remainder + chunk
+        # A trailing line without newline is being written (running case).
+        end = block.rfind(b'\n') + 1
+        block, remainder = block[:end], block[end:]
+        if num_cols is None:
+            for line in block.splitlines():
+                if line.strip() and not line.lstrip().startswith(b'#'):
+                    num_cols = len(line.translate(_PARENTHESES).split())
+                    break
+        if num_cols is not None and block.strip():
+            blocks.append(_parse_forces_block(block, num_cols))
+        if not chunk:
+            break
+    if num_cols is None:
+        return numpy.zeros(0, dtype=FORCES_DTYPE)
+    if num_cols not in _FORCES_LAYOUTS:
+        raise ValueError(f'unexpected number of columns ({num_cols}) '
+                         'in forces file')
+    values = numpy.concatenate(blocks)
+    data = numpy.zeros(values.shape[0], dtype=FORCES_DTYPE)
+    i = 0
+    for name in _FORCES_LAYOUTS[num_cols]:
+        size = 1 if name == 'time' else 3
+        data[name] = values[:, i] if size == 1 else values[:, i:i + size]
+        i += size
+    return data
+
+
+def _total_forces(data, limits=None):
+    """Return time values and directional forces (pressure + viscous)."""
     if limits is None:
         limits = (0.0, numpy.inf)
-    tmppath = pathlib.Path(str(filepath) + '.tmp')
-    _remove_parentheses(filepath, tmppath)
-    with open(tmppath, 'r') as infile:
-        cols = tuple(range(7))
-        data = numpy.loadtxt(infile, usecols=cols, unpack=True)
-    tmppath.unlink()
-    t = data[0]
-    fx = data[1] + data[4]
-    fy = data[2] + data[5]
-    fz = data[3] + data[6]
+    t = data['time']
+    f = data['force_pressure'] + data['force_viscous']
     mask = numpy.where((t >= limits[0]) & (t <= limits[1]))[0]
-    return t[mask], fx[mask], fy[mask], fz[mask]
+    return t[mask], f[mask, 0], f[mask, 1], f[mask, 2]
+
+
+def merge_forces(segments, source=None):
+    """Merge the force histories written after each restart.
+
+    Where time ranges overlap, the segment that starts later wins.
+    A FileNotFoundError is raised if there is no segment.
+
+    Parameters
+    ----------
+    segments : dict(float, numpy.ndarray)
+        Structured arrays of forces, keyed by the name of the time
+        directory they were written in.
+    source : pathlib.Path, optional
+        Directory (or tarball) the segments were searched in, reported
+        in the error message; default is None.
+
+    Returns
+    -------
+    numpy.ndarray
+        Structured array with the merged history.
+
+    """
+    if len(segments) == 0:
+        where = '' if source is None else f' in {source}'
+        raise FileNotFoundError(f'no forces files found{where}')
+    starts = sorted(segments)
+    data = [segments[start] for start in starts]
+    # Each segment is cut at the first time value of the next segment.
+    ends = [d['time'][0] if d.size > 0 else start
+            for start, d in zip(starts[1:], data[1:])] + [numpy.inf]
+    return numpy.concatenate([d[d['time'] < end]
+                              for d, end in zip(data, ends)])
+
+
+def _load_forces(filepath, limits=None):
+    """Load three-dimensional forces from file."""
+    return _total_forces(read_forces(filepath), limits=limits)
+
+
+def _load_forces_from_datadir(datadir, limits=None):
+    """Load and merge three-dimensional forces from all time directories."""
+    segments = {float(child.name): read_forces(child / 'forces.dat')
+                for child in pathlib.Path(datadir).iterdir()
+                if (child / 'forces.dat').is_file()}
+    return _total_forces(merge_forces(segments, source=datadir),
+                         limits=limits)
+
+
+def _load_forces_from_store(storedir, limits=None):
+    """Load and merge three-dimensional forces from a columnar store."""
+    forcesdir = pathlib.Path(storedir) / 'forces'
+    segments = {float(child.name): numpy.load(child / 'forces.npy')
+                for child in forcesdir.iterdir()}
+    return _total_forces(merge_forces(segments, source=forcesdir),
+                         limits=limits)
+
+
+class ForcesAccumulator:
+    """Collect the forces from tarball members.
+
+    If no member name is provided, forces written in all time directories
+    are collected and merged; `source` (the tarball) is reported if no
+    forces are found.
+
+    """
+
+    def __init__(self, name=None, limits=None, source=None):
+        """Set the name of the member to read."""
+        self.names = set() if name is None else {name}
+        self.limits = limits
+        self.source = source
+        self.segments = dict()
+
+    def match(self, name):
+        """Check if a member is a forces file (without member name)."""
+        return len(self.names) == 0 and FORCES_REGEX.match(name) is not None
+
+    def consume(self, name, f):
+        """Load the forces of the member."""
+        m = FORCES_REGEX.match(name)
+        start = float(m[1]) if m is not None else 0.0
+        self.segments[start] = read_forces(f)
+
+    def result(self):
+        """Return the time values and the directional forces."""
+        return _total_forces(merge_forces(self.segments, source=self.source),
+                             limits=self.limits)
+
+
+class ForcesCache:
+    """Append-only binary cache of force histories.
+
+    For each forces file, the cache stores the parsed records in a binary
+    file, along with the size and modification time of the source and the
+    number of bytes already parsed.
+    When the source has grown, only its new lines are parsed and appended.
+
+    """
+
+    def __init__(self, cachedir):
+        """Set the directory of the cache."""
+        self.cachedir = pathlib.Path(cachedir)
+        self.statepath = self.cachedir / 'state.json'
+
+    def _load_state(self):
+        if not self.statepath.is_file():
+            return dict()
+        with open(self.statepath, 'r') as infile:
+            return json.load(infile)
+
+    def _save_state(self, state):
+        with open(self.statepath, 'w') as outfile:
+            json.dump(state, outfile)
 
+    @staticmethod
+    def _has_prefix(filepath, entry):
+        """Check the parsed part of the file has not been modified."""
+        marker = bytes.fromhex(entry['marker'])
+        with open(filepath, 'rb') as infile:
+            infile.seek(entry['offset'] - len(marker))
+            return infile.read(len(marker)) == marker
 
-def _extract_member_from_tarball(tarball, name, destdir):
-    with tarfile.open(tarball, 'r|gz') as tar:
-        for member in tar:
-            if member.name == name:
-                tar.extractall(path=destdir, members=[member])
-                break
+    def _update(self, state, key, filepath):
+        """Bring the cache of a file up to date and return its records."""
+        binpath = self.cachedir / f'{key}.bin'
+        stat = filepath.stat()
+        entry = state.get(key)
+        offset, mode, marker = 0, 'wb', ''
+        if entry is not None and binpath.is_file():
+            if (entry['size'] == stat.st_size and
+                    entry['mtime_ns'] == stat.st_mtime_ns):
+                return numpy.fromfile(binpath, dtype=FORCES_DTYPE)
+            if (stat.st_size >= entry['offset'] and
+                    self._has_prefix(filepath, entry)):
+                offset, mode = entry['offset'], 'ab'
+                marker = entry['marker']
+        with open(filepath, 'rb') as infile:
+            infile.seek(offset)
+            tail = infile.read(stat.st_size - offset)
+        # Ignore the last line if it is still being written.
+        end = tail.rfind(b'\n') + 1
+        data = read_forces(io.BytesIO(tail[:end]))
+        with open(binpath, mode) as outfile:
+            outfile.write(data.tobytes())
+        if end > 0:
+            offset, marker = offset + end, tail[max(0, end - 32):end].hex()
+        state[key] = dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                          offset=offset, marker=marker)
+        return numpy.fromfile(binpath, dtype=FORCES_DTYPE)
 
+    def load_datadir(self, datadir):
+        """Return the merged forces of all time directories."""
+        self.cachedir.mkdir(parents=True, exist_ok=True)
+        state = self._load_state()
+        segments = dict()
+        for child in pathlib.Path(datadir).iterdir():
+            filepath = child / 'forces.dat'
+            if filepath.is_file():
+                segments[float(child.name)] = self._update(
+                    state, f'forces_{child.name}', filepath
+                )
+        self._save_state(state)
+        return merge_forces(segments, source=datadir)
 
-def _remove_parentheses(srcpath, destpath):
-    """Remove all parenthesies from file and save into another."""
-    with open(srcpath, 'r') as infile:
-        lines = infile.readlines()
-        for i, line in enumerate(lines):
-            lines[i] = re.sub('[()]', '', line)
-    with open(destpath, 'w') as outfile:
-        outfile.writelines(lines)
+    def load_tarball(self, tarball):
+        """Return the merged forces of a tarball (parsed once per tarball)."""
+        self.cachedir.mkdir(parents=True, exist_ok=True)
+        state = self._load_state()
+        binpath = self.cachedir / 'tarball.bin'
+        stat = pathlib.Path(tarball).stat()
+        fingerprint = dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        if state.get('tarball') == fingerprint and binpath.is_file():
+            return numpy.fromfile(binpath, dtype=FORCES_DTYPE)
+        accumulator = ForcesAccumulator()
+        scan_tarball(tarball, [accumulator])
+        data = merge_forces(accumulator.segments, source=tarball)
+        with open(binpath, 'wb') as outfile:
+            outfile.write(data.tobytes())
+        state['tarball'] = fingerprint
+        self._save_state(state)
+        return data
 
 
 def force_coefficients(forces, rho=1.0, U_inf=1.0, D=1.0, Lz=numpy.pi):
@@ -0,0 +1,226 @@
+"""Helper functions for the spanwise line profiles."""
+
+import pathlib
+
+import numpy
+
+from .misc import check_missing_times, time_to_str
+from .raw import RawReader
+from .tarball import iter_tarball_members, scan_tarball
+
+
+def _zLine_filename(xloc):
+    return f'zLine_x{xloc:.1f}_U.xy'
+
+
+def iter_zLines(xlocs, times, datadir=None, tarball=None):
+    """Yield the velocity along spanwise lines, snapshot by snapshot.
+
+    All lines are read with a single pass over a tarball; snapshots read
+    from a tarball are yielded in the order of the archive.
+
+    Yields
+    ------
+    int
+        Index of the snapshot in `times`.
+    float
+        Location of the line along the x-axis.
+    numpy.array
+        z coordinates.
+    numpy.array
+        Velocity, of shape (num_points, 3).
+
+    """
+    times = list(map(time_to_str, times))
+    readers = {xloc: RawReader(num_coords=1) for xloc in xlocs}
+    if datadir is not None:
+        for xloc in xlocs:
+            for i, time in enumerate(times):
+                filepath = (pathlib.Path(datadir) / time /
+                            _zLine_filename(xloc))
+                with open(filepath, 'rb') as f:
+                    z, values = readers[xloc].read(f)
+                yield i, xloc, z[:, 0], values
+    elif tarball is not None:
+        members = {f'postProcessing/lineProfiles/{time}/'
+                   f'{_zLine_filename(xloc)}': (i, xloc)
+                   for i, time in enumerate(times) for xloc in xlocs}
+        for name, f in iter_tarball_members(tarball, names=members):
+            i, xloc = members[name]
+            z, values = readers[xloc].read(f)
+            yield i, xloc, z[:, 0], values
+    else:
+        raise ValueError('invalid parameters; '
+                         'datadir OR tarball must be specified')
+
+
+def load_zLines(xlocs, times, datadir=None, tarball=None):
+    """Load the velocity along spanwise lines for all snapshots.
+
+    A ValueError is raised if some snapshots are not found.
+
+    Returns
+    -------
+    dict(float, tuple)
+        z coordinates and velocity, of shape (num_times, num_points, 3),
+        for each location along the x-axis.
+
+    """
+    lines, found = dict(), dict()
+    for i, xloc, z, values in iter_zLines(xlocs, times, datadir=datadir,
+                                          tarball=tarball):
+        if xloc not in lines:
+            lines[xloc] = (z, numpy.full((len(times),) + values.shape,
+                                         numpy.nan))
+            found[xloc] = numpy.zeros(len(times), dtype=bool)
+        lines[xloc][1][i] = values
+        found[xloc][i] = True
+    for xloc in xlocs:
+        check_missing_times(times, found.get(xloc),
+                            what=f'zLine samples at x={xloc}')
+    return lines
+
+
+class SpanwiseSpectrum:
+    """Streaming spanwise energy spectrum and two-point correlation.
+
+    The Fourier coefficients of each snapshot along the span are
+    accumulated, along with their squared magnitudes; the spectrum of the
+    fluctuations (about the time average) is obtained at the end as the
+    difference between the mean power and the power of the mean
+    coefficients, so that snapshots are processed in a single pass.
+
+    Parameters
+    ----------
+    z : numpy.array
+        Uniformly spaced z coordinates of the line.
+    periodic : bool, optional
+        If True (default), the last point of the line is the periodic
+        image of the first one and is ignored.
+
+    """
+
+    def __init__(self, z, periodic=True):
+        """Set the spanwise coordinates."""
+        z = numpy.asarray(z, dtype='f8')
+        self.num_points = z.size - 1 if periodic else z.size
+        self.Lz = (z[-1] - z[0]) * self.num_points / (z.size - 1)
+        self.count = 0
+        self._sum = None
+        self._sum_power = None
+
+    def update(self, values):
+        """Add snapshots (num_points, num_components) or a stack of them."""
+        values = numpy.asarray(values, dtype='f8')[..., :self.num_points, :]
+        if values.ndim == 2:
+            values = values[numpy.newaxis]
+        coeffs = numpy.fft.rfft(values, axis=-2) / self.num_points
+        total = coeffs.sum(axis=0)
+        power = numpy.sum(numpy.abs(coeffs)**2, axis=0)
+        if self.count == 0:
+            self._sum, self._sum_power = total, power
+        else:
+            self._sum += total
+            self._sum_power += power
+        self.count += values.shape[0]
+
+    @property
+    def wavenumbers(self):
+        """Spanwise wavenumbers of the spectrum."""
+        num_modes = self.num_points // 2 + 1
+        return 2.0 * numpy.pi / self.Lz * numpy.arange(num_modes)
+
+    @property
+    def power(self):
+        """Time-averaged power of the fluctuations per Fourier mode."""
+        mean = self._sum / self.count
+        return self._sum_power / self.count - numpy.abs(mean)**2
+
+    @property
+    def spectrum(self):
+        """One-sided energy spectrum (integrates to the variance)."""
+        power = self.power
+        power[1:(self.num_points + 1) // 2] *= 2.0
+        return power / (2.0 * numpy.pi / self.Lz)
+
+    @property
+    def separations(self):
+        """Spanwise separations of the two-point correlation."""
+        dz = self.Lz / self.num_points
+        return dz * numpy.arange(self.num_points // 2 + 1)
+
+    @property
+    def correlation(self):
+        """Normalized two-point correlation of the fluctuations."""
+        power = self.power
+        corr = numpy.fft.irfft(power, n=self.num_points, axis=0)
+        corr = corr[:self.num_points // 2 + 1]
+        return corr / corr[0]
+
+
+class SpanwiseSpectraAccumulator:
+    """Accumulate spanwise spectra of the lines read from tarball members."""
+
+    def __init__(self, xlocs, times, periodic=True):
+        """Set the names of the members to accumulate."""
+        self.times = times
+        times = list(map(time_to_str, times))
+        self.members = {f'postProcessing/lineProfiles/{time}/'
+                        f'{_zLine_filename(xloc)}': (i, xloc)
+                        for i, time in enumerate(times) for xloc in xlocs}
+        self.names = set(self.members)
+        self.periodic = periodic
+        self.readers = {xloc: RawReader(num_coords=1) for xloc in xlocs}
+        self.found = {xloc: numpy.zeros(len(times), dtype=bool)
+                      for xloc in xlocs}
+        self.spectra = dict()
+
+    def consume(self, name, f):
+        """Add the velocity of a member."""
+        i, xloc = self.members[name]
+        z, values = self.readers[xloc].read(f)
+        if xloc not in self.spectra:
+            self.spectra[xloc] = SpanwiseSpectrum(z[:, 0],
+                                                  periodic=self.periodic)
+        self.spectra[xloc].update(values)
+        self.found[xloc][i] = True
+
+    def result(self):
+        """Return the spanwise spectra for each location along x.
+
+        A ValueError is raised if some snapshots were not found.
+
+        """
+        for xloc, found in self.found.items():
+            check_missing_times(self.times, found,
+                                what=f'zLine samples at x={xloc}')
+        return self.spectra
+
+
+def spanwise_spectra(xlocs, times, datadir=None, tarball=None,
+                     periodic=True):
+    """Compute the spanwise spectra of the velocity along lines.
+
+    Snapshots are processed in a single pass, without storing them;
+    a ValueError is raised if some snapshots are not found.
+
+    Returns
+    -------
+    dict(float, SpanwiseSpectrum)
+        Spectra for each location along the x-axis.
+
+    """
+    accumulator = SpanwiseSpectraAccumulator(xlocs, times,
+                                             periodic=periodic)
+    if datadir is not None:
+        for name in accumulator.members:
+            # Member names are relative to the postProcessing directory.
+            _, _, time, filename = name.split('/')
+            with open(pathlib.Path(datadir) / time / filename, 'rb') as f:
+                accumulator.consume(name, f)
+    elif tarball is not None:
+        scan_tarball(tarball, [accumulator])
+    else:
+        raise ValueError('invalid parameters; '
+                         'datadir OR tarball must be specified')
+    return accumulator.result()
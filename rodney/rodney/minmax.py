@@ -0,0 +1,174 @@
+"""Monitor of the minima and maxima written by the fieldMinMax object.
+
+The `fieldMinMax.dat` files grow during a run (one line per field and
+component at every time step); the monitor keeps a cursor on each file
+and only parses the lines appended since the previous update, so that it
+can poll a running case at low cost and flag a diverging solution early.
+
+"""
+
+import pathlib
+import re
+
+import numpy
+
+
+_FIELD_COLUMN = re.compile(rb'^(\s*\S+\s+)(\S+)', re.MULTILINE)
+
+_PARENTHESES = bytes.maketrans(b'()', b'  ')
+
+
+def parse_min_max(block):
+    """Parse complete lines of a fieldMinMax.dat file.
+
+    The names of the fields are extracted with a regular expression and
+    the numbers of all lines are decoded at once.
+
+    Parameters
+    ----------
+    block : bytes
+        Complete lines of the file (comment lines are ignored).
+
+    Returns
+    -------
+    numpy.array
+        Time values, one per line.
+    list(str)
+        Names of the fields (e.g., 'p' or 'U_x'), one per line.
+    numpy.array
+        Minimum and maximum values, of shape (num_lines, 2).
+
+    """
+    if b'#' in block:
+        block = b'\n'.join(line for line in block.split(b'\n')
+                           if not line.lstrip().startswith(b'#'))
+    names = [name.decode() for _, name in _FIELD_COLUMN.findall(block)]
+    if len(names) == 0:
+        return numpy.zeros(0), [], numpy.zeros((0, 2))
+    block = _FIELD_COLUMN.sub(rb'\1', block).translate(_PARENTHESES)
+    values = numpy.fromstring(block, sep=' ').reshape(len(names), -1)
+    # Columns: time, min, location(min), [processor], max, location(max),
+    # [processor]; the processor is only written for parallel runs.
+    imax = 5 if values.shape[1] == 9 else 6
+    return values[:, 0], names, values[:, [1, imax]]
+
+
+class FieldMinMaxMonitor:
+    """Follow the fieldMinMax output of a case and flag divergence.
+
+    Parameters
+    ----------
+    datadir : pathlib.Path
+        The directory of the fieldMinMax function object in the
+        postProcessing output (one sub-directory per restart).
+    u_max : float, optional
+        Largest admissible magnitude of a velocity component;
+        default is 10.
+    nut_min : float, optional
+        Smallest admissible turbulent viscosity; default is -1e-6.
+
+    """
+
+    def __init__(self, datadir, u_max=10.0, nut_min=-1e-6):
+        """Set the directory to follow and the divergence criteria."""
+        self.datadir = pathlib.Path(datadir)
+        self.u_max = u_max
+        self.nut_min = nut_min
+        self.cursors = dict()
+        self.fields = dict()
+        self._rows = []
+        self.flags = dict()
+
+    def _read_new_lines(self, filepath):
+        """Return the complete lines appended since the last update."""
+        offset = self.cursors.get(filepath, 0)
+        if filepath.stat().st_size < offset:
+            offset = 0  # file was re-written
+        with open(filepath, 'rb') as infile:
+            infile.seek(offset)
+            data = infile.read()
+        end = data.rfind(b'\n') + 1
+        self.cursors[filepath] = offset + end
+        return data[:end]
+
+    def update(self):
+        """Parse new lines of all files and return the new flags.
+
+        Returns
+        -------
+        dict(str, float)
+            Time of the first occurrence of each problem found in the new
+            lines: 'nan' (non-finite values), 'velocity' (runaway velocity),
+            and 'nut' (negative turbulent viscosity).
+
+        """
+        new_flags = dict()
+        for filepath in sorted(self.datadir.glob('*/fieldMinMax.dat')):
+            start = float(filepath.parent.name)
+            times, names, values = parse_min_max(
+                self._read_new_lines(filepath)
+            )
+            if times.size == 0:
+                continue
+            for name in names:
+                self.fields.setdefault(name, len(self.fields))
+            columns = numpy.array([self.fields[name] for name in names])
+            self._rows.append((numpy.full(times.size, start), times,
+                               columns, values))
+            for key, mask in self._check(names, values).items():
+                if numpy.any(mask):
+                    time = float(times[numpy.argmax(mask)])
+                    new_flags[key] = min(time, new_flags.get(key, time))
+        for key, time in new_flags.items():
+            self.flags.setdefault(key, time)
+        return new_flags
+
+    def _check(self, names, values):
+        """Return masks of the lines that show signs of divergence."""
+        names = numpy.array(names)
+        is_velocity = numpy.char.startswith(names, 'U')
+        is_nut = names == 'nut'
+        return dict(
+            nan=~numpy.all(numpy.isfinite(values), axis=1),
+            velocity=is_velocity & (numpy.max(numpy.abs(values), axis=1) >
+                                    self.u_max),
+            nut=is_nut & (values[:, 0] < self.nut_min)
+        )
+
+    @property
+    def is_diverging(self):
+        """True if a sign of divergence has been found."""
+        return len(self.flags) > 0
+
+    def extremes(self):
+        """Return the compact history of minima and maxima.
+
+        Where time ranges of restarts overlap, the restart that starts
+        later wins.
+
+        Returns
+        -------
+        numpy.array
+            Time values.
+        list(str)
+            Names of the fields.
+        numpy.array
+            Minimum and maximum values, of shape (num_times, num_fields, 2)
+            (NaN where a field is missing).
+
+        """
+        names = sorted(self.fields, key=self.fields.get)
+        if len(self._rows) == 0:
+            return numpy.zeros(0), names, numpy.zeros((0, len(names), 2))
+        starts, times, columns, values = (numpy.concatenate(v)
+                                          for v in zip(*self._rows))
+        # Each restart is cut at the first time value of the next restart.
+        restarts = numpy.unique(starts)
+        first = numpy.array([times[starts == s].min() for s in restarts])
+        ends = numpy.append(first[1:], numpy.inf)
+        keep = times < ends[numpy.searchsorted(restarts, starts)]
+        times, columns, values = times[keep], columns[keep], values[keep]
+        unique_times, rows = numpy.unique(times, return_inverse=True)
+        extremes = numpy.full((unique_times.size, len(names), 2), numpy.nan)
+        extremes[rows, columns] = values
+        return unique_times, names, extremes
@@ -6,9 +6,16 @@ import pprint
 import numpy
 from scipy import signal
 
+from .cache import set_result_cache
+
 
 def parse_command_line(is_slow=False):
-    """Parse the command-line options."""
+    """Parse the command-line options.
+
+    The parameter `is_slow` is kept for compatibility; computations of
+    slow scripts are now reused through the result cache.
+
+    """
     formatter_class = argparse.ArgumentDefaultsHelpFormatter
     descr = 'Generic command-line parser for the 3D snake application.'
     parser = argparse.ArgumentParser(description=descr,
@@ -27,15 +34,13 @@ def parse_command_line(is_slow=False):
                         help='Do not re-compute; load data from file')
     parser.add_argument('--force-compute', dest='force_compute',
                         action='store_true',
-                        help='Force re-computing data; do not load from file')
+                        help='Force re-computing data; ignore cached results')
 
     args = parser.parse_args()
-    if args.compute and is_slow and not args.force_compute:
-        raise RuntimeError(
-            'this script will take time to complete; '
-            'use "--no-compute" to load already generated data from file(s); '
-            'use "--force-compute" if you really want to re-compute'
-        )
+    # Computed results are cached (keyed on their inputs), so slow scripts
+    # only re-compute data when their inputs have changed.
+    if args.force_compute:
+        set_result_cache(refresh=True)
 
     return args
 
@@ -52,6 +57,26 @@ def time_to_str(time):
     return s
 
 
+def check_missing_times(times, found, what='snapshots'):
+    """Raise a ValueError if some time values were not found.
+
+    Parameters
+    ----------
+    times : list(float)
+        Requested time values.
+    found : numpy.array
+        Boolean mask of the time values found (None if nothing was found).
+    what : str, optional
+        Description of the data, used in the message.
+
+    """
+    if found is None or not numpy.any(found):
+        raise ValueError(f'no {what} found for the requested time values')
+    if not numpy.all(found):
+        missing = [t for t, ok in zip(times, found) if not ok]
+        raise ValueError(f'{what} not found for time values {missing}')
+
+
 def get_saved_times(directory, limits=None, stride=1):
     """Return array of time values saved as folders in a directory.
 
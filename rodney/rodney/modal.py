@@ -0,0 +1,299 @@
+"""Assistant module for the modal decomposition of sampled planes.
+
+The proper orthogonal decomposition (POD) of the snapshots of a plane is
+computed with a streaming, randomized singular value decomposition:
+snapshots are buffered in small batches and each batch updates a
+truncated SVD (incremental update of Brand; the part of a batch outside
+the current basis is compressed with a randomized range finder), so that
+the snapshot matrix is never assembled and the memory footprint only
+depends on the number of points, the rank, and the batch size.
+The dynamic mode decomposition (DMD) is then computed from the POD
+temporal coefficients.
+
+"""
+
+import numpy
+
+from .misc import check_missing_times, time_to_str
+from .raw import RawReader
+from .tarball import scan_tarball
+from .velocity import _iter_surfaces
+
+
+class StreamingPOD:
+    """Streaming randomized POD of snapshots of a sampled field.
+
+    A snapshot is an array of shape (num_points,) or
+    (num_points, num_components); components are stacked in the POD
+    vectors.
+
+    Parameters
+    ----------
+    rank : int, optional
+        Number of POD modes returned; default is 20.
+    oversampling : int, optional
+        Number of additional modes kept during the updates; default is 10.
+    batch_size : int, optional
+        Number of snapshots buffered before an update; default is 50.
+    power_iters : int, optional
+        Number of power iterations of the range finder; default is 1.
+    weights : numpy.array, optional
+        Weight of each point in the inner product (e.g., cell areas);
+        default is None (uniform weights).
+    seed : int, optional
+        Seed of the random generator; default is 0.
+
+    """
+
+    def __init__(self, rank=20, oversampling=10, batch_size=50,
+                 power_iters=1, weights=None, seed=0):
+        """Initialize an empty decomposition."""
+        self.rank = rank
+        self.num_kept = rank + oversampling
+        self.batch_size = batch_size
+        self.power_iters = power_iters
+        self.weights = weights
+        self.rng = numpy.random.RandomState(seed)
+        self.shape = None
+        self.count = 0
+        self.indices = []
+        self._buffer = []
+        self._sum = None
+        self._sqrt_weights = None
+        self._offset = None
+        self._U = None
+        self._S = None
+        self._V = None
+
+    def update(self, values, index=None):
+        """Add one snapshot (with its index in the time series)."""
+        values = numpy.asarray(values, dtype='f8')
+        if self.shape is None:
+            self.shape = values.shape
+            self._sum = numpy.zeros(values.size)
+            self._sqrt_weights = self._expand_weights()
+        column = values.ravel()
+        self._sum += column
+        self._buffer.append(column * self._sqrt_weights)
+        self.indices.append(self.count if index is None else index)
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def _expand_weights(self):
+        if self.weights is None:
+            return 1.0
+        weights = numpy.asarray(self.weights, dtype='f8')
+        weights = numpy.broadcast_to(weights.reshape((-1,) + (1,) * (
+            len(self.shape) - 1)), self.shape)
+        return numpy.sqrt(weights).ravel()
+
+    def _range_finder(self, A):
+        """Return an orthonormal basis of the (approximate) range of A."""
+        if A.shape[1] > self.num_kept:
+            Y = A @ self.rng.standard_normal((A.shape[1], self.num_kept))
+            for _ in range(self.power_iters):
+                Y, _ = numpy.linalg.qr(Y)
+                Y = A @ (A.T @ Y)
+            A = Y
+        Q, _ = numpy.linalg.qr(A)
+        return Q
+
+    def _flush(self):
+        """Update the truncated SVD with the buffered snapshots."""
+        if len(self._buffer) == 0:
+            return
+        B = numpy.column_stack(self._buffer)
+        self._buffer = []
+        if self._U is None:
+            # Snapshots are shifted by the mean of the first batch, so that
+            # the final centering is only a small correction.
+            self._offset = B.mean(axis=1)
+            B -= self._offset[:, numpy.newaxis]
+            Q = self._range_finder(B)
+            u, s, vt = numpy.linalg.svd(Q.T @ B, full_matrices=False)
+            k = min(self.num_kept, s.size)
+            self._U, self._S, self._V = Q @ u[:, :k], s[:k], vt[:k].T
+            return
+        B -= self._offset[:, numpy.newaxis]
+        # Component of the batch outside the current basis
+        # (Gram-Schmidt applied twice for stability).
+        P = self._U.T @ B
+        R = B - self._U @ P
+        P2 = self._U.T @ R
+        R -= self._U @ P2
+        P += P2
+        Q = self._range_finder(R)
+        r, q, b = self._S.size, Q.shape[1], B.shape[1]
+        K = numpy.zeros((r + q, r + b))
+        K[:r, :r] = numpy.diag(self._S)
+        K[:r, r:] = P
+        K[r:, r:] = Q.T @ R
+        u, s, vt = numpy.linalg.svd(K, full_matrices=False)
+        k = min(self.num_kept, s.size)
+        self._U = self._U @ u[:r, :k] + Q @ u[r:, :k]
+        self._S = s[:k]
+        self._V = numpy.concatenate((self._V @ vt[:k, :r].T,
+                                     vt[:k, r:].T))
+
+    def result(self):
+        """Return the mean, POD modes, singular values, and coefficients.
+
+        The decomposition is that of the fluctuations about the time
+        average; the temporal coefficients are the projections of the
+        fluctuations on the modes, sorted by snapshot index.
+
+        Returns
+        -------
+        dict
+            'mean' (snapshot shape), 'modes' (rank + snapshot shape),
+            'singular_values' (rank), 'coefficients' (num_snapshots x rank),
+            and 'indices' (sorted indices of the snapshots).
+
+        """
+        self._flush()
+        mean = self._sum / self.count
+        # Centering of the decomposition: X - mean = U (W - <W>)^T with
+        # W = V S, followed by the SVD of the small matrix W - <W>.
+        W = self._V * self._S
+        W -= W.mean(axis=0)
+        a, s, bt = numpy.linalg.svd(W, full_matrices=False)
+        k = min(self.rank, s.size)
+        modes = (self._U @ bt[:k].T).T / self._sqrt_weights
+        order = numpy.argsort(self.indices, kind='stable')
+        return dict(mean=mean.reshape(self.shape),
+                    modes=modes.reshape((k,) + self.shape),
+                    singular_values=s[:k],
+                    coefficients=(a[:, :k] * s[:k])[order],
+                    indices=numpy.asarray(self.indices)[order])
+
+
+def dmd(coefficients, dt, rank=None):
+    """Compute the DMD from POD temporal coefficients.
+
+    The linear operator that advances the coefficients by one time step
+    is fitted in the POD subspace (projected DMD).
+
+    Parameters
+    ----------
+    coefficients : numpy.array
+        POD temporal coefficients, of shape (num_times, num_modes), at
+        uniformly spaced times.
+    dt : float
+        Time step between two snapshots.
+    rank : int, optional
+        Number of POD modes used; default is None (all).
+
+    Returns
+    -------
+    dict
+        'eigenvalues' (discrete-time), 'frequencies', 'growth_rates',
+        'amplitudes' (at the first snapshot), and 'vectors' (DMD modes
+        expressed in the POD basis, one column per DMD mode).
+
+    """
+    a = numpy.asarray(coefficients)[:, :rank].T
+    X1, X2 = a[:, :-1], a[:, 1:]
+    A = numpy.linalg.lstsq(X1.T, X2.T, rcond=None)[0].T
+    eigvals, vectors = numpy.linalg.eig(A)
+    amplitudes = numpy.linalg.lstsq(vectors, a[:, 0], rcond=None)[0]
+    order = numpy.argsort(-numpy.abs(amplitudes))
+    eigvals, vectors = eigvals[order], vectors[:, order]
+    return dict(eigenvalues=eigvals,
+                frequencies=numpy.angle(eigvals) / (2.0 * numpy.pi * dt),
+                growth_rates=numpy.log(numpy.abs(eigvals)) / dt,
+                amplitudes=amplitudes[order],
+                vectors=vectors)
+
+
+def _check_planes(times, pods):
+    """Raise a ValueError if some snapshots of the planes are missing."""
+    for stem, pod in pods.items():
+        found = numpy.zeros(len(times), dtype=bool)
+        found[pod.indices] = True
+        check_missing_times(times, found, what=f'snapshots of {stem}')
+
+
+class PlaneModesAccumulator:
+    """Accumulate the POD of sampled planes from tarball members.
+
+    Parameters
+    ----------
+    stems : list(str)
+        Names of the sampled planes (e.g., 'U_yNormal_x0.0').
+    times : list(float)
+        Time values of the snapshots.
+    usecols : tuple(int)
+        Indices of the velocity columns (e.g., (3, 4) for ux and uy).
+    kwargs : dict
+        Arguments of `StreamingPOD`.
+
+    """
+
+    def __init__(self, stems, times, usecols, **kwargs):
+        """Set the names of the members to accumulate."""
+        times = list(map(time_to_str, times))
+        self.members = {f'postProcessing/surfaceProfiles/{time}/{stem}.raw':
+                        (i, stem)
+                        for i, time in enumerate(times) for stem in stems}
+        self.names = set(self.members)
+        self.times = times
+        self.readers = {stem: RawReader(usecols=usecols) for stem in stems}
+        self.xyz = dict()
+        self.pods = {stem: StreamingPOD(**kwargs) for stem in stems}
+
+    def consume(self, name, f):
+        """Add the snapshot of a member."""
+        i, stem = self.members[name]
+        xyz, values = self.readers[stem].read(f)
+        self.xyz[stem] = xyz
+        self.pods[stem].update(values, index=i)
+
+    def result(self):
+        """Return the coordinates and decomposition of each plane.
+
+        A ValueError is raised if some snapshots were not found.
+
+        """
+        _check_planes(self.times, self.pods)
+        return {stem: dict(xyz=self.xyz[stem], **pod.result())
+                for stem, pod in self.pods.items()}
+
+
+def plane_modes(stems, times, usecols=(3, 4), datadir=None, tarball=None,
+                store=None, **kwargs):
+    """Compute the POD of the velocity on sampled planes.
+
+    All planes are processed with a single pass over the snapshots; see
+    `PlaneModesAccumulator` for the parameters.
+    A ValueError is raised if some snapshots are not found.
+
+    Parameters
+    ----------
+    datadir : pathlib.Path, optional
+        The surfaceProfiles directory; default is None.
+    tarball : pathlib.Path, optional
+        Tarball with the postProcessing directory; default is None.
+    store : pathlib.Path, optional
+        Columnar store of the postProcessing output; default is None.
+
+    Returns
+    -------
+    dict(str, dict)
+        Coordinates ('xyz') and decomposition (see `StreamingPOD.result`)
+        of each plane.
+
+    """
+    if datadir is None and store is None and tarball is not None:
+        accumulator = PlaneModesAccumulator(stems, times, usecols, **kwargs)
+        scan_tarball(tarball, [accumulator])
+        return accumulator.result()
+    xyzs, pods = dict(), {stem: StreamingPOD(**kwargs) for stem in stems}
+    for i, stem, xyz, values in _iter_surfaces(
+        times, stems, usecols, datadir=datadir, tarball=tarball, store=store
+    ):
+        xyzs[stem] = xyz
+        pods[stem].update(values, index=i)
+    _check_planes(times, pods)
+    return {stem: dict(xyz=xyzs[stem], **pod.result())
+            for stem, pod in pods.items()}
@@ -0,0 +1,123 @@
+"""Assistant module with one-pass statistics of sampled fields.
+
+Moments are updated snapshot by snapshot (Welford) or block by block
+(pairwise combination of Chan et al.), so that the mean, the variance,
+and the extrema of a field are obtained with a single read of the data.
+
+"""
+
+import numpy
+
+
+class RunningMoments:
+    """Streaming mean, variance, and extrema of a sampled field.
+
+    A snapshot is an array of shape (num_points,) for a scalar field,
+    or (num_points, num_components) for a vector field; in the latter case,
+    the covariance between components is also computed.
+
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+        self.is_vector = None
+
+    def update(self, values):
+        """Add one snapshot."""
+        self.update_batch(numpy.asarray(values)[numpy.newaxis])
+
+    def update_batch(self, values):
+        """Add a block of snapshots stacked along the first axis."""
+        values = numpy.asarray(values, dtype='f8')
+        num = values.shape[0]
+        if num == 0:
+            return
+        if self.is_vector is None:
+            self.is_vector = values.ndim == 3
+        mean = values.mean(axis=0)
+        dev = values - mean
+        if self.is_vector:
+            m2 = numpy.einsum('t...i,t...j->...ij', dev, dev)
+        else:
+            m2 = numpy.einsum('t...,t...->...', dev, dev)
+        self._combine(num, mean, m2, values.min(axis=0), values.max(axis=0))
+
+    def merge(self, other):
+        """Add the statistics of another set of snapshots."""
+        if other.count == 0:
+            return
+        if self.is_vector is None:
+            self.is_vector = other.is_vector
+        self._combine(other.count, other._mean, other._m2,
+                      other._min, other._max)
+
+    def _combine(self, num, mean, m2, vmin, vmax):
+        if self.count == 0:
+            self.count = num
+            self._mean, self._m2 = mean.copy(), m2.copy()
+            self._min, self._max = vmin.copy(), vmax.copy()
+            return
+        total = self.count + num
+        delta = mean - self._mean
+        self._mean += delta * (num / total)
+        if self.is_vector:
+            delta2 = numpy.einsum('...i,...j->...ij', delta, delta)
+        else:
+            delta2 = delta**2
+        self._m2 += m2 + delta2 * (self.count * num / total)
+        numpy.minimum(self._min, vmin, out=self._min)
+        numpy.maximum(self._max, vmax, out=self._max)
+        self.count = total
+
+    @property
+    def mean(self):
+        """Time-averaged field."""
+        return self._mean
+
+    @property
+    def cov(self):
+        """Covariance between components (population, i.e. ddof=0)."""
+        return self._m2 / self.count
+
+    @property
+    def var(self):
+        """Variance of the field (of each component for a vector field)."""
+        cov = self.cov
+        if self.is_vector:
+            return numpy.diagonal(cov, axis1=-2, axis2=-1).copy()
+        return cov
+
+    @property
+    def std(self):
+        """Standard deviation (root-mean-square of the fluctuations)."""
+        return numpy.sqrt(self.var)
+
+    @property
+    def rms(self):
+        """Root-mean-square of the field."""
+        return numpy.sqrt(self._mean**2 + self.var)
+
+    @property
+    def min(self):
+        """Minimum over time."""
+        return self._min
+
+    @property
+    def max(self):
+        """Maximum over time."""
+        return self._max
+
+    def component(self, i):
+        """Return the statistics of one component of a vector field."""
+        moments = RunningMoments()
+        moments.count, moments.is_vector = self.count, False
+        moments._mean = self._mean[..., i].copy()
+        moments._m2 = self._m2[..., i, i].copy()
+        moments._min = self._min[..., i].copy()
+        moments._max = self._max[..., i].copy()
+        return moments
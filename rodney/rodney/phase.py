@@ -0,0 +1,170 @@
+"""Assistant module for phase averaging conditioned on the lift cycle.
+
+The shedding phase is the argument of the analytic signal (Hilbert
+transform) of the lift coefficient, band-passed around its dominant
+frequency; phase 0 corresponds to the maxima of the lift.
+Snapshots are assigned to phase bins and the statistics of each bin are
+accumulated with a single pass over the snapshots.
+
+"""
+
+import pathlib
+
+import numpy
+from scipy import signal
+
+from .misc import time_to_str
+from .moments import RunningMoments
+from .raw import RawReader
+from .spectral import dominant_frequencies, resample_uniform
+from .stationarity import detect_stationarity
+from .store import ColumnarStore
+from .tarball import scan_tarball
+
+
+def lift_phase(t, cl, times, limits=None, bandwidth=0.5):
+    """Return the shedding phase of the lift coefficient at given times.
+
+    Parameters
+    ----------
+    t : numpy.array
+        Time values of the lift coefficient.
+    cl : numpy.array
+        Lift coefficient.
+    times : numpy.array
+        Time values at which the phase is returned.
+    limits : tuple(float), optional
+        Time limits of the lift history used; default is None (from the
+        end of the initial transient, see `detect_stationarity`, to the
+        end of the history).
+    bandwidth : float, optional
+        Relative half-width of the band-pass filter around the dominant
+        frequency; default is 0.5.
+
+    Returns
+    -------
+    numpy.array
+        Phase in [0, 2 pi) (NaN outside the time limits).
+
+    """
+    if limits is None:
+        # The initial transient would bias the dominant frequency and
+        # the band-passed signal.
+        limits = (float(detect_stationarity(t, cl)['t_start']), numpy.inf)
+    ti, fi = resample_uniform(t, cl, limits=limits)
+    f0 = dominant_frequencies([(ti, fi)])['frequency'][0]
+    coeffs = numpy.fft.rfft(fi - fi.mean())
+    freqs = numpy.fft.rfftfreq(ti.size, d=ti[1] - ti[0])
+    coeffs[numpy.abs(freqs - f0) > bandwidth * f0] = 0.0
+    filtered = numpy.fft.irfft(coeffs, n=ti.size)
+    phase = numpy.unwrap(numpy.angle(signal.hilbert(filtered)))
+    phase = numpy.interp(times, ti, phase, left=numpy.nan, right=numpy.nan)
+    return numpy.mod(phase, 2.0 * numpy.pi)
+
+
+def phase_bins(phase, num_bins):
+    """Return the index of the phase bin of each value (-1 for NaN)."""
+    phase = numpy.asarray(phase, dtype='f8')
+    bins = numpy.full(phase.shape, -1, dtype=int)
+    valid = numpy.isfinite(phase)
+    bins[valid] = (numpy.floor(phase[valid] / (2.0 * numpy.pi) * num_bins)
+                   .astype(int) % num_bins)
+    return bins
+
+
+class PhaseAccumulator:
+    """Accumulate phase-binned statistics of sampled surfaces.
+
+    Parameters
+    ----------
+    surfaces : dict
+        Category (e.g., 'wallPressure'), stem of the raw file, and indices
+        of the value columns (None for all) of each surface, by key.
+    times : list(float)
+        Time values of the snapshots.
+    bins : numpy.array
+        Phase bin of each snapshot (snapshots with a negative bin are
+        ignored).
+    num_bins : int
+        Number of phase bins.
+
+    """
+
+    def __init__(self, surfaces, times, bins, num_bins):
+        """Set the names of the members to accumulate."""
+        times = list(map(time_to_str, times))
+        self.members = {
+            f'postProcessing/{category}/{time}/{stem}.raw': (key, b)
+            for key, (category, stem, _) in surfaces.items()
+            for time, b in zip(times, bins) if b >= 0
+        }
+        self.names = set(self.members)
+        self.readers = {key: RawReader(usecols=usecols)
+                        for key, (_, _, usecols) in surfaces.items()}
+        self.xyz = dict()
+        self.stats = {key: [RunningMoments() for _ in range(num_bins)]
+                      for key in surfaces}
+
+    def consume(self, name, f):
+        """Add the values of a member to the statistics of its bin."""
+        key, b = self.members[name]
+        xyz, values = self.readers[key].read(f)
+        self.xyz[key] = tuple(xyz.T)
+        self.stats[key][b].update(values if values.shape[1] > 1
+                                  else values[:, 0])
+
+    def result(self):
+        """Return coordinates and per-bin statistics of each surface."""
+        return {key: (self.xyz.get(key), stats)
+                for key, stats in self.stats.items()}
+
+
+def phase_average(surfaces, times, bins, num_bins, datadir=None,
+                  tarball=None, store=None):
+    """Compute the phase-binned statistics of sampled surfaces.
+
+    All surfaces and phase bins are accumulated with a single pass over
+    the snapshots (see `PhaseAccumulator` for the parameters).
+
+    Parameters
+    ----------
+    datadir : pathlib.Path, optional
+        The postProcessing directory; default is None.
+    tarball : pathlib.Path, optional
+        Tarball with the postProcessing directory; default is None.
+    store : pathlib.Path, optional
+        Columnar store of the postProcessing output; default is None.
+
+    Returns
+    -------
+    dict
+        Coordinates and list of `RunningMoments` (one per bin) by key.
+
+    """
+    if datadir is not None:
+        accumulator = PhaseAccumulator(surfaces, times, bins, num_bins)
+        for name in sorted(accumulator.names):
+            filepath = pathlib.Path(datadir) / name.split('/', 1)[1]
+            with open(filepath, 'rb') as f:
+                accumulator.consume(name, f)
+        return accumulator.result()
+    elif tarball is not None:
+        accumulator = PhaseAccumulator(surfaces, times, bins, num_bins)
+        scan_tarball(tarball, [accumulator])
+        return accumulator.result()
+    elif store is not None:
+        store = ColumnarStore(store)
+        times, bins = numpy.asarray(times, dtype='f8'), numpy.asarray(bins)
+        res = dict()
+        for key, (category, stem, usecols) in surfaces.items():
+            group = f'{category}/{stem}'
+            xyz = store.points(group)
+            names = (['p'] if category == 'wallPressure' else
+                     [['U_x', 'U_y', 'U_z'][col - 3] for col in usecols])
+            stats = [store.time_moments(group, names, times[bins == b])
+                     if numpy.any(bins == b) else RunningMoments()
+                     for b in range(num_bins)]
+            res[key] = (tuple(xyz.T), stats)
+        return res
+    raise ValueError('invalid parameters; '
+                     'datadir OR tarball OR store must be specified')
@@ -0,0 +1,263 @@
+"""Helper functions for the probes of the wake."""
+
+import pathlib
+import re
+
+import numpy
+
+from .spectral import dominant_frequencies, resample_uniform
+from .tarball import iter_tarball_members
+
+
+PROBES_REGEX = re.compile(r'postProcessing/probes/([^/]+)/([^/]+)$')
+
+_PROBE_LOCATION = re.compile(rb'^#\s*Probe\s+\d+\s*\(([^)]*)\)')
+
+_PARENTHESES = bytes.maketrans(b'()', b'  ')
+
+
+def read_probes(f, chunksize=4 * 1024**2):
+    """Read the time series of a field at probes.
+
+    The file is parsed in chunks; parentheses of vector values are
+    removed and all numbers of a chunk are decoded at once.
+    A last line that does not end with a newline (file of a running case)
+    is ignored.
+
+    Parameters
+    ----------
+    f : pathlib.Path or file object
+        Path of the file, or file object opened in binary mode.
+    chunksize : int, optional
+        Number of bytes parsed at once; default is 4 MiB.
+
+    Returns
+    -------
+    numpy.array
+        Locations of the probes, of shape (num_probes, 3).
+    numpy.array
+        Time values.
+    numpy.array
+        Values, of shape (num_times, num_probes, num_components)
+        (num_components is 1 for a scalar field).
+
+    """
+    if isinstance(f, (str, pathlib.Path)):
+        with open(f, 'rb') as infile:
+            return read_probes(infile, chunksize=chunksize)
+    locations, blocks, remainder, num_cols = [], [], b'', None
+    while True:
+        chunk = f.read(chunksize)
+        block = remainder + chunk
+        # A trailing line without newline is being written (running case).
+        end = block.rfind(b'\n') + 1
+        block, remainder = block[:end], block[end:]
+        if b'#' in block:
+            lines = block.split(b'\n')
+            for line in lines:
+                m = _PROBE_LOCATION.match(line.lstrip())
+                if m is not None:
+                    locations.append(numpy.fromstring(m[1], sep=' '))
+            block = b'\n'.join(line for line in lines
+                               if not line.lstrip().startswith(b'#'))
+        if num_cols is None:
+            for line in block.splitlines():
+                if line.strip():
+                    num_cols = len(line.translate(_PARENTHESES).split())
+                    break
+        if num_cols is not None and block.strip():
+            values = numpy.fromstring(block.translate(_PARENTHESES), sep=' ')
+            blocks.append(values.reshape(-1, num_cols))
+        if not chunk:
+            break
+    locations = numpy.array(locations).reshape(-1, 3)
+    num_probes = locations.shape[0]
+    if num_cols is None:
+        return locations, numpy.zeros(0), numpy.zeros((0, num_probes, 1))
+    data = numpy.concatenate(blocks)
+    values = data[:, 1:].reshape(data.shape[0], num_probes, -1)
+    return locations, data[:, 0], values
+
+
+def merge_probes(segments):
+    """Merge the probe time series written after each restart.
+
+    Where time ranges overlap, the segment that starts later wins.
+
+    Parameters
+    ----------
+    segments : dict(float, tuple)
+        Locations, time values, and values, keyed by the name of the
+        time directory they were written in.
+
+    Returns
+    -------
+    tuple(numpy.array)
+        Locations, time values, and values of the merged series.
+
+    """
+    starts = sorted(segments)
+    data = [segments[start] for start in starts]
+    ends = [t[0] if t.size > 0 else start
+            for start, (_, t, _) in zip(starts[1:], data[1:])] + [numpy.inf]
+    times = numpy.concatenate([t[t < end] for (_, t, _), end
+                               in zip(data, ends)])
+    values = numpy.concatenate([v[t < end] for (_, t, v), end
+                                in zip(data, ends)])
+    return data[-1][0], times, values
+
+
+def load_probes(field, datadir=None, tarball=None):
+    """Load the time series of a field at the probes.
+
+    The files written in all time directories (i.e., after each restart)
+    are merged.
+
+    Parameters
+    ----------
+    field : str
+        Name of the field (e.g., 'U' or 'UMean').
+    datadir : pathlib.Path, optional
+        The probes directory of the postProcessing output; default is None.
+    tarball : pathlib.Path, optional
+        Tarball with the postProcessing directory; default is None.
+
+    Returns
+    -------
+    tuple(numpy.array)
+        Locations, time values, and values (see `read_probes`).
+
+    """
+    segments = dict()
+    if datadir is not None:
+        for child in pathlib.Path(datadir).iterdir():
+            if (child / field).is_file():
+                segments[float(child.name)] = read_probes(child / field)
+    elif tarball is not None:
+        def match(name):
+            m = PROBES_REGEX.match(name)
+            return m is not None and m[2] == field
+
+        for name, f in iter_tarball_members(tarball, match=match):
+            segments[float(PROBES_REGEX.match(name)[1])] = read_probes(f)
+    else:
+        raise ValueError('invalid parameters; '
+                         'datadir OR tarball must be specified')
+    if len(segments) == 0:
+        raise FileNotFoundError(f'no probes found for field {field}')
+    return merge_probes(segments)
+
+
+def probe_spectra(t, values, **kwargs):
+    """Compute the spectra of all probes and components at once.
+
+    See `dominant_frequencies` for the keyword arguments.
+
+    Returns
+    -------
+    dict
+        Dominant frequency, uncertainty, secondary peaks, frequencies,
+        and power spectral densities, with the probe and the component
+        as leading axes.
+
+    """
+    signals = numpy.moveaxis(values, 0, -1)
+    res = dominant_frequencies([(t, signals)], **kwargs)
+    return {key: value.reshape(signals.shape[:-1] + value.shape[1:])
+            for key, value in res.items()}
+
+
+def probe_cross_correlation(t, values, reference=0, limits=None):
+    """Compute the cross-correlation of probes with a reference probe.
+
+    Signals are resampled on a uniform grid and correlated with FFTs;
+    the lag of the maximum correlation between two probes gives the
+    convection time between them.
+
+    Parameters
+    ----------
+    t : numpy.array
+        Time values.
+    values : numpy.array
+        Values, of shape (num_times, num_probes, num_components).
+    reference : int, optional
+        Index of the reference probe; default is 0.
+    limits : tuple(float), optional
+        Time limits; default is None (the whole series).
+
+    Returns
+    -------
+    numpy.array
+        Time lags.
+    numpy.array
+        Normalized cross-correlations, of shape
+        (num_probes, num_components, num_lags).
+    numpy.array
+        Time lag of the maximum correlation for each probe and component.
+
+    """
+    ti, fi = resample_uniform(t, numpy.moveaxis(values, 0, -1),
+                              limits=limits)
+    fi = fi - fi.mean(axis=-1, keepdims=True)
+    num = ti.size
+    nfft = 2 * num  # zero-padding avoids circular correlation
+    coeffs = numpy.fft.rfft(fi, n=nfft, axis=-1)
+    corr = numpy.fft.irfft(coeffs * numpy.conj(coeffs[reference]), n=nfft,
+                           axis=-1)
+    corr = numpy.concatenate((corr[..., -(num - 1):], corr[..., :num]),
+                             axis=-1)
+    norm = numpy.sqrt(numpy.sum(fi**2, axis=-1) *
+                      numpy.sum(fi[reference]**2, axis=-1))
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        corr = corr / norm[..., numpy.newaxis]
+    lags = (ti[1] - ti[0]) * numpy.arange(-(num - 1), num)
+    return lags, corr, lags[numpy.argmax(numpy.nan_to_num(corr), axis=-1)]
+
+
+def mean_convergence(t, mean, window=10.0, rtol=1e-3):
+    """Check the convergence of running time averages (e.g., UMean).
+
+    The change of the running average over a time window is computed for
+    all times, probes, and components at once.
+
+    Parameters
+    ----------
+    t : numpy.array
+        Time values.
+    mean : numpy.array
+        Running averages; the first axis is the time axis.
+    window : float, optional
+        Time window; default is 10.
+    rtol : float, optional
+        Relative tolerance on the change over the window; default is 1e-3.
+
+    Returns
+    -------
+    numpy.array
+        Relative change over the last window, for each probe and component.
+    numpy.array
+        Time after which the relative change stays below the tolerance
+        (NaN if not converged), for each probe and component.
+
+    """
+    t = numpy.asarray(t, dtype='f8')
+    mean = numpy.asarray(mean, dtype='f8')
+    start = numpy.searchsorted(t, t - window)
+    valid = t - window >= t[0]
+    # Changes are relative to the magnitude of vectors (components of a
+    # vector may average to zero).
+    if mean.ndim > 2:
+        scale = numpy.linalg.norm(mean, axis=-1, keepdims=True)
+    else:
+        scale = numpy.abs(mean)
+    scale = numpy.maximum(scale, numpy.finfo('f8').tiny)
+    change = numpy.abs(mean - mean[start]) / scale
+    change[~valid] = numpy.inf
+    above = change > rtol
+    # First time after the last excursion above the tolerance.
+    last = t.size - 1 - numpy.argmax(above[::-1], axis=0)
+    converged = ~above[-1]
+    index = numpy.where(numpy.any(above, axis=0), last + 1, 0)
+    t_converged = numpy.where(converged,
+                              t[numpy.minimum(index, t.size - 1)], numpy.nan)
+    return change[-1], t_converged
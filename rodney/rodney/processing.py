@@ -1,33 +1,182 @@
 """Assistant module with data processing classes."""
 
+import functools
+import hashlib
+import inspect
 import pathlib
+import pprint
 from dataclasses import dataclass
 
 import numpy
-from scipy import interpolate
-
-from .forces import force_coefficients, load_forces
-from .misc import get_stats, get_strouhal
+from numpy.lib.format import open_memmap
+
+from .cache import get_result_cache, source_fingerprint
+from .forces import ForcesAccumulator, force_coefficients, load_forces
+from .lineprofiles import (SpanwiseSpectraAccumulator, _zLine_filename,
+                           spanwise_spectra)
+from .misc import check_missing_times, get_stats, get_strouhal, time_to_str
+from .modal import PlaneModesAccumulator, dmd, plane_modes
+from .phase import lift_phase, phase_average, phase_bins
+from .probes import (load_probes, mean_convergence, probe_cross_correlation,
+                     probe_spectra)
+from .spectral import strouhal_numbers
+from .stationarity import detect_stationarity
+from .tarball import TarballScanner
 from .transforms import (apply_spatial_mask_2d, create_regular_grid_2d,
-                         sort_sections, spanwise_average)
-from .velocity import load_Ux_yNormal, load_Uxy_xNormal
-from .wallpressure import load_wall_pressure, wall_pressure_coefficient
-
-
-@dataclass
-class ForceCoefficientsData:
-    """Data and metadata for the force coefficients."""
-
-    label: str
-    simudir: pathlib.Path = None
-    times: numpy.ndarray = None
-    values: tuple = None
-    plt_kwargs: dict = None
+                         gather_sections, interpolation_operator,
+                         sections_permutation, sort_section, spanwise_reduce,
+                         spanwise_weights, uniform_sections)
+from .velocity import (UxYNormalAccumulator, UxyXNormalAccumulator,
+                       iter_Ux_yNormal, iter_Uxy_xNormal, load_Ux_yNormal,
+                       load_Uxy_xNormal)
+from .wallpressure import (WallPressureAccumulator,
+                           WallPressureSnapshotsAccumulator,
+                           load_wall_pressure, load_wall_pressure_snapshots,
+                           sectional_pressure_forces,
+                           wall_pressure_coefficient)
+
+
+def _select_arguments(func, arguments):
+    """Return the arguments accepted by a function."""
+    names = inspect.signature(func).parameters
+    return {name: value for name, value in arguments.items()
+            if name in names}
+
+
+def _cached(compute):
+    """Take the result of the `compute` method from the result cache.
+
+    The result is keyed on the fingerprint of the raw inputs (see
+    `_CaseData.raw_inputs`) and on `result_params`, called with the
+    arguments of `compute` they accept; with `cached=False`, or when the
+    raw data are provided (`raw`), the result is neither taken from nor
+    stored in the cache.
+
+    """
+    signature = inspect.signature(compute)
+
+    @functools.wraps(compute)
+    def wrapper(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        arguments = arguments.arguments
+        cache = None
+        if arguments['cached'] and arguments.get('raw') is None:
+            cache = self.result_cache()
+        if cache is None:
+            return compute(self, *args, **kwargs)
+        key = self.result_key(cache, arguments)
+        if not self.load_result(cache, key):
+            compute(self, *args, **kwargs)
+            self.save_result(cache, key)
+
+    return wrapper
+
+
+class _SnapshotWriter:
+    """Interpolate snapshots by batches and write spanwise averages.
+
+    Each snapshot holds several fields at the same sample points; the
+    fields are interpolated on a 2D grid whose first axis is spanwise,
+    averaged along it, and written as rows of single-precision arrays.
+
+    """
+
+    def __init__(self, operator, arrays, batch_size=64):
+        """Set the interpolation operator and the output arrays."""
+        self.operator = operator
+        self.arrays = arrays
+        self.batch_size = batch_size
+        self.rows, self.snapshots = [], []
+        self.found = numpy.zeros(len(arrays[0]), dtype=bool)
+
+    def add(self, row, values):
+        """Add the fields of a snapshot, of shape (num_fields, num_points)."""
+        self.found[row] = True
+        self.rows.append(row)
+        self.snapshots.append(values)
+        if len(self.rows) == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Interpolate and write the snapshots of the current batch."""
+        if len(self.rows) == 0:
+            return
+        values = self.operator(numpy.stack(self.snapshots))
+        values = numpy.nanmean(values, axis=-2)
+        for i, array in enumerate(self.arrays):
+            array[self.rows] = values[:, i]
+        self.rows, self.snapshots = [], []
+
+
+def _load_snapshots(outdir, names):
+    """Return memory maps of the time-resolved arrays of a directory."""
+    return {name: numpy.load(outdir / f'{name}.npy', mmap_mode='r')
+            for name in names}
+
+
+def compute_from_tarball(objs, times, Lz=numpy.pi, cached=True):
+    """Compute several data objects of a case with one scan of the tarball.
+
+    Parameters
+    ----------
+    objs : list
+        Data objects to compute; they must share the same tarball.
+    times : list(float)
+        Time values of the snapshots to process.
+    Lz : float, optional
+        Spanwise length used for the force coefficients; default is pi.
+    cached : bool, optional
+        If True (default), objects found in the result cache are not
+        re-computed (and the tarball is not scanned for them).
+
+    """
+    tarballs = set(obj.tarball for obj in objs)
+    if len(tarballs) != 1:
+        raise ValueError('data objects must share the same tarball')
+    tarball = tarballs.pop()
+    caches, keys = dict(), dict()
+    if cached:
+        arguments = dict(times=times, Lz=Lz, from_tarball=True)
+        for obj in objs:
+            cache = obj.result_cache()
+            if cache is not None:
+                caches[id(obj)] = cache
+                keys[id(obj)] = obj.result_key(cache, arguments)
+        objs = [obj for obj in objs if id(obj) not in caches or
+                not obj.load_result(caches[id(obj)], keys[id(obj)])]
+    if len(objs) == 0:
+        return
+    scanner = TarballScanner(tarball)
+    accumulators = [scanner.register(obj.accumulator(times)) for obj in objs]
+    scanner.run()
+    for obj, accumulator in zip(objs, accumulators):
+        if isinstance(obj, ForceCoefficientsData):
+            obj.compute(Lz=Lz, raw=accumulator.result())
+        else:
+            obj.compute(times, raw=accumulator.result())
+        if id(obj) in caches:
+            obj.save_result(caches[id(obj)], keys[id(obj)])
+
+
+class _CaseData:
+    """Paths of the output of a simulation, shared by the data objects.
+
+    Subclasses set `category`, the sub-directory of the postProcessing
+    output that holds their raw data (None for the whole directory), and
+    `raw_filenames`, the files they read in each time directory of it.
+
+    """
+
+    category = None
+    raw_filenames = ()
 
     @property
     def raw_datadir(self):
-        return (self.simudir / 'output' / 'LES' / 'postProcessing' /
-                'forces' / '0')
+        datadir = self.simudir / 'output' / 'LES' / 'postProcessing'
+        if self.category is None:
+            return datadir
+        return datadir / self.category
 
     @property
     def datadir(self):
@@ -37,6 +186,71 @@ class ForceCoefficientsData:
     def tarball(self):
         return self.simudir / 'output' / 'LES' / 'postProcessing.tar.gz'
 
+    @property
+    def store(self):
+        return self.simudir / 'output' / 'LES' / 'postProcessing.store'
+
+    @property
+    def cache(self):
+        return self.simudir / 'output' / 'LES' / 'postProcessing.cache'
+
+    def raw_files(self, times):
+        """Return the raw files read for given time values."""
+        times = list(map(time_to_str, times))
+        return [self.raw_datadir / time / filename
+                for time in times for filename in self.raw_filenames]
+
+    def raw_inputs(self, times=None, from_tarball=False, from_store=False):
+        """Return the paths of the raw data read to compute the object."""
+        if from_tarball:
+            return [self.tarball]
+        elif from_store:
+            if self.category is None:
+                return [self.store]
+            return [self.store / self.category]
+        return self.raw_files(times)
+
+    def result_cache(self):
+        """Return the cache of the computed results (None if disabled)."""
+        return get_result_cache(self.cache / 'results')
+
+    def result_key(self, cache, arguments):
+        """Return the key of the result computed with given arguments."""
+        inputs = self.raw_inputs(**_select_arguments(self.raw_inputs,
+                                                     arguments))
+        params = self.result_params(**_select_arguments(self.result_params,
+                                                        arguments))
+        return cache.key(type(self).__name__, source_fingerprint(inputs),
+                         params)
+
+    def load_result(self, cache, key):
+        """Set the computed attributes from the cache, if possible."""
+        result = cache.get(key)
+        if result is None:
+            return False
+        for attr, value in result.items():
+            setattr(self, attr, value)
+        return True
+
+    def save_result(self, cache, key):
+        """Store the computed attributes in the cache."""
+        cache.put(key, {attr: getattr(self, attr)
+                        for attr in self.result_attrs})
+
+
+@dataclass
+class ForceCoefficientsData(_CaseData):
+    """Data and metadata for the force coefficients."""
+
+    category = 'forces'
+    result_attrs = ('times', 'values')
+
+    label: str
+    simudir: pathlib.Path = None
+    times: numpy.ndarray = None
+    values: tuple = None
+    plt_kwargs: dict = None
+
     def save(self, filename):
         """Save data to file."""
         data = numpy.empty((1 + len(self.values), self.times.size))
@@ -53,17 +267,42 @@ class ForceCoefficientsData:
         with open(filepath, 'r') as infile:
             self.times, *self.values = numpy.loadtxt(infile, unpack=True)
 
-    def load_raw(self, from_tarball=False):
-        kwargs = dict(filepath=self.raw_datadir / 'forces.dat')
+    def load_raw(self, from_tarball=False, from_store=False, use_cache=False):
+        kwargs = dict(datadir=self.raw_datadir)
         if from_tarball:
-            kwargs = dict(tarball=self.tarball,
-                          name='postProcessing/forces/0/forces.dat')
+            kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
+        if use_cache and not from_store:
+            kwargs['cache'] = self.cache / 'forces'
 
         return load_forces(**kwargs)
 
-    def compute(self, from_tarball=False, Lz=numpy.pi):
-        """Load and compute the force coefficients."""
-        self.times, *self.values = self.load_raw(from_tarball=from_tarball)
+    def accumulator(self, times=None):
+        """Return a consumer of the tarball scan for the raw forces."""
+        return ForcesAccumulator(source=self.tarball)
+
+    def raw_files(self, times=None):
+        """Return the force files of all time directories."""
+        return sorted(self.raw_datadir.glob('*/forces.dat'))
+
+    def result_params(self, times=None, Lz=numpy.pi):
+        """Return the parameters that the result depends on."""
+        return dict(Lz=Lz)
+
+    @_cached
+    def compute(self, from_tarball=False, Lz=numpy.pi, from_store=False,
+                raw=None, use_cache=False, cached=True):
+        """Load and compute the force coefficients.
+
+        With `cached`, the result is taken from the result cache when the
+        raw data and parameters have not changed.
+
+        """
+        if raw is None:
+            raw = self.load_raw(from_tarball=from_tarball,
+                                from_store=from_store, use_cache=use_cache)
+        self.times, *self.values = raw
 
         self.values = force_coefficients(self.values, Lz=Lz)
 
@@ -76,99 +315,247 @@ class ForceCoefficientsData:
         cz_stats = get_stats(self.times, cz, **kwargs)
         return cd_stats, cl_stats, cz_stats
 
+    def get_stationary_stats(self, confidence=0.95, verbose=False,
+                             **kwargs):
+        """Detect the end of the transient and compute statistics.
+
+        The end of the initial transient is detected for each coefficient
+        (see `detect_stationarity` for the keyword arguments); the mean is
+        reported with the half-width of its confidence interval (`ci`).
+
+        """
+        res = detect_stationarity(self.times, numpy.stack(self.values),
+                                  confidence=confidence, **kwargs)
+        stats = tuple({key: float(value[i]) for key, value in res.items()}
+                      for i in range(len(self.values)))
+        if verbose:
+            pprint.pprint(stats)
+        return stats
+
     def get_strouhal(self, L=1.0, U=1.0, time_limits=None, order=1):
         """Compute Strouhal number from the lift-coefficient curve."""
         t = self.times
         cl = self.values[1]
         return get_strouhal(t, cl, L=L, U=U, limits=time_limits, order=order)
 
+    def get_strouhal_spectral(self, L=1.0, U=1.0, time_limits=None,
+                              **kwargs):
+        """Compute Strouhal number from the PSD of the lift coefficient.
+
+        Returns the Strouhal number, its uncertainty, and the secondary
+        peaks (see `strouhal_numbers` for the keyword arguments).
+
+        """
+        res = strouhal_numbers([(self.times, self.values[1])], L=L, U=U,
+                               limits=time_limits, **kwargs)
+        return dict(strouhal=float(res['strouhal'][0]),
+                    uncertainty=float(res['uncertainty'][0]),
+                    peaks=res['peaks'][0])
+
 
 @dataclass
-class SurfacePressureData:
+class SurfacePressureData(_CaseData):
     """Data and metadata for the surface pressure coefficient."""
 
+    category = 'wallPressure'
+    raw_filenames = ('p_snake.raw',)
+    result_attrs = ('x', 'y', 'values', 'rms')
+
     label: str
     simudir: pathlib.Path = None
     x: numpy.ndarray = None
     y: numpy.ndarray = None
     values: numpy.ndarray = None
     plt_kwargs: dict = None
-
-    @property
-    def raw_datadir(self):
-        return (self.simudir / 'output' / 'LES' / 'postProcessing' / 
-                'wallPressure')
-
-    @property
-    def datadir(self):
-        return self.simudir / 'data'
-
-    @property
-    def tarball(self):
-        return self.simudir / 'output' / 'LES' / 'postProcessing.tar.gz'
+    rms: numpy.ndarray = None
 
     def save(self, filename):
         """Save processed data to file."""
         self.datadir.mkdir(parents=True, exist_ok=True)
         filepath = self.datadir / filename
+        data = [self.x, self.y, self.values]
+        header = 'Surface pressure coefficient (x, y, cp)'
+        if self.rms is not None:
+            data.append(self.rms)
+            header = 'Surface pressure coefficient (x, y, cp, cp_rms)'
         with open(filepath, 'w') as outfile:
-            numpy.savetxt(outfile, numpy.c_[self.x, self.y, self.values],
-                          header='Surface pressure coefficient (x, y, cp)')
+            numpy.savetxt(outfile, numpy.column_stack(data), header=header)
 
     def load(self, filename):
         """Load processed data from file."""
         filepath = self.datadir / filename
         with open(filepath, 'r') as infile:
-            self.x, self.y, self.values = numpy.loadtxt(infile, unpack=True)
+            data = numpy.loadtxt(infile, unpack=True)
+        self.x, self.y, self.values = data[:3]
+        self.rms = data[3] if len(data) > 3 else None
 
-    def load_raw(self, times, from_tarball=False):
+    def load_raw(self, times, from_tarball=False, from_store=False):
         kwargs = dict(datadir=self.raw_datadir)
         if from_tarball:
             kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
+
+        return load_wall_pressure(times, moments=True, **kwargs)
+
+    def accumulator(self, times):
+        """Return a consumer of the tarball scan for the wall pressure."""
+        return WallPressureAccumulator(times, moments=True)
+
+    def result_params(self, times, Lz=None):
+        """Return the parameters that the result depends on."""
+        return dict(times=times)
+
+    @_cached
+    def compute(self, times, from_tarball=False, from_store=False,
+                raw=None, cached=True):
+        """Compute the time-averaged spanwise-averaged surface pressure.
+
+        The RMS of the pressure-coefficient fluctuations (Cp') is computed
+        from the same pass over the snapshots.
+        With `cached`, the result is taken from the result cache when the
+        raw data and parameters have not changed.
+
+        """
+        # Load instantaneous wall pressure and compute time statistics.
+        if raw is None:
+            raw = self.load_raw(times, from_tarball=from_tarball,
+                                from_store=from_store)
+        xyz, p_stats = raw
+
+        if not uniform_sections(xyz[2]):
+            # Sections with different numbers of points: reduce them at
+            # the points of the finest section, weighted by the spanwise
+            # spacing.
+            xy, (p, p_var), _ = spanwise_reduce(
+                xyz, [p_stats.mean, p_stats.var], weights='spacing'
+            )
+            index = sort_section(xy, None, return_index=True)
+            xy = tuple(v[index] for v in xy)
+            p, p_var = p[index], p_var[index]
+        else:
+            # Sort coordinates and values along the spanwise axis and
+            # per cross-section (permutation stored per mesh).
+            index, num_sections, num_per_section = sections_permutation(
+                xyz, cachedir=self.cache / 'wallPressure'
+            )
+            xy = tuple(v[index[:num_per_section]] for v in xyz[:2])
 
-        return load_wall_pressure(times, **kwargs)
-
-    def compute(self, times, from_tarball=False):
-        """Compute the time-averaged spanwise-averaged surface pressure."""
-        # Load instantaneous wall pressure and compute time averaged.
-        xyz, p = self.load_raw(times, from_tarball=from_tarball)
-
-        # Sort coordinates and values along the spanwise axis and
-        # per cross-section.
-        xyz, p = sort_sections(xyz, p)
-
-        # Compute the spanwise average wall pressure.
-        xy, p = spanwise_average(xyz, p)
+            # Compute the spanwise average wall pressure and variance.
+            p = gather_sections(p_stats.mean, index,
+                                num_sections).mean(axis=0)
+            p_var = gather_sections(p_stats.var, index,
+                                    num_sections).mean(axis=0)
 
         # Switch to wall pressure coefficient.
         cp = wall_pressure_coefficient(p)
+        cp_rms = wall_pressure_coefficient(numpy.sqrt(p_var))
 
         self.x, self.y = xy
         self.values = cp
+        self.rms = cp_rms
 
 
 @dataclass
-class UxCenterlineData:
-    """Data and metadata for the centerline wake x-velocity profile."""
+class SectionalForceCoefficientsData(_CaseData):
+    """Data and metadata for the sectional pressure-force coefficients.
+
+    The pressure force is integrated over each spanwise section of the
+    sampled wall pressure, for each snapshot; `values` holds the sectional
+    drag and lift coefficients as (time x section) arrays.
+
+    """
+
+    category = 'wallPressure'
+    raw_filenames = ('p_snake.raw',)
+    result_attrs = ('times', 'z', 'values')
 
     label: str
     simudir: pathlib.Path = None
-    x: numpy.ndarray = None
-    values: numpy.ndarray = None
+    times: numpy.ndarray = None
+    z: numpy.ndarray = None
+    values: tuple = None
     plt_kwargs: dict = None
 
-    @property
-    def raw_datadir(self):
-        return (self.simudir / 'output' / 'LES' / 'postProcessing' /
-                'surfaceProfiles')
+    def save(self, filename):
+        """Save data to a NumPy archive."""
+        self.datadir.mkdir(parents=True, exist_ok=True)
+        cd, cl = self.values
+        numpy.savez(self.datadir / filename,
+                    times=self.times, z=self.z, cd=cd, cl=cl)
 
-    @property
-    def datadir(self):
-        return self.simudir / 'data'
+    def load(self, filename):
+        """Load data from a NumPy archive."""
+        with numpy.load(self.datadir / filename) as data:
+            self.times, self.z = data['times'], data['z']
+            self.values = (data['cd'], data['cl'])
 
-    @property
-    def tarball(self):
-        return self.simudir / 'output' / 'LES' / 'postProcessing.tar.gz'
+    def load_raw(self, times, from_tarball=False, from_store=False):
+        kwargs = dict(datadir=self.raw_datadir)
+        if from_tarball:
+            kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
+
+        return load_wall_pressure_snapshots(times, **kwargs)
+
+    def accumulator(self, times):
+        """Return a consumer of the tarball scan for the wall pressure."""
+        return WallPressureSnapshotsAccumulator(times)
+
+    def result_params(self, times, Lz=None):
+        """Return the parameters that the result depends on."""
+        return dict(times=times)
+
+    @_cached
+    def compute(self, times, from_tarball=False, from_store=False,
+                raw=None, cached=True):
+        """Compute the sectional drag and lift coefficients over time.
+
+        With `cached`, the result is taken from the result cache when the
+        raw data and parameters have not changed.
+
+        """
+        if raw is None:
+            raw = self.load_raw(times, from_tarball=from_tarball,
+                                from_store=from_store)
+        xyz, p = raw
+
+        # Integrate the pressure of all snapshots over each section.
+        self.z, forces = sectional_pressure_forces(
+            xyz, p, cachedir=self.cache / 'wallPressure'
+        )
+        self.times = numpy.asarray(times, dtype='f8')
+        # Coefficients per unit span.
+        self.values = force_coefficients((forces[..., 0], forces[..., 1]),
+                                         Lz=1.0)
+
+    def spanwise_total(self):
+        """Return the drag and lift coefficients of the whole span.
+
+        Sections are weighted by their spanwise spacing; the coefficients
+        are the pressure contribution to those of `ForceCoefficientsData`.
+
+        """
+        weights = spanwise_weights(self.z)
+        return tuple(c @ weights / weights.sum() for c in self.values)
+
+
+@dataclass
+class UxCenterlineData(_CaseData):
+    """Data and metadata for the centerline wake x-velocity profile."""
+
+    category = 'surfaceProfiles'
+    raw_filenames = ('U_yNormal_x0.0.raw',)
+    nx, nz = 200, 100  # size of the interpolation grid
+    xlims, zlims = (0.0, 10.0), (-1.6, 1.6)  # extent of the grid
+    result_attrs = ('x', 'values')
+
+    label: str
+    simudir: pathlib.Path = None
+    x: numpy.ndarray = None
+    values: numpy.ndarray = None
+    plt_kwargs: dict = None
 
     def save(self, filename):
         """Save data to file."""
@@ -186,26 +573,50 @@ class UxCenterlineData:
         with open(filepath, 'r') as infile:
             self.x, self.values = numpy.loadtxt(infile, unpack=True)
 
-    def load_raw(self, times, from_tarball=False):
+    def load_raw(self, times, from_tarball=False, from_store=False):
         kwargs = dict(datadir=self.raw_datadir)
         if from_tarball:
             kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
 
         return load_Ux_yNormal(times, **kwargs)
 
-    def compute(self, times, from_tarball=False):
-        """Compute time-averaged spanwise-average x-velocity at centerline."""
-        xz, ux = self.load_raw(times, from_tarball=from_tarball)
+    def accumulator(self, times):
+        """Return a consumer of the tarball scan for the x-velocity."""
+        return UxYNormalAccumulator(times)
+
+    def result_params(self, times, Lz=None):
+        """Return the parameters that the result depends on."""
+        return dict(times=times, nx=self.nx, nz=self.nz,
+                    xlims=self.xlims, zlims=self.zlims)
 
-        nx, nz = 200, 100
-        xlims, zlims = (0.0, 10.0), (-1.6, 1.6)
+    @_cached
+    def compute(self, times, from_tarball=False, from_store=False,
+                raw=None, cached=True):
+        """Compute time-averaged spanwise-average x-velocity at centerline.
+
+        With `cached`, the result is taken from the result cache when the
+        raw data and parameters have not changed.
+
+        """
+        if raw is None:
+            raw = self.load_raw(times, from_tarball=from_tarball,
+                                from_store=from_store)
+        xz, ux = raw
+
+        nx, nz = self.nx, self.nz
+        xlims, zlims = self.xlims, self.zlims
 
         xz, ux = apply_spatial_mask_2d(xz, ux, (xlims, zlims))
 
         XZ = create_regular_grid_2d(xlims, zlims, nx, nz)
 
-        # Interpolate data on regular grid.
-        ux = interpolate.griddata(xz, ux, XZ, method='linear')
+        # Interpolate data on regular grid (weights stored per mesh).
+        operator = interpolation_operator(
+            xz, XZ, cachedir=self.cache / 'interpolation'
+        )
+        ux = operator(ux)
 
         # Average along spanwise axis (ignoring NaNs).
         ux = numpy.nanmean(ux, axis=0)
@@ -213,6 +624,84 @@ class UxCenterlineData:
         self.x = XZ[0][0]
         self.values = ux
 
+    def compute_snapshots(self, times, name='u_centerline_snapshots',
+                          from_tarball=False, from_store=False,
+                          batch_size=64):
+        """Compute the spanwise-averaged centerline x-velocity over time.
+
+        Snapshots are streamed and interpolated by batches; the
+        (time x x) array is written in single precision to
+        `datadir/name/ux.npy` (along with `times.npy` and `x.npy`).
+
+        Returns
+        -------
+        numpy.array
+            Time values.
+        numpy.array
+            Locations along the x-axis.
+        numpy.memmap
+            Time-resolved centerline x-velocity, of shape (num_times, nx).
+
+        """
+        kwargs = dict(datadir=self.raw_datadir)
+        if from_tarball:
+            kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
+
+        limits = (self.xlims, self.zlims)
+        XZ = create_regular_grid_2d(self.xlims, self.zlims, self.nx, self.nz)
+        outdir = self.datadir / name
+        outdir.mkdir(parents=True, exist_ok=True)
+        numpy.save(outdir / 'times.npy', numpy.asarray(times, dtype='f8'))
+        numpy.save(outdir / 'x.npy', XZ[0][0])
+        ux_all = open_memmap(outdir / 'ux.npy', mode='w+', dtype='f4',
+                             shape=(len(times), self.nx))
+        ux_all[:] = numpy.nan  # rows of missing snapshots
+
+        writer = None
+        for i, xz, ux in iter_Ux_yNormal(times, **kwargs):
+            xz, ux = apply_spatial_mask_2d(xz, ux, limits)
+            if writer is None:
+                operator = interpolation_operator(
+                    xz, XZ, cachedir=self.cache / 'interpolation'
+                )
+                writer = _SnapshotWriter(operator, [ux_all],
+                                         batch_size=batch_size)
+            writer.add(i, ux[numpy.newaxis])
+        if writer is not None:
+            writer.flush()
+        ux_all.flush()
+        del ux_all
+        check_missing_times(times, None if writer is None else writer.found,
+                            what='U_yNormal_x0.0 snapshots')
+
+        return self.load_snapshots(name)
+
+    def load_snapshots(self, name='u_centerline_snapshots'):
+        """Load the time-resolved centerline x-velocity (memory-mapped)."""
+        outdir = self.datadir / name
+        data = _load_snapshots(outdir, ['times', 'x', 'ux'])
+        return data['times'], data['x'], data['ux']
+
+    def xloc_series(self, val, x=None, ux=None):
+        """Return the x-location where the velocity = val for each snapshot.
+
+        Without arguments, the time-resolved velocity saved by
+        `compute_snapshots` (with default name) is used.
+
+        """
+        if ux is None:
+            _, x, ux = self.load_snapshots()
+        xlocs = numpy.full(len(ux), numpy.nan)
+        for i, values in enumerate(ux):
+            idx = numpy.where(values <= val)[0]
+            if idx.size == 0 or idx[-1] + 1 >= values.size:
+                continue
+            idx = idx[-1]
+            xlocs[i] = numpy.interp(val, values[idx:idx+2], x[idx:idx+2])
+        return xlocs
+
     def xloc(self, val):
         """Return the x-location where the velocity = val."""
         idx = numpy.where(self.values <= val)[0][-1]
@@ -230,10 +719,20 @@ class UxCenterlineData:
 
 
 @dataclass
-class VerticalVelocityProfilesData:
-    """Data and metadata for the vertical velocity profiles."""
+class VerticalVelocityProfilesData(_CaseData):
+    """Data and metadata for the vertical velocity profiles.
+
+    Each profile holds the mean x- and y-velocity ('ux' and 'uy') and the
+    Reynolds stresses ('uu', 'vv', 'ww', and 'uv').
 
+    """
+
+    category = 'surfaceProfiles'
     xlocs = [1.06, 1.54, 2.02, 4.0, 7.0, 10.0]  # locations along x-axis
+    fields = ('ux', 'uy', 'uu', 'vv', 'ww', 'uv')
+    ny, nz = 200, 100  # size of the interpolation grid
+    ylims, zlims = (-3.0, 3.0), (-1.6, 1.6)  # extent of the grid
+    result_attrs = ('y', 'values')
 
     label: str
     simudir: pathlib.Path = None
@@ -241,33 +740,22 @@ class VerticalVelocityProfilesData:
     values: dict = None
     plt_kwargs: dict = None
 
-    @property
-    def raw_datadir(self):
-        return (self.simudir / 'output' / 'LES' / 'postProcessing' /
-                'surfaceProfiles')
-
-    @property
-    def datadir(self):
-        return self.simudir / 'data'
-
-    @property
-    def tarball(self):
-        return self.simudir / 'output' / 'LES' / 'postProcessing.tar.gz'
-
     def save(self, filename):
         """Save data to file."""
-        data = numpy.empty((1 + 2 * len(self.values), self.y.size))
+        num_fields = len(self.fields)
+        data = numpy.empty((1 + num_fields * len(self.values), self.y.size))
         data[0] = self.y
         for i, xloc in enumerate(self.xlocs):
-            data[2 * i + 1] = self.values[xloc]['ux']
-            data[2 * i + 2] = self.values[xloc]['uy']
+            for j, field in enumerate(self.fields):
+                data[num_fields * i + j + 1] = self.values[xloc][field]
 
         self.datadir.mkdir(parents=True, exist_ok=True)
         filepath = self.datadir / filename
         with open(filepath, 'w') as outfile:
             numpy.savetxt(
                 outfile, data.T,
-                header=('Vertical line profile of the mean velocity '
+                header=('Vertical line profile of the mean velocity and '
+                        f'Reynolds stresses ({", ".join(self.fields)}) '
                         f'at x = {", ".join([str(v) for v in self.xlocs])}')
             )
 
@@ -277,36 +765,606 @@ class VerticalVelocityProfilesData:
         with open(filepath, 'r') as infile:
             data = numpy.loadtxt(infile, unpack=True)
         self.y = data[0]
+        # Files written before the Reynolds stresses only hold ux and uy.
+        num_fields = (data.shape[0] - 1) // len(self.xlocs)
         self.values = dict()
         for i, xloc in enumerate(self.xlocs):
-            self.values[xloc] = dict(ux=data[2 * i + 1], uy=data[2 * i + 2])
+            self.values[xloc] = {
+                field: data[num_fields * i + j + 1]
+                for j, field in enumerate(self.fields[:num_fields])
+            }
 
-    def load_raw(self, xlocs, times, from_tarball=False):
+    def load_raw(self, xlocs, times, from_tarball=False, from_store=False):
         kwargs = dict(datadir=self.raw_datadir)
         if from_tarball:
             kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
 
         return load_Uxy_xNormal(xlocs, times, **kwargs)
 
-    def compute(self, times, from_tarball=False):
-        profiles = self.load_raw(self.xlocs, times, from_tarball=from_tarball)
+    def accumulator(self, times):
+        """Return a consumer of the tarball scan for the velocity."""
+        return UxyXNormalAccumulator(self.xlocs, times)
 
-        ny, nz = 200, 100
-        ylims, zlims = (-3.0, 3.0), (-1.6, 1.6)
+    @property
+    def raw_filenames(self):
+        """Files read in each time directory."""
+        return [f'U_xNormal_x{xloc:.2f}.raw' for xloc in self.xlocs]
+
+    def result_params(self, times, Lz=None):
+        """Return the parameters that the result depends on."""
+        return dict(times=times, xlocs=self.xlocs, ny=self.ny, nz=self.nz,
+                    ylims=self.ylims, zlims=self.zlims, fields=self.fields)
+
+    @_cached
+    def compute(self, times, from_tarball=False, from_store=False,
+                raw=None, cached=True):
+        """Compute time-averaged spanwise-averaged velocity profiles.
+
+        The mean velocity and the Reynolds stresses are obtained from the
+        same pass over the snapshots.
+        With `cached`, the result is taken from the result cache when the
+        raw data and parameters have not changed.
+
+        """
+        profiles = raw
+        if profiles is None:
+            profiles = self.load_raw(self.xlocs, times,
+                                     from_tarball=from_tarball,
+                                     from_store=from_store)
+
+        ny, nz = self.ny, self.nz
+        ylims, zlims = self.ylims, self.zlims
         YZ = create_regular_grid_2d(ylims, zlims, ny, nz)
 
         for xloc in self.xlocs:
-            # Interpolate data on a 2D regular grid.
-            yz = profiles[xloc]['yz']
-            ux = interpolate.griddata(
-                yz, profiles[xloc]['ux'], YZ, method='linear'
-            )
-            uy = interpolate.griddata(
-                yz, profiles[xloc]['uy'], YZ, method='linear'
+            # Interpolate data on a 2D regular grid (weights stored per
+            # mesh and plane).
+            operator = interpolation_operator(
+                profiles[xloc]['yz'], YZ, cachedir=self.cache / 'interpolation'
             )
+            values = operator([profiles[xloc][field]
+                               for field in self.fields])
             # Average data along spanwise axis (ignoring NaNs).
-            profiles[xloc] = dict(ux=numpy.nanmean(ux, axis=0),
-                                  uy=numpy.nanmean(uy, axis=0))
+            profiles[xloc] = dict(zip(self.fields,
+                                      numpy.nanmean(values, axis=-2)))
 
         self.y = YZ[0][0]
         self.values = profiles
+
+    def compute_snapshots(self, times, name='velocity_profiles_snapshots',
+                          from_tarball=False, from_store=False,
+                          batch_size=64):
+        """Compute spanwise-averaged velocity profiles over time.
+
+        Snapshots are streamed and interpolated by batches; at each
+        location, the (time x y) arrays are written in single precision
+        to `datadir/name/ux_x<xloc>.npy` and `uy_x<xloc>.npy` (along with
+        `times.npy` and `y.npy`).
+
+        Returns
+        -------
+        numpy.array
+            Time values.
+        numpy.array
+            Locations along the y-axis.
+        dict
+            Time-resolved profiles (memory-mapped) at each location.
+
+        """
+        kwargs = dict(datadir=self.raw_datadir)
+        if from_tarball:
+            kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
+
+        YZ = create_regular_grid_2d(self.ylims, self.zlims, self.ny, self.nz)
+        outdir = self.datadir / name
+        outdir.mkdir(parents=True, exist_ok=True)
+        numpy.save(outdir / 'times.npy', numpy.asarray(times, dtype='f8'))
+        numpy.save(outdir / 'y.npy', YZ[0][0])
+        arrays, writers = dict(), dict()
+        for xloc in self.xlocs:
+            arrays[xloc] = [
+                open_memmap(outdir / f'{field}_x{xloc:.2f}.npy', mode='w+',
+                            dtype='f4', shape=(len(times), self.ny))
+                for field in ('ux', 'uy')
+            ]
+            for array in arrays[xloc]:
+                array[:] = numpy.nan  # rows of missing snapshots
+
+        for i, xloc, yz, values in iter_Uxy_xNormal(self.xlocs, times,
+                                                    **kwargs):
+            if xloc not in writers:
+                operator = interpolation_operator(
+                    yz, YZ, cachedir=self.cache / 'interpolation'
+                )
+                writers[xloc] = _SnapshotWriter(operator, arrays[xloc],
+                                                batch_size=batch_size)
+            writers[xloc].add(i, values.T)
+        for writer in writers.values():
+            writer.flush()
+        for array in sum(arrays.values(), []):
+            array.flush()
+        found = {xloc: writer.found for xloc, writer in writers.items()}
+        del arrays, writers
+        for xloc in self.xlocs:
+            check_missing_times(times, found.get(xloc),
+                                what=f'U_xNormal_x{xloc:.2f} snapshots')
+
+        return self.load_snapshots(name)
+
+    def load_snapshots(self, name='velocity_profiles_snapshots'):
+        """Load time-resolved velocity profiles (memory-mapped)."""
+        outdir = self.datadir / name
+        names = ['times', 'y'] + [f'{field}_x{xloc:.2f}'
+                                  for xloc in self.xlocs
+                                  for field in ('ux', 'uy')]
+        data = _load_snapshots(outdir, names)
+        profiles = {xloc: dict(ux=data[f'ux_x{xloc:.2f}'],
+                               uy=data[f'uy_x{xloc:.2f}'])
+                    for xloc in self.xlocs}
+        return data['times'], data['y'], profiles
+
+
+@dataclass
+class SpanwiseCorrelationData(_CaseData):
+    """Data and metadata for the spanwise spectra and correlations.
+
+    The velocity sampled along spanwise lines (lineProfiles) gives, for
+    each location along the x-axis, the one-sided energy spectrum and the
+    normalized two-point correlation of the velocity fluctuations (one
+    column per velocity component).
+
+    """
+
+    category = 'lineProfiles'
+    xlocs = [3.0, 5.0, 7.0, 10.0]  # locations along x-axis
+    result_attrs = ('k', 'dz', 'values')
+
+    label: str
+    simudir: pathlib.Path = None
+    k: numpy.ndarray = None
+    dz: numpy.ndarray = None
+    values: dict = None
+    plt_kwargs: dict = None
+
+    def save(self, filename):
+        """Save data to a NumPy archive."""
+        data = dict(k=self.k, dz=self.dz)
+        for xloc in self.xlocs:
+            data[f'spectrum_x{xloc:.1f}'] = self.values[xloc]['spectrum']
+            data[f'correlation_x{xloc:.1f}'] = (
+                self.values[xloc]['correlation']
+            )
+        self.datadir.mkdir(parents=True, exist_ok=True)
+        numpy.savez(self.datadir / filename, **data)
+
+    def load(self, filename):
+        """Load data from a NumPy archive."""
+        with numpy.load(self.datadir / filename) as data:
+            self.k, self.dz = data['k'], data['dz']
+            self.values = {
+                xloc: dict(spectrum=data[f'spectrum_x{xloc:.1f}'],
+                           correlation=data[f'correlation_x{xloc:.1f}'])
+                for xloc in self.xlocs
+            }
+
+    def load_raw(self, times, from_tarball=False):
+        kwargs = dict(datadir=self.raw_datadir)
+        if from_tarball:
+            kwargs = dict(tarball=self.tarball)
+
+        return spanwise_spectra(self.xlocs, times, **kwargs)
+
+    def accumulator(self, times):
+        """Return a consumer of the tarball scan for the spanwise lines."""
+        return SpanwiseSpectraAccumulator(self.xlocs, times)
+
+    @property
+    def raw_filenames(self):
+        """Files read in each time directory."""
+        return [_zLine_filename(xloc) for xloc in self.xlocs]
+
+    def result_params(self, times, Lz=None):
+        """Return the parameters that the result depends on."""
+        return dict(times=times, xlocs=self.xlocs)
+
+    @_cached
+    def compute(self, times, from_tarball=False, raw=None, cached=True):
+        """Compute the spanwise spectra and correlations.
+
+        Snapshots are processed in a single pass; with `cached`, the
+        result is taken from the result cache when the raw data and
+        parameters have not changed.
+
+        """
+        if raw is None:
+            raw = self.load_raw(times, from_tarball=from_tarball)
+        spectra = raw
+
+        self.values = dict()
+        for xloc in self.xlocs:
+            spectrum = spectra[xloc]
+            self.k, self.dz = spectrum.wavenumbers, spectrum.separations
+            self.values[xloc] = dict(spectrum=spectrum.spectrum,
+                                     correlation=spectrum.correlation)
+
+
+@dataclass
+class WakeProbesData(_CaseData):
+    """Data and metadata for the velocity at the wake probes.
+
+    `values` and `mean` hold the instantaneous velocity (U) and its
+    running time average (UMean), of shape (num_times, num_probes, 3).
+
+    """
+
+    category = 'probes'
+    result_attrs = ('locations', 'times', 'values', 'mean')
+
+    label: str
+    simudir: pathlib.Path = None
+    locations: numpy.ndarray = None
+    times: numpy.ndarray = None
+    values: numpy.ndarray = None
+    mean: numpy.ndarray = None
+    plt_kwargs: dict = None
+
+    def save(self, filename):
+        """Save data to a NumPy archive."""
+        self.datadir.mkdir(parents=True, exist_ok=True)
+        numpy.savez(self.datadir / filename, locations=self.locations,
+                    times=self.times, values=self.values, mean=self.mean)
+
+    def load(self, filename):
+        """Load data from a NumPy archive."""
+        with numpy.load(self.datadir / filename) as data:
+            for attr in self.result_attrs:
+                setattr(self, attr, data[attr])
+
+    def load_raw(self, from_tarball=False):
+        kwargs = dict(datadir=self.raw_datadir)
+        if from_tarball:
+            kwargs = dict(tarball=self.tarball)
+
+        return load_probes('U', **kwargs), load_probes('UMean', **kwargs)
+
+    def raw_files(self, times=None):
+        """Return the probe files of all time directories."""
+        return (sorted(self.raw_datadir.glob('*/U')) +
+                sorted(self.raw_datadir.glob('*/UMean')))
+
+    def result_params(self, times=None, Lz=None):
+        """Return the parameters that the result depends on."""
+        return dict()
+
+    @_cached
+    def compute(self, from_tarball=False, raw=None, cached=True):
+        """Load the velocity and its running average at the probes.
+
+        Only the time values found in both U and UMean are kept.
+        With `cached`, the result is taken from the result cache when the
+        raw data have not changed.
+
+        """
+        if raw is None:
+            raw = self.load_raw(from_tarball=from_tarball)
+        (self.locations, times, values), (_, mean_times, mean) = raw
+        # U and UMean may not end at the same time (e.g., partially
+        # written last line, restart); keep the times found in both.
+        self.times, rows, mean_rows = numpy.intersect1d(
+            times, mean_times, return_indices=True
+        )
+        self.values, self.mean = values[rows], mean[mean_rows]
+
+    def get_spectra(self, time_limits=None, **kwargs):
+        """Compute the spectra of the velocity at all probes at once."""
+        return probe_spectra(self.times, self.values, limits=time_limits,
+                             **kwargs)
+
+    def get_cross_correlation(self, reference=0, time_limits=None):
+        """Compute the cross-correlation with a reference probe."""
+        return probe_cross_correlation(self.times, self.values,
+                                       reference=reference,
+                                       limits=time_limits)
+
+    def get_mean_convergence(self, window=10.0, rtol=1e-3):
+        """Check the convergence of the running average (UMean)."""
+        return mean_convergence(self.times, self.mean, window=window,
+                                rtol=rtol)
+
+
+@dataclass
+class PhaseAveragedData(_CaseData):
+    """Data and metadata for phase averages conditioned on the lift cycle.
+
+    Snapshots of the wall pressure and of the x-normal planes are binned
+    according to the shedding phase of the lift coefficient (phase 0 at
+    the maxima of the lift); `cp` holds the spanwise-averaged pressure
+    coefficient for each bin, and `profiles` the spanwise-averaged
+    velocity profiles (see `VerticalVelocityProfilesData`) for each bin;
+    `counts` holds the number of wall-pressure snapshots of each bin.
+
+    """
+
+    num_bins = 8  # number of phase bins
+    xlocs = VerticalVelocityProfilesData.xlocs
+    ny, nz = VerticalVelocityProfilesData.ny, VerticalVelocityProfilesData.nz
+    ylims = VerticalVelocityProfilesData.ylims
+    zlims = VerticalVelocityProfilesData.zlims
+    result_attrs = ('phases', 'counts', 'x', 'y', 'cp',
+                    'profiles_y', 'profiles')
+
+    label: str
+    simudir: pathlib.Path = None
+    phases: numpy.ndarray = None
+    counts: numpy.ndarray = None
+    x: numpy.ndarray = None
+    y: numpy.ndarray = None
+    cp: numpy.ndarray = None
+    profiles_y: numpy.ndarray = None
+    profiles: dict = None
+    plt_kwargs: dict = None
+
+    @property
+    def surfaces(self):
+        """Sampled surfaces that are phase-averaged."""
+        surfaces = {'p_snake': ('wallPressure', 'p_snake', None)}
+        for xloc in self.xlocs:
+            surfaces[xloc] = ('surfaceProfiles', f'U_xNormal_x{xloc:.2f}',
+                              (3, 4))
+        return surfaces
+
+    def save(self, filename):
+        """Save data to a NumPy archive."""
+        data = dict(phases=self.phases, counts=self.counts, x=self.x,
+                    y=self.y, cp=self.cp, profiles_y=self.profiles_y)
+        for xloc in self.xlocs:
+            for field in ('ux', 'uy'):
+                data[f'{field}_x{xloc:.2f}'] = self.profiles[xloc][field]
+        self.datadir.mkdir(parents=True, exist_ok=True)
+        numpy.savez(self.datadir / filename, **data)
+
+    def load(self, filename):
+        """Load data from a NumPy archive."""
+        with numpy.load(self.datadir / filename) as data:
+            for attr in self.result_attrs[:-1]:
+                setattr(self, attr, data[attr])
+            self.profiles = {xloc: dict(ux=data[f'ux_x{xloc:.2f}'],
+                                        uy=data[f'uy_x{xloc:.2f}'])
+                             for xloc in self.xlocs}
+
+    def raw_files(self, times):
+        """Return the raw files of the surfaces read for given times."""
+        times = list(map(time_to_str, times))
+        return [self.raw_datadir / category / time / f'{stem}.raw'
+                for category, stem, _ in self.surfaces.values()
+                for time in times]
+
+    def raw_inputs(self, times=None, forces=None, from_tarball=False,
+                   from_store=False):
+        """Return the paths of the raw data read to compute the object.
+
+        Forces that are not provided are read from the same source.
+
+        """
+        inputs = super().raw_inputs(times, from_tarball=from_tarball,
+                                    from_store=from_store)
+        if forces is None and not (from_tarball or from_store):
+            inputs += ForceCoefficientsData(self.label,
+                                            self.simudir).raw_files()
+        return inputs
+
+    def result_params(self, times, forces=None, time_limits=None):
+        """Return the parameters that the result depends on.
+
+        Forces provided are identified by a digest of their lift history.
+
+        """
+        digest = None
+        if forces is not None:
+            digest = hashlib.sha256()
+            for values in (forces.times, forces.values[1]):
+                digest.update(numpy.ascontiguousarray(values,
+                                                      dtype='f8').tobytes())
+            digest = digest.hexdigest()
+        return dict(times=times, forces=digest, time_limits=time_limits,
+                    num_bins=self.num_bins, xlocs=self.xlocs, ny=self.ny,
+                    nz=self.nz, ylims=self.ylims, zlims=self.zlims)
+
+    @_cached
+    def compute(self, times, forces=None, time_limits=None,
+                from_tarball=False, from_store=False, cached=True):
+        """Compute the phase-averaged surface pressure and velocity profiles.
+
+        The phase is extracted from the lift coefficient of `forces`
+        (a `ForceCoefficientsData` object; computed from the same source
+        if not provided), restricted to `time_limits` (by default, from the
+        end of the initial transient; see `lift_phase`); snapshots outside
+        of it are not binned. All snapshots and bins are then processed
+        with a single pass over the raw data.
+        With `cached`, the result is taken from the result cache when the
+        raw data and parameters have not changed.
+
+        """
+        if forces is None:
+            forces = ForceCoefficientsData(self.label, self.simudir)
+            forces.compute(from_tarball=from_tarball, from_store=from_store)
+        phase = lift_phase(forces.times, forces.values[1], times,
+                           limits=time_limits)
+        bins = phase_bins(phase, self.num_bins)
+
+        kwargs = dict(datadir=self.raw_datadir)
+        if from_tarball:
+            kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
+        raw = phase_average(self.surfaces, times, bins, self.num_bins,
+                            **kwargs)
+
+        self.phases = 2.0 * numpy.pi * (numpy.arange(self.num_bins) + 0.5)
+        self.phases /= self.num_bins
+        for key, (xyz, stats) in raw.items():
+            if xyz is None:
+                raise ValueError(f'no snapshots found for surface {key}')
+
+        # Spanwise-averaged pressure coefficient of each bin.
+        xyz, stats = raw['p_snake']
+        # Counts are those of the snapshots actually read (members may be
+        # missing from an archive).
+        self.counts = numpy.array([s.count for s in stats])
+        filled = numpy.flatnonzero(self.counts)
+        p = numpy.stack([stats[b].mean for b in filled])
+        if not uniform_sections(xyz[2]):
+            # Sections with different numbers of points (see
+            # `SurfacePressureData`).
+            xy, p, _ = spanwise_reduce(xyz, p, weights='spacing')
+            index = sort_section(xy, None, return_index=True)
+            self.x, self.y = (v[index] for v in xy)
+            p = p[:, index]
+        else:
+            index, num_sections, num_per_section = sections_permutation(
+                xyz, cachedir=self.cache / 'wallPressure'
+            )
+            self.x, self.y = (v[index[:num_per_section]] for v in xyz[:2])
+            p = gather_sections(p, index, num_sections).mean(axis=-2)
+        self.cp = numpy.full((self.num_bins, self.x.size), numpy.nan)
+        self.cp[filled] = wall_pressure_coefficient(p)
+
+        # Spanwise-averaged velocity profiles of each bin.
+        YZ = create_regular_grid_2d(self.ylims, self.zlims, self.ny, self.nz)
+        self.profiles_y = YZ[0][0]
+        self.profiles = dict()
+        for xloc in self.xlocs:
+            xyz, stats = raw[xloc]
+            operator = interpolation_operator(
+                (xyz[1], xyz[2]), YZ, cachedir=self.cache / 'interpolation'
+            )
+            values = numpy.full((self.num_bins, 2, self.ny), numpy.nan)
+            filled = [b for b in range(self.num_bins) if stats[b].count > 0]
+            means = numpy.stack([stats[b].mean.T for b in filled])
+            values[filled] = numpy.nanmean(operator(means), axis=-2)
+            self.profiles[xloc] = dict(ux=values[:, 0], uy=values[:, 1])
+
+
+@dataclass
+class PlaneModesData(_CaseData):
+    """Data and metadata for the POD of the sampled planes.
+
+    For each plane (y-normal plane and x-normal planes of the
+    surfaceProfiles), `values` holds the coordinates of the points
+    ('xyz'), the time-averaged velocity ('mean'), the POD modes of the
+    velocity fluctuations ('modes'), the singular values, and the
+    temporal coefficients (see `rodney.modal.StreamingPOD`).
+
+    """
+
+    category = 'surfaceProfiles'
+    stems = (['U_yNormal_x0.0'] +
+             [f'U_xNormal_x{xloc:.2f}'
+              for xloc in VerticalVelocityProfilesData.xlocs])
+    usecols = (3, 4, 5)  # velocity components
+    rank = 20  # number of POD modes
+    result_attrs = ('times', 'values')
+
+    label: str
+    simudir: pathlib.Path = None
+    times: numpy.ndarray = None
+    values: dict = None
+    plt_kwargs: dict = None
+
+    def save(self, filename):
+        """Save data to a NumPy archive."""
+        data = dict(times=self.times)
+        for stem, values in self.values.items():
+            for key, value in values.items():
+                data[f'{stem}_{key}'] = value
+        self.datadir.mkdir(parents=True, exist_ok=True)
+        numpy.savez(self.datadir / filename, **data)
+
+    def load(self, filename):
+        """Load data from a NumPy archive."""
+        keys = ('xyz', 'mean', 'modes', 'singular_values', 'coefficients')
+        with numpy.load(self.datadir / filename) as data:
+            self.times = data['times']
+            self.values = {stem: {key: data[f'{stem}_{key}'] for key in keys}
+                           for stem in self.stems}
+
+    def load_raw(self, times, from_tarball=False, from_store=False):
+        kwargs = dict(datadir=self.raw_datadir)
+        if from_tarball:
+            kwargs = dict(tarball=self.tarball)
+        elif from_store:
+            kwargs = dict(store=self.store)
+
+        return plane_modes(self.stems, times, usecols=self.usecols,
+                           rank=self.rank, **kwargs)
+
+    def accumulator(self, times):
+        """Return a consumer of the tarball scan for the planes."""
+        return PlaneModesAccumulator(self.stems, times, self.usecols,
+                                     rank=self.rank)
+
+    @property
+    def raw_filenames(self):
+        """Files read in each time directory."""
+        return [f'{stem}.raw' for stem in self.stems]
+
+    def result_params(self, times, Lz=None):
+        """Return the parameters that the result depends on."""
+        return dict(times=times, stems=self.stems, usecols=self.usecols,
+                    rank=self.rank)
+
+    @_cached
+    def compute(self, times, from_tarball=False, from_store=False,
+                raw=None, cached=True):
+        """Compute the POD of the velocity on the sampled planes.
+
+        Snapshots are processed in a single pass with a streaming
+        randomized SVD (the snapshot matrix is never assembled); a
+        ValueError is raised if some snapshots are not found.
+        With `cached`, the result is taken from the result cache when the
+        raw data and parameters have not changed.
+
+        """
+        if raw is None:
+            raw = self.load_raw(times, from_tarball=from_tarball,
+                                from_store=from_store)
+
+        # All snapshots were found (checked by `plane_modes`), so the
+        # temporal coefficients are those of the requested times.
+        self.times = numpy.asarray(times, dtype='f8')
+        self.values = dict()
+        for stem in self.stems:
+            values = dict(raw[stem])
+            del values['indices']
+            self.values[stem] = values
+
+    def get_dmd(self, stem, rank=None):
+        """Compute the DMD of a plane from the POD temporal coefficients.
+
+        Parameters
+        ----------
+        stem : str
+            Name of the plane (e.g., 'U_yNormal_x0.0').
+        rank : int, optional
+            Number of POD modes used; default is None (all).
+
+        Returns
+        -------
+        dict
+            Eigenvalues, frequencies, growth rates, and amplitudes (see
+            `rodney.modal.dmd`), with the DMD modes on the plane ('modes').
+
+        """
+        dt = numpy.diff(self.times)
+        if not numpy.allclose(dt, dt[0], rtol=1e-6):
+            raise ValueError('snapshots must be uniformly spaced in time')
+        values = self.values[stem]
+        res = dmd(values['coefficients'], dt[0], rank=rank)
+        modes = values['modes'][:res['vectors'].shape[0]]
+        res['modes'] = numpy.tensordot(res.pop('vectors'), modes,
+                                       axes=(0, 0))
+        return res
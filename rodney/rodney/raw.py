@@ -0,0 +1,121 @@
+"""Fast parser for OpenFOAM raw surface and set files.
+
+Sampled surfaces and sets are written at the same points for every time.
+The parser decodes the coordinates of the first snapshot only; for the
+following snapshots, the bytes of the coordinate columns are compared to
+the first ones, and only the value columns are decoded.
+Columns are located with vectorized operations on the raw bytes.
+
+"""
+
+import numpy
+
+
+def _skip_header(data):
+    """Return the position of the first line that is not a comment."""
+    start = 0
+    while data.startswith(b'#', start):
+        start = data.index(b'\n', start) + 1
+    return start
+
+
+def _tokenize(buf):
+    """Return start positions and lengths of whitespace-separated tokens.
+
+    The length of a token includes the whitespaces that follow it.
+
+    """
+    is_space = buf <= ord(' ')
+    starts = ~is_space
+    starts[1:] &= is_space[:-1]
+    starts = numpy.flatnonzero(starts)
+    return starts, numpy.diff(numpy.append(starts, buf.size))
+
+
+def _decode(data):
+    """Decode whitespace-separated numbers."""
+    return numpy.fromstring(data, sep=' ')
+
+
+class RawReader:
+    """Reader of raw files sampled at fixed points.
+
+    Parameters
+    ----------
+    num_coords : int, optional
+        Number of coordinate columns; default is 3 (surface files).
+        Use 1 for set files sampled along an axis.
+    usecols : tuple(int), optional
+        Indices of the value columns to decode (counting the coordinate
+        columns); default is None (all value columns).
+
+    """
+
+    def __init__(self, num_coords=3, usecols=None):
+        """Initialize the reader."""
+        self.num_coords = num_coords
+        self.usecols = usecols
+        self.num_cols = None
+        self.names = None
+        self.coords = None
+        self._coords_bytes = None
+        self._lookup = None
+
+    def _initialize(self, data, start):
+        end = data.find(b'\n', start)
+        self.num_cols = len(data[start:end if end >= 0 else None].split())
+        # Column names are on the last line of the header (if any).
+        header = data[:start].splitlines()
+        if len(header) > 0:
+            names = header[-1][1:].decode().split()
+            if len(names) == self.num_cols:
+                self.names = names
+        usecols = self.usecols
+        if usecols is None:
+            usecols = range(self.num_coords, self.num_cols)
+        self._lookup = numpy.zeros(self.num_cols, dtype=bool)
+        self._lookup[list(usecols)] = True
+        self.num_values = int(numpy.count_nonzero(self._lookup))
+
+    def read(self, f):
+        """Read a raw file.
+
+        Parameters
+        ----------
+        f : file object or bytes
+            File opened in binary mode, or its content.
+
+        Returns
+        -------
+        numpy.ndarray
+            Coordinates of the points, of shape (num_points, num_coords).
+        numpy.ndarray
+            Values at the points, of shape (num_points, num_values).
+
+        """
+        data = f if isinstance(f, bytes) else f.read()
+        start = _skip_header(data)
+        if self.num_cols is None:
+            self._initialize(data, start)
+        buf = numpy.frombuffer(data, dtype=numpy.uint8, offset=start)
+        starts, lengths = _tokenize(buf)
+        if starts.size % self.num_cols != 0:
+            raise ValueError('number of values is not a multiple of '
+                             f'the number of columns ({self.num_cols})')
+        buf = buf[starts[0]:] if starts.size > 0 else buf
+        col = numpy.arange(starts.size) % self.num_cols
+
+        is_coord = numpy.repeat(col < self.num_coords, lengths)
+        coords_bytes = buf[is_coord].tobytes()
+        if self.coords is None:
+            coords = _decode(coords_bytes).reshape(-1, self.num_coords)
+            self.coords, self._coords_bytes = coords, coords_bytes
+        elif coords_bytes != self._coords_bytes:
+            coords = _decode(coords_bytes).reshape(-1, self.num_coords)
+            if (coords.shape != self.coords.shape or
+                    not numpy.allclose(coords, self.coords)):
+                raise ValueError('sample points differ from first snapshot')
+
+        is_value = numpy.repeat(self._lookup[col], lengths)
+        values = _decode(buf[is_value].tobytes())
+        return self.coords, values.reshape(-1, self.num_values)
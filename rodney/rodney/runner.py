@@ -0,0 +1,167 @@
+"""Parallel runner of post-processing scripts.
+
+Each script is a task that declares its inputs (e.g., tarballs, data files)
+and outputs (e.g., figures) with glob patterns relative to the parent of
+the scripts directory (the `maindir` of the scripts).
+Tasks are ordered in a dependency graph (a task depends on the tasks that
+produce its inputs); independent tasks run concurrently in a bounded pool
+of processes, and tasks whose outputs are newer than their inputs (and
+than the script itself) are skipped.
+
+"""
+
+import fnmatch
+import glob
+import os
+import pathlib
+import runpy
+import shlex
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Task:
+    """Post-processing script with its inputs and outputs."""
+
+    script: pathlib.Path
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    args: str = ''
+
+    @property
+    def maindir(self):
+        return pathlib.Path(self.script).parents[1]
+
+    @property
+    def name(self):
+        return str(self.script)
+
+    def patterns(self, patterns):
+        """Return absolute glob patterns."""
+        return [os.path.normpath(self.maindir / pattern)
+                for pattern in patterns]
+
+    def _paths(self, patterns):
+        paths = []
+        for pattern in self.patterns(patterns):
+            paths += glob.glob(pattern, recursive=True)
+        return paths
+
+    def depends_on(self, other):
+        """Check if an input of the task is an output of another task."""
+        return any(fnmatch.fnmatch(output, pattern) or
+                   fnmatch.fnmatch(pattern, output)
+                   for pattern in self.patterns(self.inputs)
+                   for output in other.patterns(other.outputs))
+
+    def is_up_to_date(self):
+        """Check all outputs exist and are newer than inputs and script."""
+        newest = os.path.getmtime(self.script)
+        for path in self._paths(self.inputs):
+            newest = max(newest, os.path.getmtime(path))
+        if len(self.outputs) == 0:
+            return False
+        oldest = None
+        for pattern in self.patterns(self.outputs):
+            paths = glob.glob(pattern, recursive=True)
+            if len(paths) == 0:
+                return False
+            mtime = min(os.path.getmtime(path) for path in paths)
+            oldest = mtime if oldest is None else min(oldest, mtime)
+        return oldest >= newest
+
+    def command(self):
+        """Return the command line of the task."""
+        return [sys.executable, str(self.script)] + shlex.split(self.args)
+
+    def run(self):
+        """Run the script and return its exit code."""
+        proc = subprocess.run(self.command(), cwd=self.maindir)
+        return proc.returncode
+
+
+def collect_tasks(rootdir):
+    """Return the tasks declared in all `process_all.py` files of a tree.
+
+    A `process_all.py` file declares its tasks in a list named `tasks`
+    and only runs them when executed as a script.
+
+    """
+    tasks = []
+    for filepath in sorted(pathlib.Path(rootdir).glob('**/process_all.py')):
+        tasks += runpy.run_path(str(filepath),
+                                run_name='process_all').get('tasks', [])
+    return tasks
+
+
+def build_graph(tasks):
+    """Return the indices of the tasks each task depends on."""
+    return [set(j for j, other in enumerate(tasks)
+                if j != i and task.depends_on(other))
+            for i, task in enumerate(tasks)]
+
+
+def run_tasks(tasks, max_workers=None, force=False, dry_run=False):
+    """Run tasks in dependency order with a bounded pool of processes.
+
+    Parameters
+    ----------
+    tasks : list(Task)
+        Tasks to run.
+    max_workers : int, optional
+        Maximum number of scripts running concurrently;
+        default is None (number of CPUs).
+    force : bool, optional
+        If True, run tasks even if their outputs are up-to-date;
+        default is False.
+    dry_run : bool, optional
+        If True, only print the tasks that would run; default is False.
+
+    Returns
+    -------
+    dict
+        Status of each task ('done', 'skipped', 'failed', or 'cancelled')
+        with the script path as key.
+
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    deps = build_graph(tasks)
+    status = dict()
+    pending = set(range(len(tasks)))
+    running = dict()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(pending) > 0 or len(running) > 0:
+            ready = [i for i in sorted(pending)
+                     if not any(j in pending or j in running.values()
+                                for j in deps[i])]
+            if len(ready) == 0 and len(running) == 0:
+                raise ValueError('cyclic dependencies between tasks: ' +
+                                 ', '.join(tasks[i].name for i in pending))
+            for i in ready:
+                pending.remove(i)
+                task = tasks[i]
+                if any(status[tasks[j].name] in ('failed', 'cancelled')
+                       for j in deps[i]):
+                    status[task.name] = 'cancelled'
+                elif not force and task.is_up_to_date():
+                    status[task.name] = 'skipped'
+                elif dry_run:
+                    print(f'[INFO] Would run script {task.script}')
+                    status[task.name] = 'done'
+                else:
+                    print(f'[INFO] Running script {task.script} ...')
+                    running[executor.submit(task.run)] = i
+            if len(running) == 0:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = tasks[running.pop(future)]
+                failed = future.exception() is not None or future.result()
+                status[task.name] = 'failed' if failed else 'done'
+                if failed:
+                    print(f'[ERROR] Script {task.script} failed')
+    return status
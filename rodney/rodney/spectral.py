@@ -0,0 +1,186 @@
+"""Assistant module with spectral analysis of time series.
+
+Signals sampled with an adjustable time step are interpolated onto uniform
+grids with the same number of samples; their power spectral densities are
+then computed with a single call to Welch's method (in cycles per sample)
+and scaled with the time step of each signal.
+
+"""
+
+import numpy
+from scipy import ndimage, signal
+
+
+def resample_uniform(t, f, num=None, limits=None):
+    """Interpolate signals onto a uniform time grid.
+
+    Parameters
+    ----------
+    t : numpy.array
+        Time values (not necessarily uniformly spaced).
+    f : numpy.array
+        Signals; the last axis is the time axis.
+    num : int, optional
+        Number of samples of the uniform grid; default is None
+        (same number of samples as the signals in the time limits).
+    limits : tuple(float), optional
+        Time limits; default is None (the whole signals).
+
+    Returns
+    -------
+    numpy.array
+        Uniform time values.
+    numpy.array
+        Interpolated signals.
+
+    """
+    t = numpy.asarray(t, dtype='f8')
+    f = numpy.asarray(f, dtype='f8')
+    if limits is None:
+        limits = (0.0, numpy.inf)
+    mask = (t >= limits[0]) & (t <= limits[1])
+    t, f = t[mask], f[..., mask]
+    if num is None:
+        num = t.size
+    ti = numpy.linspace(t[0], t[-1], num=num)
+    # Linear interpolation of all signals at once.
+    index = numpy.clip(numpy.searchsorted(t, ti, side='right') - 1,
+                       0, t.size - 2)
+    weights = (ti - t[index]) / (t[index + 1] - t[index])
+    fi = f[..., index] * (1.0 - weights) + f[..., index + 1] * weights
+    return ti, fi
+
+
+def _local_peaks(psd, width):
+    """Return a mask of the maxima over windows of +/- `width` bins.
+
+    Side lobes of a peak (within its main lobe) are therefore not
+    reported as peaks, nor is the leakage of the mean at low frequencies.
+
+    """
+    mask = psd == ndimage.maximum_filter1d(psd, 2 * width + 1, axis=-1,
+                                           mode='nearest')
+    mask[..., :width + 1] = False
+    mask[..., -1] = False
+    return mask & (psd > 0.0)
+
+
+def _refine_peaks(psd, index):
+    """Return the fractional bin index of peaks (parabolic interpolation)."""
+    index = numpy.clip(index, 1, psd.shape[-1] - 2)
+    a, b, c = (numpy.log(numpy.maximum(
+        numpy.take_along_axis(psd, index + shift, axis=-1),
+        numpy.finfo('f8').tiny
+    )) for shift in (-1, 0, 1))
+    denom = a - 2.0 * b + c
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        delta = numpy.where(denom < 0.0, 0.5 * (a - c) / denom, 0.0)
+    return index + numpy.clip(delta, -0.5, 0.5)
+
+
+def dominant_frequencies(signals, limits=None, num=None, nperseg=None,
+                         oversampling=4, num_peaks=3):
+    """Estimate the dominant frequency of signals from their PSD.
+
+    Signals of several cases are processed at once: each signal is
+    resampled onto a uniform grid with the same number of samples and all
+    spectra are computed with a single call to Welch's method.
+
+    Parameters
+    ----------
+    signals : list(tuple(numpy.array))
+        Time values and signals of each case; the signals of a case
+        (e.g., drag and lift coefficients) share their time values,
+        with the last axis being the time axis.
+    limits : tuple(float), optional
+        Time limits; default is None (the whole signals).
+    num : int, optional
+        Number of samples of the uniform grids; default is None
+        (smallest number of samples among the cases).
+    nperseg : int, optional
+        Number of samples per Welch segment; default is None (num // 2,
+        i.e. three segments with 50% overlap, which favors the frequency
+        resolution over the variance of the spectra).
+    oversampling : int, optional
+        Zero-padding factor of the segments; default is 4.
+    num_peaks : int, optional
+        Number of secondary peaks to report; default is 3.
+
+    Returns
+    -------
+    dict
+        For each signal (stacked along the first axis, in the order of the
+        cases), the dominant frequency (`frequency`), its uncertainty
+        (`uncertainty`, half-width at half-maximum of the peak, at least
+        half the frequency resolution of the segments), the frequencies
+        and powers of the secondary peaks (`peaks`, `powers`; NaN when
+        missing), and the frequencies and densities of the spectra
+        (`freqs`, `psd`).
+
+    """
+    if limits is None:
+        limits = (0.0, numpy.inf)
+    if num is None:
+        num = min(numpy.count_nonzero((t >= limits[0]) & (t <= limits[1]))
+                  for t, _ in signals)
+    grids, values = [], []
+    for t, f in signals:
+        ti, fi = resample_uniform(t, f, num=num, limits=limits)
+        fi = fi.reshape((-1, num))
+        grids.append(numpy.full(fi.shape[0], ti[1] - ti[0]))
+        values.append(fi)
+    dt, values = numpy.concatenate(grids), numpy.concatenate(values)
+
+    if nperseg is None:
+        nperseg = num // 2
+    # Spectra in cycles per sample, scaled with the time step of each signal.
+    freqs, psd = signal.welch(values, fs=1.0, nperseg=nperseg,
+                              noverlap=nperseg // 2,
+                              nfft=oversampling * nperseg,
+                              detrend='constant', axis=-1)
+    psd[..., 0] = 0.0  # ignore the mean
+    freqs = freqs / dt[:, numpy.newaxis]
+    psd = psd * dt[:, numpy.newaxis]
+    df = freqs[:, 1] - freqs[:, 0]
+
+    # Local maxima (apart by more than the main lobe of the Hann window)
+    # sorted by decreasing power.
+    mask = _local_peaks(psd, 2 * oversampling)
+    peaks = numpy.where(mask, psd, -numpy.inf)
+    order = numpy.argsort(-peaks, axis=-1)[..., :num_peaks + 1]
+    found = numpy.isfinite(numpy.take_along_axis(peaks, order, axis=-1))
+    position = _refine_peaks(psd, order)
+    peak_freqs = numpy.where(found, position * df[:, numpy.newaxis],
+                             numpy.nan)
+    peak_powers = numpy.where(
+        found, numpy.take_along_axis(psd, order, axis=-1), numpy.nan
+    )
+
+    # Half-width at half-maximum of the dominant peak.
+    main = order[:, 0]
+    below = psd < 0.5 * peak_powers[:, :1]
+    bins = numpy.arange(psd.shape[-1])
+    left = numpy.max(numpy.where(below & (bins < main[:, numpy.newaxis]),
+                                 bins, 0), axis=-1)
+    right = numpy.min(numpy.where(below & (bins > main[:, numpy.newaxis]),
+                                  bins, bins[-1]), axis=-1)
+    hwhm = 0.5 * (right - left) * df
+    uncertainty = numpy.maximum(hwhm, 0.5 * oversampling * df)
+
+    return dict(frequency=peak_freqs[:, 0], uncertainty=uncertainty,
+                peaks=peak_freqs[:, 1:], powers=peak_powers[:, 1:],
+                freqs=freqs, psd=psd)
+
+
+def strouhal_numbers(signals, L=1.0, U=1.0, **kwargs):
+    """Return the Strouhal numbers of signals and their uncertainties.
+
+    See `dominant_frequencies` for the parameters; frequencies of the
+    returned dictionary are scaled into Strouhal numbers.
+
+    """
+    res = dominant_frequencies(signals, **kwargs)
+    for key in ('frequency', 'uncertainty', 'peaks', 'freqs'):
+        res[key] = res[key] * L / U
+    res['strouhal'] = res.pop('frequency')
+    return res
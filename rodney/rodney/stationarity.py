@@ -0,0 +1,153 @@
+"""Assistant module to detect the initial transient of time series.
+
+The end of the transient is detected with the MSER-m rule (Marginal
+Standard Error Rule applied to batch means): the truncation point is the
+one that minimizes the standard error of the mean of the retained batches.
+The mean of the retained samples is reported with a confidence interval
+obtained with non-overlapping batch means.
+
+All functions process the last axis of the signals, so that several
+signals of the same length (e.g., the drag and lift coefficients) are
+processed at once; samples are given equal weights.
+
+"""
+
+import numpy
+from scipy import stats
+
+
+def mser(f, batch_size=10, max_fraction=0.5):
+    """Return the index of the first sample after the initial transient.
+
+    Parameters
+    ----------
+    f : numpy.array
+        Signals; the last axis is the time axis.
+    batch_size : int, optional
+        Number of samples per batch; default is 10.
+    max_fraction : float, optional
+        Maximum fraction of the signal that can be truncated;
+        default is 0.5.
+
+    Returns
+    -------
+    numpy.array
+        Index of the first retained sample of each signal.
+
+    """
+    f = numpy.asarray(f, dtype='f8')
+    num_batches = f.shape[-1] // batch_size
+    offset = f.shape[-1] - num_batches * batch_size
+    batches = f[..., offset:].reshape(f.shape[:-1] + (num_batches,
+                                                      batch_size))
+    y = batches.mean(axis=-1)
+    # Sums over the retained batches for all truncation points at once.
+    s1 = numpy.cumsum(y[..., ::-1], axis=-1)[..., ::-1]
+    s2 = numpy.cumsum(y[..., ::-1]**2, axis=-1)[..., ::-1]
+    num = numpy.arange(num_batches, 0, -1)
+    stat = (s2 - s1**2 / num) / num**2
+    max_batches = max(1, int(max_fraction * num_batches))
+    return offset + numpy.argmin(stat[..., :max_batches],
+                                 axis=-1) * batch_size
+
+
+def batch_means(f, start=0, num_batches=20, confidence=0.95):
+    """Return the mean of signals and the half-width of its interval.
+
+    Parameters
+    ----------
+    f : numpy.array
+        Signals; the last axis is the time axis.
+    start : int or numpy.array, optional
+        Index of the first retained sample of each signal; default is 0.
+    num_batches : int, optional
+        Number of batches; default is 20.
+    confidence : float, optional
+        Confidence level of the interval; default is 0.95.
+
+    Returns
+    -------
+    numpy.array
+        Mean of the retained samples.
+    numpy.array
+        Half-width of the confidence interval of the mean.
+
+    """
+    f = numpy.asarray(f, dtype='f8')
+    n = f.shape[-1]
+    start = numpy.broadcast_to(start, f.shape[:-1])[..., numpy.newaxis]
+    cumsum = numpy.concatenate((numpy.zeros(f.shape[:-1] + (1,)),
+                                numpy.cumsum(f, axis=-1)), axis=-1)
+    edges = start + (n - start) * numpy.arange(num_batches + 1) // num_batches
+    sums = numpy.take_along_axis(cumsum, edges, axis=-1)
+    y = numpy.diff(sums, axis=-1) / numpy.diff(edges, axis=-1)
+    mean = (sums[..., -1] - sums[..., 0]) / (n - start[..., 0])
+    t = stats.t.ppf(0.5 * (1.0 + confidence), num_batches - 1)
+    halfwidth = t * y.std(axis=-1, ddof=1) / numpy.sqrt(num_batches)
+    return mean, halfwidth
+
+
+def running_mean(f, start=0):
+    """Return the running mean of signals from a given sample.
+
+    Values before the first retained sample are NaN.
+
+    """
+    f = numpy.asarray(f, dtype='f8')
+    n = f.shape[-1]
+    start = numpy.broadcast_to(start, f.shape[:-1])[..., numpy.newaxis]
+    index = numpy.arange(n)
+    f = numpy.where(index >= start, f, 0.0)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        res = numpy.cumsum(f, axis=-1) / (index + 1 - start)
+    return numpy.where(index >= start, res, numpy.nan)
+
+
+def detect_stationarity(t, f, batch_size=10, max_fraction=0.5,
+                        num_batches=20, confidence=0.95):
+    """Detect the end of the transient and compute stationary statistics.
+
+    Parameters
+    ----------
+    t : numpy.array
+        Time values.
+    f : numpy.array
+        Signals; the last axis is the time axis.
+    batch_size : int, optional
+        Number of samples per batch of the MSER-m rule; default is 10.
+    max_fraction : float, optional
+        Maximum fraction of the signal that can be truncated;
+        default is 0.5.
+    num_batches : int, optional
+        Number of batches of the confidence interval; default is 20.
+    confidence : float, optional
+        Confidence level of the interval; default is 0.95.
+
+    Returns
+    -------
+    dict
+        Time of the end of the transient (`t_start`), mean, half-width of
+        the confidence interval (`ci`), standard deviation, and time after
+        which the running mean stays within the confidence interval of the
+        final mean (`t_converged`), for each signal.
+
+    """
+    t = numpy.asarray(t, dtype='f8')
+    f = numpy.asarray(f, dtype='f8')
+    start = mser(f, batch_size=batch_size, max_fraction=max_fraction)
+    mean, halfwidth = batch_means(f, start=start, num_batches=num_batches,
+                                  confidence=confidence)
+    index = numpy.arange(f.shape[-1])
+    retained = index >= start[..., numpy.newaxis]
+    dev = numpy.where(retained, f - mean[..., numpy.newaxis], 0.0)
+    var = numpy.sum(dev**2, axis=-1) / (f.shape[-1] - start)
+    rmean = running_mean(f, start=start)
+    outside = (numpy.abs(rmean - mean[..., numpy.newaxis]) >
+               halfwidth[..., numpy.newaxis])
+    # First sample after the last excursion of the running mean.
+    last = f.shape[-1] - 1 - numpy.argmax(outside[..., ::-1], axis=-1)
+    converged = numpy.where(numpy.any(outside, axis=-1),
+                            numpy.minimum(last + 1, f.shape[-1] - 1), start)
+    return dict(t_start=t[start], mean=mean, ci=halfwidth,
+                std=numpy.sqrt(var),
+                t_converged=t[converged])
@@ -0,0 +1,261 @@
+"""Columnar time-series store of the postProcessing output.
+
+The ASCII output of the OpenFOAM function objects is converted into a
+binary store (one per case).
+For each sampled surface, the point coordinates are stored once and each
+field component is stored as a (time x point) array in NumPy format;
+arrays are read back through memory maps.
+
+Layout of the store::
+
+    <storedir>/wallPressure/p_snake/{times,points,p}.npy
+    <storedir>/surfaceProfiles/U_xNormal_x1.06/{times,points,U_x,U_y,U_z}.npy
+    <storedir>/forces/<restart time>/forces.npy
+
+"""
+
+import pathlib
+import re
+
+import numpy
+from numpy.lib.format import open_memmap
+
+from .forces import FORCES_REGEX, read_forces
+from .moments import RunningMoments
+from .raw import RawReader
+from .tarball import scan_tarball
+
+
+SURFACE_REGEX = re.compile(
+    r'postProcessing/(wallPressure|surfaceProfiles)/([^/]+)/([^/]+)\.raw$'
+)
+
+
+class _SurfaceWriter:
+    """Append snapshots of a sampled surface and write the arrays.
+
+    Each field is appended to a temporary file kept open until the arrays
+    are written.
+
+    """
+
+    def __init__(self, groupdir):
+        """Set the directory of the group."""
+        self.groupdir = groupdir
+        self.groupdir.mkdir(parents=True, exist_ok=True)
+        self.times = []
+        self.reader = RawReader()
+        self.fields = None
+        self.num_points = None
+        self.outfiles = dict()
+
+    def _tmppath(self, name):
+        return self.groupdir / f'{name}.tmp'
+
+    def append(self, time, f):
+        """Append the snapshot of a raw surface file."""
+        points, values = self.reader.read(f)
+        if self.fields is None:
+            names = self.reader.names
+            if names is None:
+                names = ['x', 'y', 'z'] + [f'f{i}'
+                                           for i in range(values.shape[1])]
+            self.fields = names[3:]
+            self.num_points = values.shape[0]
+            numpy.save(self.groupdir / 'points.npy', points)
+            self.outfiles = {name: open(self._tmppath(name), 'wb')
+                             for name in self.fields}
+        for i, name in enumerate(self.fields):
+            self.outfiles[name].write(
+                numpy.ascontiguousarray(values[:, i], dtype='f8').tobytes()
+            )
+        self.times.append(time)
+
+    def close(self):
+        """Close the temporary files."""
+        for outfile in self.outfiles.values():
+            outfile.close()
+
+    def finalize(self, chunksize=64):
+        """Write the arrays sorted in time and remove temporary files."""
+        self.close()
+        times = numpy.array(self.times)
+        order = numpy.argsort(times, kind='stable')
+        numpy.save(self.groupdir / 'times.npy', times[order])
+        shape = (times.size, self.num_points)
+        for name in self.fields:
+            tmppath = self._tmppath(name)
+            src = numpy.memmap(tmppath, dtype='f8', mode='r', shape=shape)
+            dest = open_memmap(self.groupdir / f'{name}.npy', mode='w+',
+                               dtype='f8', shape=shape)
+            for s in range(0, times.size, chunksize):
+                dest[s:s + chunksize] = src[order[s:s + chunksize]]
+            dest.flush()
+            del src, dest
+            tmppath.unlink()
+
+
+class StoreConverter:
+    """Convert members of the postProcessing output into a columnar store."""
+
+    def __init__(self, storedir):
+        """Set the directory of the store."""
+        self.storedir = pathlib.Path(storedir)
+        self.names = set()
+        self.writers = dict()
+
+    def match(self, name):
+        """Check if a member is converted into the store."""
+        return (SURFACE_REGEX.match(name) is not None or
+                FORCES_REGEX.match(name) is not None)
+
+    def consume(self, name, f):
+        """Add a member to the store."""
+        m = FORCES_REGEX.match(name)
+        if m is not None:
+            self._add_forces(m[1], f)
+            return
+        category, time, stem = SURFACE_REGEX.match(name).groups()
+        group = f'{category}/{stem}'
+        if group not in self.writers:
+            self.writers[group] = _SurfaceWriter(self.storedir / group)
+        self.writers[group].append(float(time), f)
+
+    def _add_forces(self, time, f):
+        forcesdir = self.storedir / 'forces' / time
+        forcesdir.mkdir(parents=True, exist_ok=True)
+        numpy.save(forcesdir / 'forces.npy', read_forces(f))
+
+    def finalize(self):
+        """Write all arrays of the store."""
+        for writer in self.writers.values():
+            writer.finalize()
+
+    def close(self):
+        """Close the temporary files of all writers."""
+        for writer in self.writers.values():
+            writer.close()
+
+
+def create_store(storedir, datadir=None, tarball=None):
+    """Convert the postProcessing output of a case into a columnar store.
+
+    Parameters
+    ----------
+    storedir : pathlib.Path
+        Directory of the store to create.
+    datadir : pathlib.Path, optional
+        The postProcessing directory; default is None.
+    tarball : pathlib.Path, optional
+        Tarball with the postProcessing directory; default is None.
+
+    Returns
+    -------
+    ColumnarStore
+        The store.
+
+    """
+    if datadir is None and tarball is None:
+        raise ValueError('invalid parameters; '
+                         'datadir OR tarball must be specified')
+    converter = StoreConverter(storedir)
+    try:
+        if datadir is not None:
+            datadir = pathlib.Path(datadir)
+            for filepath in sorted(datadir.glob('*/*/*')):
+                name = ('postProcessing/' +
+                        filepath.relative_to(datadir).as_posix())
+                if converter.match(name):
+                    with open(filepath, 'rb') as f:
+                        converter.consume(name, f)
+        else:
+            scan_tarball(tarball, [converter])
+        converter.finalize()
+    finally:
+        converter.close()
+    return ColumnarStore(storedir)
+
+
+class ColumnarStore:
+    """Read access to a columnar store through memory maps."""
+
+    def __init__(self, storedir):
+        """Set the directory of the store."""
+        self.storedir = pathlib.Path(storedir)
+        if not self.storedir.is_dir():
+            raise FileNotFoundError(f'no store found at {self.storedir}')
+
+    def times(self, group):
+        """Return the time values of a group."""
+        return numpy.load(self.storedir / group / 'times.npy')
+
+    def points(self, group):
+        """Return the coordinates of the points of a group."""
+        return numpy.load(self.storedir / group / 'points.npy')
+
+    def field(self, group, name):
+        """Return a memory-mapped (time x point) array of a field."""
+        return numpy.load(self.storedir / group / f'{name}.npy',
+                          mmap_mode='r')
+
+    def time_indices(self, group, times, rtol=1e-8):
+        """Return the row indices of given time values."""
+        stored = self.times(group)
+        times = numpy.asarray(times, dtype='f8')
+        index = numpy.clip(numpy.searchsorted(stored, times),
+                           0, stored.size - 1)
+        left = numpy.clip(index - 1, 0, stored.size - 1)
+        closer = (numpy.abs(stored[left] - times) <
+                  numpy.abs(stored[index] - times))
+        index[closer] = left[closer]
+        missing = (numpy.abs(stored[index] - times) >
+                   rtol * numpy.maximum(1.0, numpy.abs(times)))
+        if numpy.any(missing):
+            raise ValueError(f'time values {times[missing]} '
+                             f'not found in {self.storedir / group}')
+        return index
+
+    def time_average(self, group, names, times, chunksize=64):
+        """Return the time average of fields over given time values.
+
+        Contiguous rows of the arrays are read in blocks.
+
+        """
+        index = numpy.sort(self.time_indices(group, times))
+        breaks = numpy.where(numpy.diff(index) != 1)[0] + 1
+        averages = dict()
+        for name in names:
+            field = self.field(group, name)
+            total = numpy.zeros(field.shape[1])
+            for run in numpy.split(index, breaks):
+                for s in range(run[0], run[-1] + 1, chunksize):
+                    e = min(s + chunksize, run[-1] + 1)
+                    total += field[s:e].sum(axis=0)
+            averages[name] = total / index.size
+        return averages
+
+    def time_moments(self, group, names, times, chunksize=64):
+        """Return the one-pass statistics of fields over given time values.
+
+        With several names, the fields are treated as the components of a
+        vector field (and their covariances are computed).
+
+        """
+        index = numpy.sort(self.time_indices(group, times))
+        breaks = numpy.where(numpy.diff(index) != 1)[0] + 1
+        fields = [self.field(group, name) for name in names]
+        moments = RunningMoments()
+        for run in numpy.split(index, breaks):
+            for s in range(run[0], run[-1] + 1, chunksize):
+                e = min(s + chunksize, run[-1] + 1)
+                if len(fields) == 1:
+                    moments.update_batch(fields[0][s:e])
+                else:
+                    moments.update_batch(numpy.stack(
+                        [field[s:e] for field in fields], axis=-1
+                    ))
+        return moments
+
+    def forces(self, time='0'):
+        """Return the structured array of forces and moments."""
+        return numpy.load(self.storedir / 'forces' / time / 'forces.npy')
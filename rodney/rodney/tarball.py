@@ -0,0 +1,232 @@
+"""Helper functions to read members of a postProcessing tarball.
+
+A sidecar index can be generated next to a gzipped tarball; it stores the
+offset and size of every member in the uncompressed stream, along with
+gzip inflate checkpoints (when the package `indexed_gzip` is available).
+Once the index exists, members are read by seeking to them instead of
+decompressing the archive from the start.
+
+"""
+
+import gzip
+import io
+import json
+import pathlib
+import tarfile
+
+try:
+    import indexed_gzip
+except ImportError:
+    indexed_gzip = None
+
+
+INDEX_VERSION = 1
+
+
+def _index_paths(tarball):
+    """Return the paths of the member index and of the gzip checkpoints."""
+    tarball = pathlib.Path(tarball)
+    return (tarball.with_name(tarball.name + '.index.json'),
+            tarball.with_name(tarball.name + '.gzidx'))
+
+
+def _fingerprint(tarball):
+    """Return size and modification time of a file."""
+    stat = pathlib.Path(tarball).stat()
+    return dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+def build_tarball_index(tarball, spacing=4 * 1024**2):
+    """Generate the sidecar index of a gzipped tarball.
+
+    Parameters
+    ----------
+    tarball : pathlib.Path
+        Path of the gzipped tarball.
+    spacing : int, optional
+        Number of uncompressed bytes between two inflate checkpoints;
+        default is 4 MiB.
+
+    Returns
+    -------
+    TarballIndex
+        The index of the tarball.
+
+    """
+    tarball = pathlib.Path(tarball)
+    filepath, gzidxpath = _index_paths(tarball)
+    if indexed_gzip is not None:
+        fileobj = indexed_gzip.IndexedGzipFile(str(tarball), spacing=spacing)
+    else:
+        fileobj = gzip.open(tarball, 'rb')
+    members = dict()
+    with fileobj, tarfile.open(fileobj=fileobj, mode='r|') as tar:
+        for member in tar:
+            if member.isfile():
+                members[member.name] = (member.offset_data, member.size)
+        if indexed_gzip is not None:
+            # Inflate checkpoints were created while reading the stream.
+            fileobj.export_index(str(gzidxpath))
+    if indexed_gzip is None and gzidxpath.is_file():
+        gzidxpath.unlink()
+    data = dict(version=INDEX_VERSION, tarball=_fingerprint(tarball),
+                checkpoints=indexed_gzip is not None, members=members)
+    with open(filepath, 'w') as outfile:
+        json.dump(data, outfile)
+    return TarballIndex(tarball)
+
+
+def load_tarball_index(tarball):
+    """Return the index of a tarball if it exists and is up-to-date."""
+    filepath, _ = _index_paths(tarball)
+    if not filepath.is_file():
+        return None
+    index = TarballIndex(tarball)
+    if not index.is_valid():
+        return None
+    return index
+
+
+class TarballIndex:
+    """Sidecar index with the location of the members of a tarball."""
+
+    def __init__(self, tarball):
+        """Load the index of a tarball."""
+        self.tarball = pathlib.Path(tarball)
+        self.filepath, self.gzidxpath = _index_paths(self.tarball)
+        with open(self.filepath, 'r') as infile:
+            data = json.load(infile)
+        self.version = data['version']
+        self.fingerprint = data['tarball']
+        self.checkpoints = data['checkpoints']
+        self.members = {name: tuple(loc)
+                        for name, loc in data['members'].items()}
+
+    def is_valid(self):
+        """Check the index matches the tarball currently on disk."""
+        return (self.version == INDEX_VERSION and
+                self.fingerprint == _fingerprint(self.tarball))
+
+    def open(self):
+        """Return a seekable file object on the uncompressed stream."""
+        if (self.checkpoints and indexed_gzip is not None and
+                self.gzidxpath.is_file()):
+            fileobj = indexed_gzip.IndexedGzipFile(str(self.tarball))
+            fileobj.import_index(str(self.gzidxpath))
+            return fileobj
+        # Without checkpoints, seeking forward decompresses and discards.
+        return gzip.open(self.tarball, 'rb')
+
+    def iter_members(self, names):
+        """Yield the name and content of the requested members.
+
+        Members are read in the order they appear in the archive;
+        names that are not in the archive are ignored.
+
+        """
+        names = sorted((name for name in set(names) if name in self.members),
+                       key=lambda name: self.members[name][0])
+        if len(names) == 0:
+            return
+        with self.open() as fileobj:
+            for name in names:
+                offset, size = self.members[name]
+                fileobj.seek(offset)
+                yield name, io.BytesIO(fileobj.read(size))
+
+
+def iter_tarball_members(tarball, names=None, match=None):
+    """Yield the name and a file object for the requested members.
+
+    The sidecar index is used when present and up-to-date; otherwise,
+    the tarball is streamed until all members have been found.
+
+    Parameters
+    ----------
+    tarball : pathlib.Path
+        Path of the gzipped tarball.
+    names : list(str), optional
+        Names of the members to read; default is None.
+    match : callable, optional
+        Function that returns True for member names to read, in addition
+        to those listed in `names`; default is None.
+
+    Yields
+    ------
+    str
+        Name of the member.
+    file object
+        File object with the content of the member.
+
+    """
+    names = set() if names is None else set(names)
+    index = load_tarball_index(tarball)
+    if index is not None:
+        if match is not None:
+            names.update(name for name in index.members if match(name))
+        yield from index.iter_members(names)
+        return
+    with tarfile.open(tarball, 'r|gz') as tar:
+        for member in tar:
+            if member.name in names:
+                yield member.name, tar.extractfile(member)
+                names.remove(member.name)
+                if len(names) == 0 and match is None:
+                    break
+            elif match is not None and member.isfile() and match(member.name):
+                yield member.name, tar.extractfile(member)
+
+
+class TarballScanner:
+    """Stream a tarball once and route members to registered consumers.
+
+    A consumer exposes the set of member names it wants (attribute `names`)
+    and a method `consume(name, fileobj)` called for each of them.
+    A consumer may also define a method `match(name)` to request members
+    whose names are not known in advance.
+
+    """
+
+    def __init__(self, tarball):
+        """Set the tarball to scan."""
+        self.tarball = pathlib.Path(tarball)
+        self.consumers = []
+
+    def register(self, consumer):
+        """Register a consumer and return it."""
+        self.consumers.append(consumer)
+        return consumer
+
+    @staticmethod
+    def _wants(consumer, name):
+        """Check if a consumer requests a member."""
+        return (name in consumer.names or
+                (hasattr(consumer, 'match') and consumer.match(name)))
+
+    def run(self):
+        """Read all requested members in a single pass over the tarball."""
+        names = set().union(*(consumer.names for consumer in self.consumers))
+        match = None
+        if any(hasattr(consumer, 'match') for consumer in self.consumers):
+            def match(name):
+                return any(self._wants(consumer, name)
+                           for consumer in self.consumers)
+        for name, f in iter_tarball_members(self.tarball, names=names,
+                                            match=match):
+            consumers = [consumer for consumer in self.consumers
+                         if self._wants(consumer, name)]
+            if len(consumers) == 1:
+                consumers[0].consume(name, f)
+                continue
+            data = f.read()
+            for consumer in consumers:
+                consumer.consume(name, io.BytesIO(data))
+
+
+def scan_tarball(tarball, consumers):
+    """Feed several consumers with a single pass over a tarball."""
+    scanner = TarballScanner(tarball)
+    for consumer in consumers:
+        scanner.register(consumer)
+    scanner.run()
+    return consumers
@@ -1,7 +1,10 @@
 """Assistant module with helper functions."""
 
+import hashlib
+import pathlib
+
 import numpy
-from scipy.spatial import distance
+from scipy import sparse, spatial
 
 
 def create_regular_grid_2d(xlims, ylims, nx, ny):
@@ -20,6 +23,208 @@ def apply_spatial_mask_2d(xy, values, limits):
     return (x[mask], y[mask]), values[mask]
 
 
+def _nearest_neighbor_chains(coords, section, starts, k=8):
+    """Return the order of the greedy nearest-neighbor walks of sections.
+
+    In each section, the walk starts from a given point and moves to the
+    nearest point of the section that has not been visited yet (ties are
+    broken with the lowest index).
+    All sections are walked at once: the nearest neighbors of all points
+    are found with a single query of a KD-tree (sections are moved apart
+    along a third axis), and each step of the walk advances all sections
+    together; the tree is queried again only for the rare steps where
+    all candidates have already been visited.
+
+    Parameters
+    ----------
+    coords : numpy.array
+        Coordinates of the points, of shape (num_points, 2).
+    section : numpy.array
+        Section of each point (integers from 0 to num_sections - 1).
+    starts : numpy.array
+        Index of the starting point of each section.
+    k : int, optional
+        Number of candidates per point; default is 8.
+
+    Returns
+    -------
+    numpy.array
+        Indices of the points, walk after walk (sections in order).
+
+    """
+    num_points = len(coords)
+    counts = numpy.bincount(section, minlength=len(starts))
+    shift = 2.0 * (numpy.ptp(coords, axis=0).sum() + 1.0)
+    points = numpy.column_stack((coords, shift * section))
+    tree = spatial.cKDTree(points)
+    k = min(k, num_points)
+    dist, nearest = (a.reshape((num_points, k))
+                     for a in tree.query(points, k=k))
+    # Candidates of other sections are never selected.
+    dist[section[nearest] != section[:, numpy.newaxis]] = numpy.inf
+    visited = numpy.zeros(num_points, dtype=bool)
+    offsets = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+    current = numpy.array(starts, dtype=int)
+    index = numpy.empty(num_points, dtype=int)
+    index[offsets] = current
+    visited[current] = True
+    for i in range(1, counts.max(initial=0)):
+        active = numpy.flatnonzero(counts > i)
+        candidates = nearest[current[active]]
+        d = numpy.where(visited[candidates], numpy.inf,
+                        dist[current[active]])
+        dmin = d.min(axis=1)
+        following = numpy.where(d == dmin[:, numpy.newaxis], candidates,
+                                num_points).min(axis=1)
+        for j in numpy.flatnonzero(numpy.isinf(dmin)):
+            following[j] = _nearest_unvisited(tree, points, section,
+                                              visited, current[active[j]])
+        current[active] = following
+        index[offsets[active] + i] = following
+        visited[following] = True
+    return index
+
+
+def _nearest_unvisited(tree, points, section, visited, point):
+    """Return the nearest unvisited point of the section of a point."""
+    num_points = len(points)
+    k = min(16, num_points)
+    while True:
+        dist, nearest = tree.query(points[point], k=k)
+        mask = ~visited[nearest] & (section[nearest] == section[point])
+        if numpy.any(mask) or k == num_points:
+            break
+        k = min(2 * k, num_points)
+    dist, nearest = dist[mask], nearest[mask]
+    return numpy.min(nearest[dist == dist[0]])
+
+
+class InterpolationOperator:
+    """Linear interpolation from scattered points to fixed target points.
+
+    The barycentric weights of the targets in the Delaunay triangulation
+    of the sample points are stored in a sparse matrix, so that any number
+    of fields (or snapshots) sampled at the same points are interpolated
+    with one sparse matrix product.
+    Targets outside the convex hull of the samples get NaN (as with
+    `scipy.interpolate.griddata`).
+
+    Parameters
+    ----------
+    matrix : scipy.sparse.csr_matrix
+        Interpolation weights, of shape (num_targets, num_points).
+    outside : numpy.array
+        Mask of the targets outside the convex hull.
+    shape : tuple(int)
+        Shape of the target grid.
+
+    """
+
+    def __init__(self, matrix, outside, shape):
+        """Set the weights of the operator."""
+        self.matrix = matrix
+        self.outside = outside
+        self.shape = tuple(shape)
+
+    @classmethod
+    def from_points(cls, points, xi):
+        """Compute the operator from sample points to target points.
+
+        Parameters
+        ----------
+        points : tuple(numpy.array)
+            Coordinates of the sample points, each direction as a 1D array.
+        xi : tuple(numpy.array)
+            Coordinates of the targets (e.g., a 2D mesh-grid).
+
+        """
+        points = numpy.column_stack(points)
+        shape = numpy.shape(xi[0])
+        targets = numpy.column_stack([numpy.ravel(v) for v in xi])
+        tri = spatial.Delaunay(points)
+        simplex = tri.find_simplex(targets)
+        outside = simplex < 0
+        ndim = points.shape[1]
+        transform = tri.transform[simplex[~outside]]
+        delta = targets[~outside] - transform[:, ndim]
+        weights = numpy.einsum('ijk,ik->ij', transform[:, :ndim], delta)
+        weights = numpy.column_stack([weights, 1.0 - weights.sum(axis=1)])
+        rows = numpy.repeat(numpy.flatnonzero(~outside), ndim + 1)
+        cols = tri.simplices[simplex[~outside]].ravel()
+        matrix = sparse.csr_matrix((weights.ravel(), (rows, cols)),
+                                   shape=(len(targets), len(points)))
+        return cls(matrix, outside, shape)
+
+    @classmethod
+    def load(cls, filepath):
+        """Load an operator saved in a NumPy archive."""
+        with numpy.load(filepath) as data:
+            matrix = sparse.csr_matrix(
+                (data['data'], data['indices'], data['indptr']),
+                shape=tuple(data['matrix_shape'])
+            )
+            return cls(matrix, data['outside'], data['shape'])
+
+    def save(self, filepath):
+        """Save the operator in a NumPy archive."""
+        numpy.savez(filepath, data=self.matrix.data,
+                    indices=self.matrix.indices, indptr=self.matrix.indptr,
+                    matrix_shape=self.matrix.shape, outside=self.outside,
+                    shape=self.shape)
+
+    def __call__(self, values):
+        """Interpolate values given at the sample points.
+
+        The last axis of `values` is the point axis; leading axes (e.g.,
+        fields or snapshots) are interpolated together.
+
+        """
+        values = numpy.asarray(values)
+        lead = values.shape[:-1]
+        res = self.matrix @ values.reshape((-1, values.shape[-1])).T
+        res[self.outside] = numpy.nan
+        return res.T.reshape(lead + self.shape)
+
+
+def interpolation_operator(points, xi, cachedir=None):
+    """Return the linear interpolation operator from points to targets.
+
+    The operator only depends on the coordinates; it is stored in a
+    directory, keyed on a hash of the sample and target coordinates,
+    so that it is computed once per mesh and plane.
+
+    Parameters
+    ----------
+    points : tuple(numpy.array)
+        Coordinates of the sample points, each direction as a 1D array.
+    xi : tuple(numpy.array)
+        Coordinates of the targets (e.g., a 2D mesh-grid).
+    cachedir : pathlib.Path, optional
+        Directory where operators are stored; default is None
+        (no storage).
+
+    Returns
+    -------
+    InterpolationOperator
+        The interpolation operator.
+
+    """
+    if cachedir is None:
+        return InterpolationOperator.from_points(points, xi)
+    digest = hashlib.sha256()
+    for coords in (numpy.column_stack(points),
+                   numpy.column_stack([numpy.ravel(v) for v in xi])):
+        digest.update(numpy.ascontiguousarray(coords, dtype='f8').tobytes())
+    digest.update(str(numpy.shape(xi[0])).encode())
+    filepath = pathlib.Path(cachedir) / f'linear_{digest.hexdigest()[:32]}.npz'
+    if filepath.is_file():
+        return InterpolationOperator.load(filepath)
+    operator = InterpolationOperator.from_points(points, xi)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    operator.save(filepath)
+    return operator
+
+
 def sort_section(xy, p, return_index=False):
     """Re-order cross-sectional coordinates and values.
 
@@ -46,21 +251,13 @@ def sort_section(xy, p, return_index=False):
     x, y = xy
 
     coords = numpy.column_stack(xy)
-    num_points = len(coords)
-
-    dist = distance.cdist(coords, coords, 'euclidean')
-    skip_val = 100.0
-    numpy.fill_diagonal(dist, skip_val)
 
-    index = [numpy.argmax(y)]  # heuristic: starting point is the highest one
-    for _ in range(num_points - 1):
-        start = index[-1]
-        nearest = numpy.argmin(dist[start])  # find index of nearest neighboor
-        index.append(nearest)
-        dist[:, start] = skip_val  # prevent point from being visited again
+    # heuristic: starting point is the highest one
+    index = _nearest_neighbor_chains(coords, numpy.zeros(x.size, dtype=int),
+                                     [numpy.argmax(y)])
 
     if return_index:
-        return numpy.array(index)
+        return index
 
     return (x[index], y[index]), p[index]
 
@@ -82,6 +279,8 @@ def sort_sections(xyz, p, return_index=False):
 
     Data are sorted along the spanwise direction and each spanwise section
     is sorted, starting from the leading edge and running counter-clockwise.
+    When all sections sample the same profile (extruded mesh), the profile
+    is ordered once and the ordering is applied to all sections.
 
     Parameters
     ----------
@@ -104,23 +303,32 @@ def sort_sections(xyz, p, return_index=False):
     x, y, z = xyz
 
     index = _sort_spanwise(xyz, p, return_index=True)
-    xb, yb, zb = x[index], y[index], z[index]
-    pb = p[index]
 
     num_points = z.size
     num_sections = numpy.unique(z).size
     num_per_section = num_points // num_sections
 
-    for i in range(num_sections):
-        s, e = i * num_per_section, (i + 1) * num_per_section
-
-        x_section, y_section = xb[s:e], yb[s:e]
-        p_section = pb[s:e]
-
-        section_index = sort_section((x_section, y_section), p_section,
-                                     return_index=True)
-
-        index[s:e] = index[s:e][section_index]
+    # Order points of each section by coordinates so that points of
+    # sections that sample the same profile are matched.
+    sections = index.reshape((num_sections, num_per_section))
+    order = numpy.lexsort((y[sections], x[sections]))
+    sections = numpy.take_along_axis(sections, order, axis=1)
+    xs, ys = x[sections], y[sections]
+
+    if numpy.allclose(xs, xs[0]) and numpy.allclose(ys, ys[0]):
+        section_index = sort_section((xs[0], ys[0]), None, return_index=True)
+        sections = sections[:, section_index]
+    else:
+        # All sections are walked in one call (see `sort_section`).
+        starts = (numpy.arange(num_sections) * num_per_section +
+                  numpy.argmax(ys, axis=1))
+        section_index = _nearest_neighbor_chains(
+            numpy.column_stack((xs.ravel(), ys.ravel())),
+            numpy.repeat(numpy.arange(num_sections), num_per_section), starts
+        )
+        sections = sections.ravel()[section_index].reshape(sections.shape)
+
+    index = sections.ravel()
 
     if return_index:
         return index
@@ -128,6 +336,246 @@ def sort_sections(xyz, p, return_index=False):
     return (x[index], y[index], z[index]), p[index]
 
 
+def uniform_sections(z):
+    """Check if all spanwise sections have the same number of points."""
+    _, counts = numpy.unique(z, return_counts=True)
+    return bool(numpy.all(counts == counts[0]))
+
+
+def sections_permutation(xyz, cachedir=None):
+    """Return the permutation that sorts the sections of a surface.
+
+    The permutation (see `sort_sections`) only depends on the sampled
+    points; it is stored in a directory, keyed on a hash of the
+    coordinates, so that it is computed once per mesh.
+    All sections must have the same number of points (see
+    `uniform_sections`); a ValueError is raised otherwise.
+
+    Parameters
+    ----------
+    xyz : tuple(numpy.array)
+        x, y, and z surface coordinates, each direction as a 1D array.
+    cachedir : pathlib.Path, optional
+        Directory where permutations are stored; default is None
+        (no storage).
+
+    Returns
+    -------
+    numpy.array
+        Sorted indices.
+    int
+        Number of spanwise sections.
+    int
+        Number of points per section.
+
+    """
+    if not uniform_sections(xyz[2]):
+        raise ValueError('sections have different numbers of points; '
+                         'use spanwise_reduce instead')
+    coords = numpy.ascontiguousarray(numpy.column_stack(xyz), dtype='f8')
+    digest = hashlib.sha256(coords.tobytes()).hexdigest()[:32]
+    filepath = None
+    if cachedir is not None:
+        filepath = pathlib.Path(cachedir) / f'sections_{digest}.npz'
+        if filepath.is_file():
+            with numpy.load(filepath) as data:
+                return (data['index'], int(data['num_sections']),
+                        int(data['num_per_section']))
+
+    index = sort_sections(xyz, None, return_index=True)
+    num_sections = numpy.unique(xyz[2]).size
+    num_per_section = index.size // num_sections
+
+    if filepath is not None:
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        numpy.savez(filepath, index=index, num_sections=num_sections,
+                    num_per_section=num_per_section)
+    return index, num_sections, num_per_section
+
+
+def gather_sections(values, index, num_sections):
+    """Return values sorted by a permutation, as a (section x point) array.
+
+    The last axis of `values` is the point axis, so that a stack of
+    snapshots is re-ordered with a single gather.
+
+    """
+    values = numpy.take(values, index, axis=-1)
+    return values.reshape(values.shape[:-1] + (num_sections, -1))
+
+
+def section_geometry(xy):
+    """Return the lengths and outward normals associated with section points.
+
+    Sections are closed contours whose points are sorted (see
+    `sort_section`); each point is associated with half of its two
+    adjacent segments, so that the sum of the vectors `lengths * normals`
+    over a contour is zero (a uniform pressure yields no force).
+
+    Parameters
+    ----------
+    xy : tuple(numpy.array)
+        x and y coordinates of the sorted points; the last axis is the
+        point axis (leading axes, e.g. sections, are processed at once).
+
+    Returns
+    -------
+    numpy.array
+        Length associated with each point.
+    numpy.array
+        Outward unit normal at each point (last axis holds the x and y
+        components).
+
+    """
+    x, y = xy
+    dx = numpy.roll(x, -1, axis=-1) - numpy.roll(x, 1, axis=-1)
+    dy = numpy.roll(y, -1, axis=-1) - numpy.roll(y, 1, axis=-1)
+    # Signed area of the contour: positive when counter-clockwise.
+    area = numpy.sum(x * numpy.roll(y, -1, axis=-1) -
+                     numpy.roll(x, -1, axis=-1) * y, axis=-1)
+    sign = numpy.where(area < 0.0, -1.0, 1.0)[..., numpy.newaxis]
+    normals = 0.5 * sign[..., numpy.newaxis] * numpy.stack((dy, -dx), axis=-1)
+    lengths = numpy.linalg.norm(normals, axis=-1)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        normals = normals / lengths[..., numpy.newaxis]
+    return lengths, numpy.nan_to_num(normals)
+
+
+def spanwise_weights(z):
+    """Return the spanwise spacing associated with each point.
+
+    The spacing of a section is the distance between the mid-points with
+    its neighboring sections (half-spacing at the end sections, so that
+    the spacings sum to the extent of the span).
+
+    """
+    zu, inverse = numpy.unique(z, return_inverse=True)
+    if zu.size == 1:
+        return numpy.ones_like(z, dtype='f8')
+    edges = numpy.concatenate(([zu[0]], 0.5 * (zu[1:] + zu[:-1]), [zu[-1]]))
+    return numpy.diff(edges)[inverse]
+
+
+def spanwise_reduce(xyz, values, weights=None, tol=1e-8):
+    """Compute the weighted spanwise mean and variance of a surface field.
+
+    Points are grouped by spanwise section (z-coordinate up to `tol`) and
+    the section with the most points gives the reference points of the
+    reduction (points of the reference section that coincide are
+    merged).
+    Sections that sample the reference points (e.g., extruded mesh) are
+    reduced directly; other sections (e.g., refined or non-extruded
+    mesh) are linearly interpolated at the reference points from their
+    two nearest points, along with the weights.
+    Groups are returned in the order of the reference points.
+
+    Parameters
+    ----------
+    xyz : tuple(numpy.array)
+        x, y, and z surface coordinates, each direction as a 1D array.
+    values : numpy.array
+        Surface values at the coordinates; the last axis is the point
+        axis (leading axes, e.g. snapshots, are reduced independently).
+    weights : numpy.array or str, optional
+        Weight of each point (e.g., face area), or 'spacing' to weight
+        points with the spanwise spacing of their section;
+        default is None (uniform weights).
+    tol : float, optional
+        Tolerance used to match coordinates; default is 1e-8.
+
+    Returns
+    -------
+    tuple(numpy.array)
+        x and y coordinates of the groups.
+    numpy.array
+        Spanwise mean.
+    numpy.array
+        Spanwise variance.
+
+    """
+    x, y, z = xyz
+    if weights is None:
+        weights = numpy.ones(x.size)
+    elif isinstance(weights, str) and weights == 'spacing':
+        weights = spanwise_weights(z)
+    weights = numpy.asarray(weights, dtype='f8')
+    values = numpy.asarray(values, dtype='f8')
+    lead = values.shape[:-1]
+    values = values.reshape((-1, x.size))
+
+    _, section = numpy.unique(numpy.round(z / tol), return_inverse=True)
+    section = section.ravel()
+    num_sections = section.max() + 1
+    counts = numpy.bincount(section)
+
+    # Reference points: distinct points of the finest section, in the
+    # order of the input.
+    xy = numpy.column_stack((x, y))
+    points = numpy.flatnonzero(section == numpy.argmax(counts))
+    keys = numpy.round(xy[points] / tol)
+    _, first = numpy.unique(keys, axis=0, return_index=True)
+    points = points[numpy.sort(first)]
+    num_groups = points.size
+
+    # A section is matched when its points sample all reference points.
+    dist, group = spatial.cKDTree(xy[points]).query(xy)
+    matched = dist <= tol
+    hits = numpy.zeros((num_sections, num_groups), dtype=bool)
+    hits[section[matched], group[matched]] = True
+    direct = (numpy.bincount(section, weights=~matched,
+                             minlength=num_sections) == 0)
+    direct &= numpy.all(hits, axis=1)
+    mask = direct[section]
+    groups, w, v = [group[mask]], [weights[mask]], [values[:, mask]]
+
+    other = numpy.flatnonzero(~direct)
+    if other.size > 0:
+        # Interpolate the other sections at the reference points from
+        # their two nearest points; sections are moved apart along a
+        # third axis, farther than their extent, so that the nearest
+        # points of a query belong to the same section.
+        sel = numpy.flatnonzero(~mask)
+        shift = 2.0 * (numpy.ptp(xy, axis=0).sum() + 1.0)
+        tree = spatial.cKDTree(numpy.column_stack((xy[sel],
+                                                   shift * section[sel])))
+        targets = numpy.column_stack((
+            numpy.tile(xy[points], (other.size, 1)),
+            shift * numpy.repeat(other, num_groups)
+        ))
+        _, nearest = tree.query(targets, k=2)
+        # Sections with a single point have no second neighbor.
+        nearest[:, 1] = numpy.where(nearest[:, 1] < sel.size,
+                                    nearest[:, 1], nearest[:, 0])
+        a, b = sel[nearest[:, 0]], sel[nearest[:, 1]]
+        ab = xy[b] - xy[a]
+        length2 = numpy.sum(ab**2, axis=1)
+        t = numpy.sum((targets[:, :2] - xy[a]) * ab, axis=1)
+        t = numpy.clip(numpy.divide(t, length2, out=numpy.zeros_like(t),
+                                    where=length2 > 0.0), 0.0, 1.0)
+        groups.append(numpy.tile(numpy.arange(num_groups), other.size))
+        w.append((1.0 - t) * weights[a] + t * weights[b])
+        v.append((1.0 - t) * values[:, a] + t * values[:, b])
+    group = numpy.concatenate(groups)
+    weights = numpy.concatenate(w)
+    values = numpy.concatenate(v, axis=-1)
+
+    offsets = (numpy.arange(values.shape[0]) * num_groups)[:, numpy.newaxis]
+    bins = (group + offsets).ravel()
+    size = values.shape[0] * num_groups
+
+    total = numpy.bincount(group, weights=weights, minlength=num_groups)
+    wvalues = (weights * values).ravel()
+    mean = numpy.bincount(bins, weights=wvalues, minlength=size)
+    mean = mean.reshape((-1, num_groups)) / total
+    dev = values - mean[:, group]
+    var = numpy.bincount(bins, weights=(weights * dev**2).ravel(),
+                         minlength=size)
+    var = var.reshape((-1, num_groups)) / total
+
+    return ((x[points], y[points]), mean.reshape(lead + (num_groups,)),
+            var.reshape(lead + (num_groups,)))
+
+
 def spanwise_average(xyz, p):
     """Compute the spanwise-average field.
 
@@ -148,13 +596,6 @@ def spanwise_average(xyz, p):
         Spanwise-averaged surface values.
 
     """
-    x, y, z = xyz
-
-    num_points = p.size
-    num_sections = numpy.unique(z).size
-    num_per_section = num_points // num_sections
-
-    x, y = x[:num_per_section], y[:num_per_section]
-    p_avg = numpy.mean(p.reshape((num_sections, num_per_section)), axis=0)
+    xy, p_avg, _ = spanwise_reduce(xyz, p)
 
-    return (x, y), p_avg
+    return xy, p_avg
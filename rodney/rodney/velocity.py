@@ -2,138 +2,273 @@
 
 import pathlib
 import re
-import tarfile
 
 import numpy
 
 from .misc import time_to_str
+from .moments import RunningMoments
+from .raw import RawReader
+from .store import ColumnarStore
+from .tarball import iter_tarball_members, scan_tarball
 
 
-def load_Ux_yNormal(times, datadir=None, tarball=None):
+def load_Ux_yNormal(times, datadir=None, tarball=None, store=None,
+                    moments=False):
+    """Load the time-averaged x-velocity on the y-normal plane.
+
+    With `moments`, the statistics of the x-velocity are returned instead
+    of the mean.
+
+    """
     if datadir is not None:
         xz, ux = _load_Ux_yNormal(times, datadir)
     elif tarball is not None:
         xz, ux = _load_Ux_yNormal_from_tarball(times, tarball)
+    elif store is not None:
+        xz, ux = _load_Ux_yNormal_from_store(times, store)
     else:
         raise ValueError('invalid parameters; '
-                         'filepath OR tarball must be specified')
+                         'filepath OR tarball OR store must be specified')
 
+    if not moments:
+        ux = ux.mean
     return xz, ux
 
 
-def _load_Ux_yNormal_from_tarball(times, tarball):
-    initialized = False
-    times = list(map(time_to_str, times))
-    names = [f'postProcessing/surfaceProfiles/{time}/U_yNormal_x0.0.raw'
-             for time in times]
-    with tarfile.open(tarball, 'r|gz') as tar:
-        for member in tar:
-            if member.name in names:
-                f = tar.extractfile(member)
-                *xz, ux = numpy.loadtxt(f, usecols=(0, 2, 3), unpack=True)
+class UxYNormalAccumulator:
+    """Accumulate the x-velocity on the y-normal plane from tarball members."""
 
-                if not initialized:
-                    ux_tot = numpy.zeros_like(ux)
-                    initialized = True
+    def __init__(self, times, moments=False):
+        """Set the names of the members to accumulate."""
+        times = list(map(time_to_str, times))
+        self.names = set(
+            f'postProcessing/surfaceProfiles/{time}/U_yNormal_x0.0.raw'
+            for time in times
+        )
+        self.moments = moments
+        self.reader = RawReader(usecols=(3,))
+        self.xz, self.ux = None, RunningMoments()
 
-                ux_tot += ux
+    def consume(self, name, f):
+        """Add the x-velocity of a member."""
+        xyz, ux = self.reader.read(f)
+        self.xz = (xyz[:, 0], xyz[:, 2])
+        self.ux.update(ux[:, 0])
+
+    def result(self):
+        """Return coordinates and time-averaged x-velocity (or moments)."""
+        return self.xz, self.ux if self.moments else self.ux.mean
+
+
+def _load_Ux_yNormal_from_tarball(times, tarball):
+    accumulator = UxYNormalAccumulator(times, moments=True)
+    scan_tarball(tarball, [accumulator])
+    return accumulator.result()
 
-                names.remove(member.name)
-                if len(names) == 0:
-                    break
 
-    return xz, ux_tot / len(times)
+def _load_Ux_yNormal_from_store(times, storedir):
+    store = ColumnarStore(storedir)
+    group = 'surfaceProfiles/U_yNormal_x0.0'
+    xz = tuple(store.points(group)[:, [0, 2]].T)
+    return xz, store.time_moments(group, ['U_x'], times)
 
 
 def _load_Ux_yNormal(times, datadir):
     times = list(map(time_to_str, times))
-    initialized = False
+    reader = RawReader(usecols=(3,))
+    ux_stats = RunningMoments()
     for time in times:
         filepath = pathlib.Path(datadir) / time / 'U_yNormal_x0.0.raw'
-        with open(filepath, 'r') as f:
-            *xz, ux = numpy.loadtxt(f, usecols=(0, 2, 3), unpack=True)
-
-        if not initialized:
-            ux_tot = numpy.zeros_like(ux)
-            initialized = True
+        with open(filepath, 'rb') as f:
+            xyz, ux = reader.read(f)
+        ux_stats.update(ux[:, 0])
+
+    return (xyz[:, 0], xyz[:, 2]), ux_stats
+
+
+def iter_Ux_yNormal(times, datadir=None, tarball=None, store=None):
+    """Yield the x-velocity on the y-normal plane, snapshot by snapshot.
+
+    Snapshots read from a tarball are yielded in the order of the archive.
+
+    Yields
+    ------
+    int
+        Index of the snapshot in `times`.
+    tuple(numpy.array)
+        x and z coordinates.
+    numpy.array
+        x-velocity.
+
+    """
+    for i, _, xyz, values in _iter_surfaces(
+        times, ['U_yNormal_x0.0'], (3,),
+        datadir=datadir, tarball=tarball, store=store
+    ):
+        yield i, (xyz[:, 0], xyz[:, 2]), values[:, 0]
+
+
+def iter_Uxy_xNormal(xlocs, times, datadir=None, tarball=None, store=None):
+    """Yield the x- and y-velocity on x-normal planes, snapshot by snapshot.
+
+    All planes are read with a single pass over a tarball; snapshots read
+    from a tarball are yielded in the order of the archive.
+
+    Yields
+    ------
+    int
+        Index of the snapshot in `times`.
+    float
+        Location of the plane along the x-axis.
+    tuple(numpy.array)
+        y and z coordinates.
+    numpy.array
+        x- and y-velocity, of shape (num_points, 2).
+
+    """
+    stems = {f'U_xNormal_x{xloc:.2f}': xloc for xloc in xlocs}
+    for i, stem, xyz, values in _iter_surfaces(
+        times, list(stems), (3, 4),
+        datadir=datadir, tarball=tarball, store=store
+    ):
+        yield i, stems[stem], (xyz[:, 1], xyz[:, 2]), values
+
+
+def _iter_surfaces(times, stems, usecols, datadir=None, tarball=None,
+                   store=None):
+    """Yield snapshots of sampled surfaces of the surfaceProfiles."""
+    times = list(map(time_to_str, times))
+    readers = {stem: RawReader(usecols=usecols) for stem in stems}
+    if datadir is not None:
+        for stem in stems:
+            for i, time in enumerate(times):
+                filepath = pathlib.Path(datadir) / time / f'{stem}.raw'
+                with open(filepath, 'rb') as f:
+                    yield (i, stem, *readers[stem].read(f))
+    elif tarball is not None:
+        members = {f'postProcessing/surfaceProfiles/{time}/{stem}.raw':
+                   (i, stem)
+                   for i, time in enumerate(times) for stem in stems}
+        for name, f in iter_tarball_members(tarball, names=members):
+            i, stem = members[name]
+            yield (i, stem, *readers[stem].read(f))
+    elif store is not None:
+        store = ColumnarStore(store)
+        names = ['U_x', 'U_y', 'U_z']
+        for stem in stems:
+            group = f'surfaceProfiles/{stem}'
+            xyz = store.points(group)
+            fields = [store.field(group, names[col - 3]) for col in usecols]
+            index = store.time_indices(group, list(map(float, times)))
+            for i, row in enumerate(index):
+                values = numpy.column_stack([field[row] for field in fields])
+                yield i, stem, xyz, values
+    else:
+        raise ValueError('invalid parameters; '
+                         'datadir OR tarball OR store must be specified')
 
-        ux_tot += ux
 
-    return xz, ux_tot / len(times)
+def load_Uxy_xNormal(xlocs, times, datadir=None, tarball=None, store=None,
+                     moments=False):
+    """Load the time-averaged velocity on x-normal planes.
 
+    Each profile contains the mean x- and y-velocity (keys 'ux' and 'uy')
+    and the Reynolds stresses (keys 'uu', 'vv', 'ww', and 'uv'), all
+    obtained from the same pass over the snapshots.
+    With `moments`, each profile also contains the statistics of the
+    velocity (key 'moments'; components ux, uy, and uz).
 
-def load_Uxy_xNormal(xlocs, times, datadir=None, tarball=None):
+    """
     if datadir is not None:
         profiles = _load_Uxy_xNormal(xlocs, times, datadir)
     elif tarball is not None:
         profiles = _load_Uxy_xNormal_from_tarball(xlocs, times, tarball)
+    elif store is not None:
+        profiles = _load_Uxy_xNormal_from_store(xlocs, times, store)
     else:
         raise ValueError('invalid parameters; '
-                         'filepath OR tarball must be specified')
+                         'filepath OR tarball OR store must be specified')
+
+    return _velocity_profiles(profiles, moments)
 
+
+def _velocity_profiles(stats, moments):
+    """Return the mean velocity and Reynolds stresses of each profile."""
+    profiles = dict()
+    for xloc, (yz, uxy) in stats.items():
+        ux, uy = uxy.mean.T[:2]
+        cov = uxy.cov
+        profiles[xloc] = dict(yz=yz, ux=ux, uy=uy, uu=cov[:, 0, 0],
+                              vv=cov[:, 1, 1], ww=cov[:, 2, 2],
+                              uv=cov[:, 0, 1])
+        if moments:
+            profiles[xloc]['moments'] = uxy
     return profiles
 
 
-def _load_Uxy_xNormal_from_tarball(xlocs, times, tarball):
-    times = list(map(time_to_str, times))
+class UxyXNormalAccumulator:
+    """Accumulate the velocity on x-normal planes from tarball members."""
 
-    names = [f'postProcessing/surfaceProfiles/{time}/U_xNormal_x{xloc:.2f}.raw'
-             for time in times for xloc in xlocs]
+    def __init__(self, xlocs, times, moments=False):
+        """Set the names of the members to accumulate."""
+        times = list(map(time_to_str, times))
+        self.names = set(
+            f'postProcessing/surfaceProfiles/{time}/U_xNormal_x{xloc:.2f}.raw'
+            for time in times for xloc in xlocs
+        )
+        self.xlocs = xlocs
+        self.moments = moments
+        self.readers = dict()
+        self.stats = dict()
 
-    profiles = dict()
-    with tarfile.open(tarball, 'r|gz') as tar:
-        for member in tar:
-            if member.name in names:
-                f = tar.extractfile(member)
-                y, z, ux, uy = numpy.loadtxt(f, usecols=(1, 2, 3, 4),
-                                             unpack=True)
-
-                xloc = float(re.search('U_xNormal_x(.*?)\.raw',
-                                       member.name)[1])
-
-                if xloc not in profiles:
-                    profiles[xloc] = dict(
-                        yz=(y, z),
-                        ux=numpy.zeros_like(ux),
-                        uy=numpy.zeros_like(uy)
-                    )
-
-                profiles[xloc]['ux'] += ux
-                profiles[xloc]['uy'] += uy
-
-                names.remove(member.name)
-                if len(names) == 0:
-                    break
+    def consume(self, name, f):
+        """Add the velocity of a member."""
+        xloc = float(re.search(r'U_xNormal_x(.*?)\.raw', name)[1])
 
-    for xloc in xlocs:
-        profiles[xloc]['ux'] /= len(times)
-        profiles[xloc]['uy'] /= len(times)
+        if xloc not in self.readers:
+            self.readers[xloc] = RawReader(usecols=(3, 4, 5))
+            self.stats[xloc] = (None, RunningMoments())
+        xyz, values = self.readers[xloc].read(f)
+        uxy = self.stats[xloc][1]
+        uxy.update(values)
+        self.stats[xloc] = ((xyz[:, 1], xyz[:, 2]), uxy)
 
-    return profiles
+    def result(self):
+        """Return coordinates, mean velocity, and stresses at each location."""
+        stats = {xloc: self.stats[xloc] for xloc in self.xlocs}
+        return _velocity_profiles(stats, self.moments)
+
+
+def _load_Uxy_xNormal_from_tarball(xlocs, times, tarball):
+    accumulator = UxyXNormalAccumulator(xlocs, times)
+    scan_tarball(tarball, [accumulator])
+    return {xloc: accumulator.stats[xloc] for xloc in xlocs}
+
+
+def _load_Uxy_xNormal_from_store(xlocs, times, storedir):
+    store = ColumnarStore(storedir)
+    stats = dict()
+    for xloc in xlocs:
+        group = f'surfaceProfiles/U_xNormal_x{xloc:.2f}'
+        yz = tuple(store.points(group)[:, [1, 2]].T)
+        names = ['U_x', 'U_y', 'U_z']
+        stats[xloc] = yz, store.time_moments(group, names, times)
+    return stats
 
 
 def _load_Uxy_xNormal(xlocs, times, datadir):
     times = list(map(time_to_str, times))
-    profiles = dict()
+    stats = dict()
     for xloc in xlocs:
-        initialized = False
+        reader = RawReader(usecols=(3, 4, 5))
+        uxy = RunningMoments()
         for time in times:
             filepath = (pathlib.Path(datadir) / time /
                         f'U_xNormal_x{xloc:.2f}.raw')
-            with open(filepath, 'r') as f:
-                y, z, ux, uy = numpy.loadtxt(f, usecols=(1, 2, 3, 4),
-                                             unpack=True)
+            with open(filepath, 'rb') as f:
+                xyz, values = reader.read(f)
+            uxy.update(values)
 
-            if not initialized:
-                ux_tot = numpy.zeros_like(ux)
-                uy_tot = numpy.zeros_like(uy)
-                initialized = True
+        stats[xloc] = (xyz[:, 1], xyz[:, 2]), uxy
 
-            ux_tot += ux
-            uy_tot += uy
-
-        profiles[xloc] = dict(
-            yz=(y, z), ux=ux_tot / len(times), uy=uy_tot / len(times)
-        )
-
-    return profiles
+    return stats
@@ -1,64 +1,225 @@
 """Helper functions for the wall pressure."""
 
 import pathlib
-import tarfile
 
 import numpy
 
-from .misc import time_to_str
+from .misc import check_missing_times, time_to_str
+from .moments import RunningMoments
+from .raw import RawReader
+from .store import ColumnarStore
+from .tarball import iter_tarball_members, scan_tarball
+from .transforms import (gather_sections, section_geometry,
+                         sections_permutation)
 
 
-def load_wall_pressure(times, datadir=None, tarball=None):
+def load_wall_pressure(times, datadir=None, tarball=None, store=None,
+                       moments=False):
+    """Load the time-averaged wall pressure.
+
+    With `moments`, the statistics of the wall pressure (mean, variance,
+    RMS, min, max) are returned instead of the mean; they are computed
+    with the same single pass over the snapshots.
+
+    """
     if datadir is not None:
         xyz, p = _load_wall_pressure(times, datadir)
     elif tarball is not None:
         xyz, p = _load_wall_pressure_from_tarball(times, tarball)
+    elif store is not None:
+        xyz, p = _load_wall_pressure_from_store(times, store)
     else:
         raise ValueError('invalid parameters; '
-                         'filepath OR tarball must be specified')
+                         'filepath OR tarball OR store must be specified')
 
+    if not moments:
+        p = p.mean
     return xyz, p
 
 
-def _load_wall_pressure_from_tarball(times, tarball):
-    initialized = False
-    times = list(map(time_to_str, times))
-    names = [f'postProcessing/wallPressure/{time}/p_snake.raw'
-             for time in times]
-    with tarfile.open(tarball, 'r|gz') as tar:
-        for member in tar:
-            if member.name in names:
-                f = tar.extractfile(member)
-                *xyz, p = numpy.loadtxt(f, unpack=True)
+class WallPressureAccumulator:
+    """Accumulate the wall pressure read from tarball members."""
+
+    def __init__(self, times, moments=False):
+        """Set the names of the members to accumulate."""
+        times = list(map(time_to_str, times))
+        self.names = set(f'postProcessing/wallPressure/{time}/p_snake.raw'
+                         for time in times)
+        self.moments = moments
+        self.reader = RawReader()
+        self.xyz, self.p = None, RunningMoments()
 
-                if not initialized:
-                    p_tot = numpy.zeros_like(p)
-                    initialized = True
+    def consume(self, name, f):
+        """Add the wall pressure of a member."""
+        xyz, p = self.reader.read(f)
+        self.xyz = tuple(xyz.T)
+        self.p.update(p[:, 0])
 
-                p_tot += p
+    def result(self):
+        """Return coordinates and time-averaged wall pressure (or moments)."""
+        return self.xyz, self.p if self.moments else self.p.mean
 
-                names.remove(member.name)
-                if len(names) == 0:
-                    break
 
-    return xyz, p_tot / len(times)
+def _load_wall_pressure_from_tarball(times, tarball):
+    accumulator = WallPressureAccumulator(times, moments=True)
+    scan_tarball(tarball, [accumulator])
+    return accumulator.result()
+
+
+def _load_wall_pressure_from_store(times, storedir):
+    store = ColumnarStore(storedir)
+    group = 'wallPressure/p_snake'
+    xyz = tuple(store.points(group).T)
+    return xyz, store.time_moments(group, ['p'], times)
 
 
 def _load_wall_pressure(times, datadir):
     times = list(map(time_to_str, times))
-    initialized = False
+    reader = RawReader()
+    p_stats = RunningMoments()
     for time in times:
         filepath = pathlib.Path(datadir) / time / 'p_snake.raw'
-        with open(filepath, 'r') as f:
-            *xyz, p = numpy.loadtxt(f, unpack=True)
+        with open(filepath, 'rb') as f:
+            xyz, p = reader.read(f)
+        p_stats.update(p[:, 0])
+
+    return tuple(xyz.T), p_stats
+
+
+def iter_wall_pressure(times, datadir=None, tarball=None, store=None):
+    """Yield the wall pressure, snapshot by snapshot.
+
+    Snapshots read from a tarball are yielded in the order of the archive.
+
+    Yields
+    ------
+    int
+        Index of the snapshot in `times`.
+    tuple(numpy.array)
+        x, y, and z coordinates.
+    numpy.array
+        Wall pressure.
+
+    """
+    times = list(map(time_to_str, times))
+    reader = RawReader()
+    if datadir is not None:
+        for i, time in enumerate(times):
+            filepath = pathlib.Path(datadir) / time / 'p_snake.raw'
+            with open(filepath, 'rb') as f:
+                xyz, p = reader.read(f)
+            yield i, tuple(xyz.T), p[:, 0]
+    elif tarball is not None:
+        members = {f'postProcessing/wallPressure/{time}/p_snake.raw': i
+                   for i, time in enumerate(times)}
+        for name, f in iter_tarball_members(tarball, names=members):
+            xyz, p = reader.read(f)
+            yield members[name], tuple(xyz.T), p[:, 0]
+    elif store is not None:
+        store = ColumnarStore(store)
+        group = 'wallPressure/p_snake'
+        xyz = tuple(store.points(group).T)
+        field = store.field(group, 'p')
+        index = store.time_indices(group, list(map(float, times)))
+        for i, row in enumerate(index):
+            yield i, xyz, numpy.array(field[row])
+    else:
+        raise ValueError('invalid parameters; '
+                         'datadir OR tarball OR store must be specified')
+
+
+def load_wall_pressure_snapshots(times, datadir=None, tarball=None,
+                                 store=None):
+    """Load the wall pressure of all snapshots.
+
+    A ValueError is raised if some snapshots are not found.
 
-        if not initialized:
-            p_tot = numpy.zeros_like(p)
-            initialized = True
+    Returns
+    -------
+    tuple(numpy.array)
+        x, y, and z coordinates.
+    numpy.array
+        Wall pressure, of shape (num_times, num_points).
+
+    """
+    xyz, p, found = None, None, None
+    for i, xyz, values in iter_wall_pressure(times, datadir=datadir,
+                                             tarball=tarball, store=store):
+        if p is None:
+            p = numpy.full((len(times), values.size), numpy.nan)
+            found = numpy.zeros(len(times), dtype=bool)
+        p[i] = values
+        found[i] = True
+    check_missing_times(times, found, what='wall pressure')
+    return xyz, p
+
+
+class WallPressureSnapshotsAccumulator:
+    """Collect the wall pressure of all snapshots from tarball members."""
+
+    def __init__(self, times):
+        """Set the names of the members to collect."""
+        times = list(map(time_to_str, times))
+        self.rows = {f'postProcessing/wallPressure/{time}/p_snake.raw': i
+                     for i, time in enumerate(times)}
+        self.names = set(self.rows)
+        self.times = times
+        self.reader = RawReader()
+        self.xyz, self.p, self.found = None, None, None
+
+    def consume(self, name, f):
+        """Add the wall pressure of a member."""
+        xyz, p = self.reader.read(f)
+        if self.p is None:
+            self.p = numpy.full((len(self.rows), p.shape[0]), numpy.nan)
+            self.found = numpy.zeros(len(self.rows), dtype=bool)
+        self.xyz = tuple(xyz.T)
+        self.p[self.rows[name]] = p[:, 0]
+        self.found[self.rows[name]] = True
+
+    def result(self):
+        """Return coordinates and wall pressure of all snapshots.
+
+        A ValueError is raised if some snapshots were not found.
+
+        """
+        check_missing_times(self.times, self.found, what='wall pressure')
+        return self.xyz, self.p
 
-        p_tot += p
 
-    return xyz, p_tot / len(times)
+def sectional_pressure_forces(xyz, p, cachedir=None):
+    """Integrate the pressure force over each spanwise section.
+
+    The pressure of all snapshots is gathered by section with the stored
+    permutation of the mesh (see `sections_permutation`) and integrated
+    along the contour of each section with a single batched product.
+
+    Parameters
+    ----------
+    xyz : tuple(numpy.array)
+        x, y, and z surface coordinates, each direction as a 1D array.
+    p : numpy.array
+        Wall pressure; the last axis is the point axis (leading axes,
+        e.g. snapshots, are integrated at once).
+    cachedir : pathlib.Path, optional
+        Directory where the permutation is stored; default is None.
+
+    Returns
+    -------
+    numpy.array
+        Spanwise location of the sections.
+    numpy.array
+        Pressure force per unit span, of shape (..., num_sections, 2)
+        (last axis holds the x and y components).
+
+    """
+    index, num_sections, _ = sections_permutation(xyz, cachedir=cachedir)
+    x, y, z = (gather_sections(v, index, num_sections) for v in xyz)
+    lengths, normals = section_geometry((x, y))
+    p = gather_sections(numpy.asarray(p, dtype='f8'), index, num_sections)
+    forces = -numpy.einsum('...sn,snk->...sk', p,
+                           normals * lengths[..., numpy.newaxis])
+    return z[:, 0], forces
 
 
 def wall_pressure_coefficient(p, rho=1.0, U_inf=1.0, D=1.0):
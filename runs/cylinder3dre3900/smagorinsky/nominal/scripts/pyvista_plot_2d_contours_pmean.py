@@ -20,11 +20,8 @@ maindir = pathlib.Path(__file__).absolute().parents[1]
 datadir = maindir / 'output' / 'LES-tmp'
 figdir = maindir / 'figures'
 
-reader = pyvista.OpenFOAMReader(str(datadir / 'case.foam'))
-reader.set_active_time_value(150.0)
-
-mesh = reader.read()
-internal_mesh = mesh['internalMesh']
+case = rodney.FoamCase(datadir / 'case.foam')
+internal_mesh = case.internal_mesh(150.0, fields=['pMean'])
 
 slice_internal_mesh = slice_z_center(internal_mesh)
 
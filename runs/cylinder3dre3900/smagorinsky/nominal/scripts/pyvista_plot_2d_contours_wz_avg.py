@@ -2,7 +2,6 @@ from curses import noraw
 import pathlib
 
 import numpy
-import pyvista
 from matplotlib import pyplot
 
 import rodney
@@ -22,11 +21,8 @@ maindir = pathlib.Path(__file__).absolute().parents[1]
 datadir = maindir / 'output' / 'LES-tmp'
 figdir = maindir / 'figures'
 
-reader = pyvista.OpenFOAMReader(str(datadir / 'case.foam'))
-reader.set_active_time_value(150.0)
-
-mesh = reader.read()
-internal_mesh = mesh['internalMesh']
+case = rodney.FoamCase(datadir / 'case.foam')
+internal_mesh = case.internal_mesh(150.0, fields=['U'])
 internal_mesh.set_active_scalars('U')
 
 internal_mesh = internal_mesh.compute_derivative(
@@ -16,13 +16,11 @@ figdir = maindir / 'figures'
 
 times = numpy.arange(150.0, 150.0 + 1, 5.0)
 
+case = rodney.FoamCase(datadir / 'case.foam')
+
 for time in times:
     print(f'[time {time}] Plotting Q-criterion ...')
-    reader = pyvista.OpenFOAMReader(str(datadir / 'case.foam'))
-    reader.set_active_time_value(time)
-
-    mesh = reader.read()
-    internal_mesh = mesh['internalMesh']
+    internal_mesh = case.internal_mesh(time, fields=['U'])
     internal_mesh.set_active_scalars('U')
 
     internal_mesh = internal_mesh.compute_derivative(
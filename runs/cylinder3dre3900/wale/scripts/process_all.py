@@ -1,22 +1,27 @@
 """Run post-processing scripts."""
 
-import os
-import subprocess
 from pathlib import Path
 
+from rodney.runner import Task, run_tasks
+
 pwd = Path(__file__).absolute().parent
 
-scripts = [
-    'plot_force_coefficients.py',
-    'plot_velocity_profiles.py',
-    'plot_surface_pressure_coefficient.py',
-    'plot_u_centerline_profile.py'
+args = '--no-compute --no-show'
+
+tasks = [
+    Task(pwd / 'plot_force_coefficients.py', args=args,
+         inputs=['*/output/LES/postProcessing/forces/*/forces.dat'],
+         outputs=['figures/force_coefficients.png']),
+    Task(pwd / 'plot_velocity_profiles.py', args=args,
+         inputs=['*/data/velocity_profiles_*.txt'],
+         outputs=['figures/u_profiles.png', 'figures/v_profiles.png']),
+    Task(pwd / 'plot_surface_pressure_coefficient.py', args=args,
+         inputs=['*/data/surface_pressure_coefficient_*.txt'],
+         outputs=['figures/surface_pressure_coefficient.png']),
+    Task(pwd / 'plot_u_centerline_profile.py', args=args,
+         inputs=['*/data/u_centerline_profile_*.txt'],
+         outputs=['figures/u_centerline_profile.png'])
 ]
 
-for script in scripts:
-    print(f'[INFO] Running script {script} ...')
-    script = str(pwd / script)
-    p = subprocess.Popen(
-        f'python {script} --no-compute --no-show', shell=True
-    )
-    p.communicate()
+if __name__ == '__main__':
+    run_tasks(tasks)
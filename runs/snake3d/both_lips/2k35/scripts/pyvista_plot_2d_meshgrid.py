@@ -13,10 +13,8 @@ maindir = pathlib.Path(__file__).absolute().parents[1]
 datadir = maindir / 'output' / 'LES'
 figdir = maindir / 'figures'
 
-reader = pyvista.OpenFOAMReader(str(datadir / 'case.foam'))
-mesh = reader.read()
-front = mesh['boundary']['front']
-front.translate((0.0, 0.0, 1.6), inplace=True)
+case = rodney.FoamCase(datadir / 'case.foam')
+front = case.patch('front').translate((0.0, 0.0, 1.6), inplace=False)
 
 
 def plot_meshgrid(filename, width, box, show=True, save=False):
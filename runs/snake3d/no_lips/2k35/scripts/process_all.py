@@ -1,21 +1,26 @@
 """Run post-processing scripts."""
 
 import os
-import subprocess
 from pathlib import Path
 
+from rodney.runner import Task, run_tasks
+
 pwd = Path(__file__).absolute().parent
 os.environ['DISPLAY'] = ':0'
 
-scripts = [
-    'pyvista_plot_2d_contours_ux_uy.py',
-    'pyvista_plot_2d_contours_wz.py',
+args = '--no-show'
+
+tasks = [
+    Task(pwd / 'pyvista_plot_2d_contours_ux_uy.py', args=args,
+         inputs=['output/LES/case.foam', 'output/LES/[0-9]*'],
+         outputs=[
+             'figures/pyvista_2d_contours_ux_*.png',
+             'figures/pyvista_2d_contours_uy_*.png'
+         ]),
+    Task(pwd / 'pyvista_plot_2d_contours_wz.py', args=args,
+         inputs=['output/LES/case.foam', 'output/LES/[0-9]*'],
+         outputs=['figures/pyvista_2d_contours_wz_*.png'])
 ]
 
-for script in scripts:
-    print(f'[INFO] Running script {script} ...')
-    script = str(pwd / script)
-    p = subprocess.Popen(
-        f'python {script} --no-show', shell=True
-    )
-    p.communicate()
+if __name__ == '__main__':
+    run_tasks(tasks)
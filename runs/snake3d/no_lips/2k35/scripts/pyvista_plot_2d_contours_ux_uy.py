@@ -25,13 +25,11 @@ xb, zb = body.points[:, 0], body.points[:, 2]
 times = numpy.arange(100.0, 200.0 + 1, 5.0)
 times = [130, 140]
 
-for time in times:
-    reader = pyvista.OpenFOAMReader(str(datadir / 'case.foam'))
-    reader.set_active_time_value(time)
-    print(f'[time = {reader.active_time_value}]')
+case = rodney.FoamCase(datadir / 'case.foam')
 
-    mesh = reader.read()
-    internal_mesh = mesh['internalMesh']
+for time in times:
+    internal_mesh = case.internal_mesh(time, fields=['U'])
+    print(f'[time = {case.active_time_value}]')
     internal_mesh.set_active_scalars('U')
 
     slice_center = internal_mesh.slice(normal='y')
@@ -35,11 +35,9 @@ cases = {
     }
 }
 
-strouhal = dict()
+signals, keys = [], []
 for lip_cfg in cases.keys():
-    strouhal[lip_cfg] = dict()
     for Re, angles in cases[lip_cfg].items():
-        _strouhal = []
         for AoA in angles:
             coeff_obj = rodney.ForceCoefficientsData(
                 None, maindir / lip_cfg / f'{Re}{AoA}'
@@ -49,11 +47,18 @@ for lip_cfg in cases.keys():
                 coeff_obj.save('force_coefficients.txt')
             else:
                 coeff_obj.load('force_coefficients.txt')
-
-            _strouhal.append(coeff_obj.get_strouhal(
-                L=1.0, U=1.0, time_limits=(100.0, 200.0), order=100
-            ))
-        strouhal[lip_cfg][Re] = _strouhal
+            signals.append((coeff_obj.times, coeff_obj.values[1]))
+            keys.append((lip_cfg, Re))
+
+# Compute the Strouhal numbers from the spectra of the lift coefficients
+# of all cases at once.
+res = rodney.strouhal_numbers(signals, L=1.0, U=1.0,
+                              limits=(100.0, 200.0))
+strouhal, uncertainty = dict(), dict()
+for (lip_cfg, Re), st, dst in zip(keys, res['strouhal'],
+                                  res['uncertainty']):
+    strouhal.setdefault(lip_cfg, dict()).setdefault(Re, []).append(st)
+    uncertainty.setdefault(lip_cfg, dict()).setdefault(Re, []).append(dst)
 
 # Set default font family and size of Matplotlib figures.
 pyplot.rc('font', family='serif', size=12)
@@ -69,9 +74,10 @@ ax.set_ylabel('Strouhal number')
 for lip_cfg in cases.keys():
     for Re in cases[lip_cfg].keys():
         label = f'Re={Re}'.replace('k', '000')
-        ax.plot(
-            cases[lip_cfg][Re], strouhal[lip_cfg][Re], label=label,
-            marker='o', markersize=4
+        ax.errorbar(
+            cases[lip_cfg][Re], strouhal[lip_cfg][Re],
+            yerr=uncertainty[lip_cfg][Re], label=label,
+            marker='o', markersize=4, capsize=2
         )
 ax.set_ylim(0.2, 0.6)
 ax.spines['right'].set_visible(False)
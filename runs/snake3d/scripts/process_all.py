@@ -1,29 +1,54 @@
 """Run post-processing scripts."""
 
-import os
-import subprocess
 from pathlib import Path
 
+from rodney.runner import Task, run_tasks
+
 pwd = Path(__file__).absolute().parent
 
-scripts = [
-    'plot_mean_force_coefficients.py',
-    'plot_mean_lift_drag_ratio.py',
-    'plot_mean_strouhal.py',
-    'plot_force_coefficients_2k25.py',
-    'plot_force_coefficients_2k35.py',
-    'plot_surface_pressure_coefficient_2k25.py',
-    'plot_surface_pressure_coefficient_2k35.py',
-    'plot_u_centerline_profile_2k25.py',
-    'plot_u_centerline_profile_2k35.py',
-    'plot_velocity_profiles_2k25.py',
-    'plot_velocity_profiles_2k35.py'
+args = '--no-compute --no-show'
+
+tasks = [
+    Task(pwd / 'plot_mean_force_coefficients.py', args=args,
+         inputs=['*/*/data/force_coefficients.txt'],
+         outputs=['figures/mean_force_coefficients.png']),
+    Task(pwd / 'plot_mean_lift_drag_ratio.py', args=args,
+         inputs=['*/*/data/force_coefficients.txt'],
+         outputs=['figures/mean_lift_drag_ratio.png']),
+    Task(pwd / 'plot_mean_strouhal.py', args=args,
+         inputs=['*/*/data/force_coefficients.txt'],
+         outputs=['figures/mean_strouhal.png']),
+    Task(pwd / 'plot_force_coefficients_2k25.py', args=args,
+         inputs=['*/2k25/data/force_coefficients.txt'],
+         outputs=['figures/force_coefficients_2k25.png']),
+    Task(pwd / 'plot_force_coefficients_2k35.py', args=args,
+         inputs=['*/2k35/data/force_coefficients.txt'],
+         outputs=['figures/force_coefficients_2k35.png']),
+    Task(pwd / 'plot_surface_pressure_coefficient_2k25.py', args=args,
+         inputs=['*/2k25/data/surface_pressure_coefficient_*.txt'],
+         outputs=['figures/surface_pressure_coefficient_2k25.png']),
+    Task(pwd / 'plot_surface_pressure_coefficient_2k35.py', args=args,
+         inputs=['*/2k35/data/surface_pressure_coefficient_*.txt'],
+         outputs=['figures/surface_pressure_coefficient_2k35.png']),
+    Task(pwd / 'plot_u_centerline_profile_2k25.py', args=args,
+         inputs=['*/2k25/data/u_centerline_profile_*.txt'],
+         outputs=['figures/u_centerline_profile_2k25.png']),
+    Task(pwd / 'plot_u_centerline_profile_2k35.py', args=args,
+         inputs=['*/2k35/data/u_centerline_profile_*.txt'],
+         outputs=['figures/u_centerline_profile_2k35.png']),
+    Task(pwd / 'plot_velocity_profiles_2k25.py', args=args,
+         inputs=['*/2k25/data/velocity_profiles_*.txt'],
+         outputs=[
+             'figures/u_profiles_2k25.png',
+             'figures/v_profiles_2k25.png'
+         ]),
+    Task(pwd / 'plot_velocity_profiles_2k35.py', args=args,
+         inputs=['*/2k35/data/velocity_profiles_*.txt'],
+         outputs=[
+             'figures/u_profiles_2k35.png',
+             'figures/v_profiles_2k35.png'
+         ])
 ]
 
-for script in scripts:
-    print(f'[INFO] Running script {script} ...')
-    script = str(pwd / script)
-    p = subprocess.Popen(
-        f'python {script} --no-compute --no-show', shell=True
-    )
-    p.communicate()
+if __name__ == '__main__':
+    run_tasks(tasks)
@@ -0,0 +1,64 @@
+"""Report the end of the transient and the convergence of force statistics.
+
+For each case, the script prints the time at which the initial transient
+ends, the mean drag and lift coefficients with their confidence intervals,
+and the time after which the running means have converged (i.e., when the
+simulation could have been stopped).
+
+"""
+
+import pathlib
+
+import numpy
+
+import rodney
+
+
+# Parse command-line options.
+args = rodney.parse_command_line()
+
+# Set directories.
+maindir = pathlib.Path(__file__).absolute().parents[1]
+
+cases = {
+    'both_lips': {
+        '1k': [25, 30, 35, 40],
+        '2k': [20, 25, 30, 35, 40],
+        '3k': [20, 25, 30, 35, 40]
+    },
+    'front_lip': {
+        '1k': [25, 30, 35, 40],
+        '2k': [20, 25, 30, 35, 40]
+    },
+    'back_lip': {
+        '1k': [25, 30, 35, 40],
+        '2k': [20, 25, 30, 35, 40]
+    },
+    'no_lips': {
+        '1k': [25, 30, 35, 40],
+        '2k': [20, 25, 30, 35, 40]
+    }
+}
+
+header = (f'{"case":<16}{"t_end":>8}{"t_start":>9}'
+          f'{"<CD>":>9}{"+/-":>8}{"<CL>":>9}{"+/-":>8}{"t_conv":>9}')
+print(header)
+for lip_cfg in cases.keys():
+    for Re, angles in cases[lip_cfg].items():
+        for AoA in angles:
+            coeff_obj = rodney.ForceCoefficientsData(
+                None, maindir / lip_cfg / f'{Re}{AoA}'
+            )
+            if args.compute:
+                coeff_obj.compute(Lz=numpy.pi, from_tarball=True)
+                coeff_obj.save('force_coefficients.txt')
+            else:
+                coeff_obj.load('force_coefficients.txt')
+            cd_stats, cl_stats, _ = coeff_obj.get_stationary_stats()
+            t_start = max(cd_stats['t_start'], cl_stats['t_start'])
+            t_conv = max(cd_stats['t_converged'], cl_stats['t_converged'])
+            print(f'{lip_cfg + "/" + Re + str(AoA):<16}'
+                  f'{coeff_obj.times[-1]:>8.1f}{t_start:>9.1f}'
+                  f'{cd_stats["mean"]:>9.4f}{cd_stats["ci"]:>8.4f}'
+                  f'{cl_stats["mean"]:>9.4f}{cl_stats["ci"]:>8.4f}'
+                  f'{t_conv:>9.1f}')